@@ -1,5 +1,5 @@
 """API route modules."""
 
-from . import health, optimization, stores, tasks
+from . import diagnostics, health, optimization, stores, tasks
 
-__all__ = ["health", "optimization", "stores", "tasks"]
+__all__ = ["diagnostics", "health", "optimization", "stores", "tasks"]
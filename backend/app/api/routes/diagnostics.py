@@ -0,0 +1,81 @@
+"""Operational diagnostics endpoints."""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from backend.app.dependencies import require_admin
+from backend.app.timing import TimedRoute
+from backend.core.db_metrics import get_db_instrumentation
+from backend.core.producer import get_producer
+from backend.core.profiling import get_profiler
+
+router = APIRouter(route_class=TimedRoute)
+
+
+def _worker_db_stats(timeout: float) -> dict[str, Any]:
+    replies = get_producer().control.broadcast("db_stats", reply=True, timeout=timeout)
+    return {worker: stats for reply in replies or [] for worker, stats in reply.items()}
+
+
+@router.get(
+    "/diagnostics/db",
+    summary="Database pool and query statistics",
+    dependencies=[Depends(require_admin)],
+)
+async def read_db_diagnostics(
+    workers: bool = Query(False, description="Also collect statistics from Celery workers."),
+    timeout: float = Query(1.0, gt=0, le=10, description="Seconds to wait for worker replies."),
+) -> dict[str, Any]:
+    """Return pool saturation, statement latency and slow queries for this process.
+
+    With ``workers=true`` the same snapshot is gathered from every Celery worker
+    so API and worker pools can be sized together.
+    """
+
+    payload: dict[str, Any] = {
+        "process": {"pid": os.getpid(), **get_db_instrumentation().snapshot()},
+    }
+    if workers:
+        payload["workers"] = await run_in_threadpool(_worker_db_stats, timeout)
+    return payload
+
+
+@router.get(
+    "/diagnostics/profiles",
+    summary="Recently captured request profiles",
+    dependencies=[Depends(require_admin)],
+)
+async def list_profiles() -> dict[str, Any]:
+    """List the profiles in this process's ring buffer, newest first.
+
+    Requests are profiled when sampled (``SAVERY_PROFILE_SAMPLE_RATE``) or when
+    they carry ``X-Savery-Profile: <admin token>``.
+    """
+
+    return {"pid": os.getpid(), "profiles": [session.summary() for session in get_profiler().store.list()]}
+
+
+@router.get(
+    "/diagnostics/profiles/{profile_id}",
+    summary="One request profile as folded stacks",
+    dependencies=[Depends(require_admin)],
+)
+async def read_profile(
+    profile_id: int,
+    output: str = Query("json", alias="format", pattern="^(json|folded)$", description="folded: flame-graph input."),
+    top: int = Query(50, ge=1, le=10_000, description="Hottest stacks to include (json only)."),
+) -> Any:
+    """Return the sampled stacks of one profile, hottest first."""
+
+    session = get_profiler().store.get(profile_id)
+    if session is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f"Profile {profile_id} is not in the buffer.")
+    if output == "folded":
+        return PlainTextResponse(session.folded())
+    return session.as_dict(top)
@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter
 
+from backend.app.timing import TimedRoute
 from backend.core.config import settings
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/health", summary="Service health check")
@@ -0,0 +1,27 @@
+"""Prometheus scrape endpoint for the API process."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from backend.app.timing import TimedRoute
+from backend.core.config import settings
+from backend.core.metrics import CONTENT_TYPE, get_metrics
+from backend.core.queue_depth import get_queue_sampler
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics() -> Response:
+    """Return this process's metrics and broker queue depths in the Prometheus text format.
+
+    Queue depths are re-sampled at most every ``SAVERY_METRICS_QUEUE_SAMPLE_SECONDS``
+    so frequent scrapes do not hammer the broker.
+    """
+
+    if settings.metrics_enabled:
+        await run_in_threadpool(get_queue_sampler().sample_if_due, settings.metrics_queue_sample_seconds)
+    return Response(get_metrics().render(), media_type=CONTENT_TYPE)
@@ -2,16 +2,44 @@
 
 from __future__ import annotations
 
-from typing import Any
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
-from fastapi import APIRouter, Depends, status
-
-from backend.app.dependencies import get_db
-from backend.app.models import OptimizationRequest, OptimizationResponse
+from backend.app.models import (
+    BatchOptimizationRequest,
+    BatchOptimizationResponse,
+    OptimizationRequest,
+    OptimizationResponse,
+)
+from backend.app.timing import TimedRoute
+from backend.core.admission import OverCapacity
 from backend.core.config import settings
-from backend.core.tasks import enqueue_optimization_job
+from backend.core.tasks import enqueue_optimization_batch, enqueue_optimization_job
+
+router = APIRouter(route_class=TimedRoute)
+
+
+def _too_busy(exc: OverCapacity) -> HTTPException:
+    return HTTPException(
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        "The optimizer is over capacity; retry later.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _job_response(task_id: str, *, degraded: bool = False) -> OptimizationResponse:
+    base_url = settings.task_status_base_url
+    if base_url:
+        status_url = f"{base_url.rstrip('/')}/{task_id}"
+    else:
+        status_url = f"{settings.api_prefix}/tasks/{task_id}"
 
-router = APIRouter()
+    return OptimizationResponse(
+        task_id=task_id,
+        status_url=status_url,
+        events_url=f"{settings.api_prefix}/tasks/{task_id}/events",
+        degraded=degraded,
+    )
 
 
 @router.post(
@@ -19,24 +47,45 @@ router = APIRouter()
     response_model=OptimizationResponse,
     status_code=status.HTTP_202_ACCEPTED,
     summary="Queue a shopping route optimization job",
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Over capacity; see Retry-After."}},
 )
-async def request_optimization(
-    payload: OptimizationRequest,
-    db_session: Any = Depends(get_db),
-) -> OptimizationResponse:
-    """Accept an optimization request, enqueue it, and return a task identifier."""
+async def request_optimization(payload: OptimizationRequest) -> OptimizationResponse:
+    """Accept an optimization request, enqueue it, and return a task identifier.
 
-    # The DB session is reserved for later persistence once the storage layer is active.
-    _ = db_session
+    When admission control refuses the job, an earlier result for the same
+    request is returned with ``degraded`` set if one exists; otherwise 429.
+    """
 
-    task_id = enqueue_optimization_job(payload)
+    # The result-cache lookup and broker publish are blocking I/O; keep them off the loop.
+    try:
+        task_id = await run_in_threadpool(enqueue_optimization_job, payload)
+    except OverCapacity as exc:
+        if exc.stale_task_id is None:
+            raise _too_busy(exc) from None
+        return _job_response(exc.stale_task_id, degraded=True)
 
     # Celery orchestrates a RabbitMQ-backed pipeline; surface the polling URL for clients.
+    return _job_response(task_id)
 
-    base_url = settings.task_status_base_url
-    if base_url:
-        status_url = f"{base_url.rstrip('/')}/{task_id}"
-    else:
-        status_url = f"{settings.api_prefix}/tasks/{task_id}"
 
-    return OptimizationResponse(task_id=task_id, status_url=status_url)
+@router.post(
+    "/optimize/batch",
+    response_model=BatchOptimizationResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue many optimization jobs that share matching and pricing",
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Over capacity; see Retry-After."}},
+)
+async def request_batch_optimization(payload: BatchOptimizationRequest) -> BatchOptimizationResponse:
+    """Enqueue every list of the batch; items and stores are looked up once for the union."""
+
+    if len(payload.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            f"A batch may contain at most {settings.batch_max_requests} requests.",
+        )
+
+    try:
+        batch_id, task_ids = await run_in_threadpool(enqueue_optimization_batch, payload.requests)
+    except OverCapacity as exc:
+        raise _too_busy(exc) from None
+    return BatchOptimizationResponse(batch_id=batch_id, jobs=[_job_response(task_id) for task_id in task_ids])
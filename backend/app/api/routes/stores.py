@@ -2,33 +2,161 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+import hashlib
+from typing import Any
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from backend.app.dependencies import LazyAsyncSession, get_db
 from backend.app.models import StoreListResponse, StoreSummary
+from backend.app.timing import TimedRoute
+from backend.core.config import settings
+from backend.core.store_index import StoreHit, StoreRecord, StoreSpatialIndex, get_store_catalog
+
+router = APIRouter(route_class=TimedRoute)
+
+# Served only in local/test environments when the database is unreachable.
+DEMO_STORES = (
+    StoreRecord("kroger-demo", "Kroger Demo Store", "123 Demo Ave, Albany, NY", 42.6526, -73.7562),
+    StoreRecord("walmart-demo", "Walmart Demo Supercenter", "456 Sample Rd, Albany, NY", 42.6895, -73.8503),
+)
+
+_POSTGIS_QUERY = """
+SELECT external_id, name, metadata_blob ->> 'address' AS address, latitude, longitude,
+       ST_Distance(geography(ST_MakePoint(longitude, latitude)), origin.point) / 1000.0 AS distance_km,
+       count(*) OVER () AS total
+FROM stores, (SELECT geography(ST_MakePoint(:longitude, :latitude)) AS point) AS origin
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+  AND (CAST(:radius_m AS double precision) IS NULL
+       OR ST_DWithin(geography(ST_MakePoint(longitude, latitude)), origin.point, :radius_m))
+ORDER BY geography(ST_MakePoint(longitude, latitude)) <-> origin.point
+LIMIT :limit OFFSET :offset
+"""
+
+
+def _memory_index() -> StoreSpatialIndex:
+    catalog = get_store_catalog()
+    if not catalog.loaded:
+        if settings.environment in ("local", "test"):
+            return StoreSpatialIndex(DEMO_STORES, cell_degrees=settings.store_index_cell_degrees)
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Store catalog is not loaded yet.")
+    return catalog.index
+
+
+def _search_memory(
+    latitude: float | None,
+    longitude: float | None,
+    radius_km: float | None,
+    k: int | None,
+    offset: int,
+    limit: int,
+) -> tuple[list[StoreHit], int]:
+    index = _memory_index()
+    if latitude is None or longitude is None:
+        hits = index.listing()
+    elif radius_km is not None:
+        hits = index.within(latitude, longitude, radius_km)
+        if k is not None:
+            hits = hits[:k]
+    else:
+        # Only the requested page needs ranking; the total is every located store (or k).
+        total = min(k, index.located) if k is not None else index.located
+        hits = index.nearest(latitude, longitude, min(total, offset + limit))
+        return hits[offset : offset + limit], total
+    return hits[offset : offset + limit], len(hits)
 
-router = APIRouter()
-
-
-@router.get("/stores", response_model=StoreListResponse, summary="List supported retailers")
-async def list_supported_stores() -> StoreListResponse:
-    """Return a placeholder set of stores until the catalog is backed by Postgres."""
-
-    # TODO: Replace with real database query once the ORM layer is wired.
-    demo_stores = [
-        StoreSummary(
-            id="kroger-demo",
-            name="Kroger Demo Store",
-            address="123 Demo Ave, Albany, NY",
-            latitude=42.6526,
-            longitude=-73.7562,
-        ),
-        StoreSummary(
-            id="walmart-demo",
-            name="Walmart Demo Supercenter",
-            address="456 Sample Rd, Albany, NY",
-            latitude=42.6895,
-            longitude=-73.8503,
-        ),
+
+async def _search_postgis(
+    db: LazyAsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_km: float | None,
+    k: int | None,
+    offset: int,
+    limit: int,
+) -> tuple[list[StoreHit], int]:
+    from sqlalchemy import text
+
+    if k is not None:
+        limit = max(0, min(limit, k - offset))
+    session = await db.get()
+    rows = (
+        await session.execute(
+            text(_POSTGIS_QUERY),
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "radius_m": radius_km * 1000.0 if radius_km is not None else None,
+                "limit": limit,
+                "offset": offset,
+            },
+        )
+    ).all()
+    total = int(rows[0].total) if rows else 0
+    hits = [
+        StoreHit(
+            StoreRecord(row.external_id, row.name, row.address, row.latitude, row.longitude),
+            round(float(row.distance_km), 3),
+        )
+        for row in rows
     ]
+    return hits, min(total, k) if k is not None else total
+
+
+@router.get("/stores", response_model=StoreListResponse, summary="List or search supported stores")
+async def list_supported_stores(
+    request: Request,
+    latitude: float | None = Query(None, ge=-90, le=90),
+    longitude: float | None = Query(None, ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0, le=500, description="Only stores within this distance."),
+    k: int | None = Query(None, ge=1, le=500, description="Only the k nearest stores."),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: LazyAsyncSession = Depends(get_db),
+) -> Response:
+    """Return stores nearest to ``latitude``/``longitude`` (or all, by name).
+
+    Answers come from the in-memory grid index, or from PostGIS when
+    ``SAVERY_STORE_SEARCH_BACKEND=postgis``. Responses carry an ETag so clients can
+    revalidate with ``If-None-Match``.
+    """
+
+    located = latitude is not None and longitude is not None
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(422, "latitude and longitude go together.")
+
+    if located and settings.store_search_backend == "postgis":
+        hits, total = await _search_postgis(db, latitude, longitude, radius_km, k, offset, limit)
+    else:
+        # The first call may load the catalog from the database; keep that off the loop.
+        hits, total = await run_in_threadpool(
+            _search_memory, latitude, longitude, radius_km, k, offset, limit
+        )
 
-    return StoreListResponse(stores=demo_stores)
+    payload = StoreListResponse(
+        stores=[
+            StoreSummary(
+                id=hit.store.id,
+                name=hit.store.name,
+                address=hit.store.address,
+                latitude=hit.store.latitude,
+                longitude=hit.store.longitude,
+                distance_km=hit.distance_km,
+            )
+            for hit in hits
+        ],
+        total=total,
+        offset=offset,
+        limit=limit,
+        next_offset=offset + limit if offset + limit < total else None,
+    )
+    body = payload.model_dump_json().encode("utf-8")
+    etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    headers: dict[str, Any] = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.store_list_max_age_seconds}",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
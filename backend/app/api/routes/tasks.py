@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from backend.app.models import TaskStatusResponse
+from backend.app.timing import TimedRoute
+from backend.core import job_store
+from backend.core.config import settings
+from backend.core.progress import ProgressEvent, get_progress_broker
 from backend.core.tasks import get_task_status
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get(
@@ -18,5 +29,73 @@ router = APIRouter()
 async def read_task_status(task_id: str) -> TaskStatusResponse:
     """Return the current status for a Celery task identifier."""
 
-    status_payload = get_task_status(task_id)
+    status_payload = await run_in_threadpool(get_task_status, task_id)
     return TaskStatusResponse(**status_payload)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _failure(task_id: str, event: ProgressEvent) -> dict[str, Any]:
+    return {
+        "id": task_id,
+        "status": "FAILURE",
+        "ready": True,
+        "successful": False,
+        "result": {"error": event.error, "stage": event.stage},
+    }
+
+
+async def _task_events(request: Request, task_id: str) -> AsyncIterator[str]:
+    broker = get_progress_broker()
+    # Subscribe before reading the status so no transition falls in between.
+    queue = broker.subscribe(task_id)
+    try:
+        status_payload = await run_in_threadpool(get_task_status, task_id)
+        if status_payload["ready"]:
+            yield _sse("result", status_payload)
+            return
+        yield _sse("status", {key: value for key, value in status_payload.items() if key != "result"})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.progress_stream_timeout_seconds
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield _sse("timeout", {"id": task_id, "status_url": f"{settings.api_prefix}/tasks/{task_id}"})
+                return
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.progress_heartbeat_seconds, remaining)
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            yield _sse("stage", asdict(event))
+            if event.final:
+                if event.state == "failed":
+                    yield _sse("result", _failure(task_id, event))
+                else:
+                    # The snapshot cached while the job was running is now outdated.
+                    job_store.invalidate(task_id)
+                    yield _sse("result", await run_in_threadpool(get_task_status, task_id))
+                return
+    finally:
+        broker.unsubscribe(task_id, queue)
+
+
+@router.get("/tasks/{task_id}/events", summary="Stream task progress (Server-Sent Events)")
+async def stream_task_events(task_id: str, request: Request) -> StreamingResponse:
+    """Push ``stage`` events (matching → pricing → routing, with timings) as they
+    happen, then a single ``result`` event with the final status, then close.
+    """
+
+    return StreamingResponse(
+        _task_events(request, task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
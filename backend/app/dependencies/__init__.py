@@ -1,13 +1,77 @@
-"""Shared dependency placeholders for FastAPI routes."""
+"""Shared dependency providers for FastAPI routes."""
 
+import hmac
 from collections.abc import AsyncGenerator
 from typing import Any
 
-from backend.core.db import session_scope
+from fastapi import Header, HTTPException, status
 
+from backend.core.config import settings
+from backend.core.db import get_async_session_factory
 
-async def get_db() -> AsyncGenerator[Any, None]:
-    """Yield a database session for request handling."""
 
-    with session_scope() as session:
+class LazyAsyncSession:
+    """Async session handle that checks out a connection only when first used.
+
+    Handlers that never touch the database cost nothing; handlers that do get a
+    regular ``AsyncSession`` from :meth:`get`.
+    """
+
+    def __init__(self, session_factory: Any = None) -> None:
+        self._session_factory = session_factory
+        self._session: Any | None = None
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    async def get(self) -> Any:
+        if self._session is None:
+            factory = self._session_factory or get_async_session_factory()
+            self._session = factory()
+        return self._session
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def get_db() -> AsyncGenerator[LazyAsyncSession, None]:
+    """Yield a lazy async session; commit on success, roll back on error."""
+
+    session = LazyAsyncSession()
+    try:
         yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def require_admin(authorization: str | None = Header(None)) -> None:
+    """Allow the request only with ``Authorization: Bearer <SAVERY_ADMIN_TOKEN>``.
+
+    Admin endpoints do not exist (404) while no admin token is configured.
+    """
+
+    token = settings.admin_token
+    if not token:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Not Found")
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(
+            status.HTTP_401_UNAUTHORIZED,
+            "Admin token required.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,12 +1,16 @@
 """Application lifecycle hooks."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from backend.core.config import settings
+from backend.core.db import dispose_async_engine
+from backend.core.progress import close_progress_broker
 from backend.core.migrations import ensure_database_revision
+from backend.core.store_index import get_store_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +28,11 @@ async def lifespan(app: FastAPI):
             logger.error("Database schema check failed: %s", exc)
             raise
 
-    # Insert startup initialization (DB, caches, etc.) here.
+    if settings.store_index_preload:
+        # Load the store index before serving so the first /stores request is not a cold load.
+        await asyncio.to_thread(get_store_catalog)
+
     yield
-    # Insert graceful shutdown logic here.
+    await close_progress_broker()
+    await dispose_async_engine()
     logger.info("Stopping %s", app.title)
@@ -5,7 +5,9 @@ from fastapi import FastAPI
 from backend.core.config import settings
 
 from .api import api_router
+from .api.routes import metrics
 from .lifecycle import lifespan
+from .timing import RequestTimingMiddleware
 
 
 def create_app() -> FastAPI:
@@ -21,7 +23,12 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    if settings.http_timing_enabled:
+        app.add_middleware(RequestTimingMiddleware)
+
     app.include_router(api_router, prefix=settings.api_prefix)
+    # Prometheus scrapes /metrics at the root by convention, outside the API prefix.
+    app.include_router(metrics.router, tags=["diagnostics"])
 
     return app
 
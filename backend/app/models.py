@@ -66,6 +66,9 @@ class PurchasedItem(BaseModel):
     currency: str = "USD"
     quantity: float | None = None
     unit: str | None = None
+    packages: int | None = Field(default=None, description="Packages to buy to cover the requested amount.")
+    unit_price: float | None = Field(default=None, description="Package price per ``unit_basis``.")
+    unit_basis: str | None = Field(default=None, description="Base unit of ``unit_price``: g, ml or each.")
 
 
 class StoreAssignment(BaseModel):
@@ -85,6 +88,10 @@ class OptimizationResult(BaseModel):
     total_cost: float | None = None
     total_distance_km: float | None = None
     currency: str = "USD"
+    unmatched_items: list[ShoppingListItem] = Field(
+        default_factory=list,
+        description="Items no selected store could supply.",
+    )
 
 
 class OptimizationResponse(BaseModel):
@@ -95,6 +102,27 @@ class OptimizationResponse(BaseModel):
         default=None,
         description="Endpoint clients can poll for status updates.",
     )
+    events_url: str | None = Field(
+        default=None,
+        description="Server-Sent Events stream pushing stage progress and the final result.",
+    )
+    degraded: bool = Field(
+        default=False,
+        description="True when the service was over capacity and answered with an earlier, possibly outdated result.",
+    )
+
+
+class BatchOptimizationRequest(BaseModel):
+    """Many optimization requests matched and priced together."""
+
+    requests: list[OptimizationRequest] = Field(..., min_length=1)
+
+
+class BatchOptimizationResponse(BaseModel):
+    """Batch identifier plus one job per submitted request, in request order."""
+
+    batch_id: str = Field(..., description="Task id of the shared matching/pricing fan-out.")
+    jobs: list[OptimizationResponse]
 
 
 class StoreSummary(BaseModel):
@@ -105,12 +133,20 @@ class StoreSummary(BaseModel):
     address: str | None = None
     latitude: float | None = None
     longitude: float | None = None
+    distance_km: float | None = Field(
+        default=None,
+        description="Distance from the requested location, when one was given.",
+    )
 
 
 class StoreListResponse(BaseModel):
     """Collection of stores from the catalog available for selection."""
 
     stores: list[StoreSummary]
+    total: int | None = Field(default=None, description="Stores matching the query before pagination.")
+    offset: int = 0
+    limit: int | None = None
+    next_offset: int | None = Field(default=None, description="Offset of the next page, if any.")
 
 
 class TaskStatusResponse(BaseModel):
@@ -121,3 +157,4 @@ class TaskStatusResponse(BaseModel):
     ready: bool
     successful: bool
     result: Any | None = None
+    stage: str | None = Field(default=None, description="Pipeline stage last reported by the worker.")
@@ -0,0 +1,162 @@
+"""Request timing middleware, phase-aware API routes and on-demand profiling.
+
+:class:`RequestTimingMiddleware` wraps every HTTP request: it opens the
+request's :class:`~backend.core.request_timing.RequestTimings`, records
+``savery_http_request_duration_seconds`` per route template, method and status,
+and adds a ``Server-Timing`` header. Routers built with :class:`TimedRoute`
+split the handler into ``validate`` (body parsing and dependencies),
+``handler`` (the endpoint function) and ``serialize`` (response model); ``db``
+and ``enqueue`` come from the code they measure.
+
+A sampled fraction of requests (``SAVERY_PROFILE_SAMPLE_RATE``), and any
+request carrying ``X-Savery-Profile: <SAVERY_ADMIN_TOKEN>``, is profiled by
+``core.profiling``; the response names the profile in ``X-Savery-Profile-Id``.
+"""
+
+from __future__ import annotations
+
+import functools
+import hmac
+import inspect
+import random
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core import request_timing
+from backend.core.config import settings
+from backend.core.metrics import get_metrics
+from backend.core.profiling import ProfileSession, get_profiler
+
+PROFILE_HEADER = "x-savery-profile"
+PROFILE_ID_HEADER = "x-savery-profile-id"
+
+HTTP_DURATION = get_metrics().histogram(
+    "savery_http_request_duration_seconds", "HTTP request latency by route template, method and status."
+)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``endpoint`` to mark its start and end; FastAPI still sees the original signature."""
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timings = request_timing.current()
+            if timings is not None:
+                timings.mark("endpoint_start")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.mark("endpoint_end")
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timings = request_timing.current()
+            if timings is not None:
+                timings.mark("endpoint_start")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.mark("endpoint_end")
+
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """``APIRoute`` that reports validation, handler and serialization time."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[..., Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Any) -> Any:
+            timings = request_timing.current()
+            if timings is None:
+                return await handler(request)
+            timings.mark("route_start")
+            try:
+                return await handler(request)
+            finally:
+                timings.mark("route_end")
+                marks = timings.marks
+                start = marks.get("endpoint_start", marks["route_end"])
+                end = marks.get("endpoint_end", marks["route_end"])
+                timings.add("validate", start - marks["route_start"])
+                if "endpoint_start" in marks:
+                    timings.add("handler", end - start)
+                    timings.add("serialize", marks["route_end"] - end)
+
+        return timed_handler
+
+
+def _route_template(scope: Scope) -> str:
+    """Matched route template with its router prefixes, e.g. ``/api/tasks/{task_id}``.
+
+    Included routers keep prefix-less route paths, so the prefix is taken from
+    the request path: the leading segments the route's own path does not cover.
+    """
+
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return "unmatched"
+    depth = path.count("/")
+    return "/".join(scope["path"].split("/")[:-depth]) + path
+
+
+def _profile_reason(scope: Scope) -> str | None:
+    token = settings.admin_token
+    if token:
+        requested = Headers(scope=scope).get(PROFILE_HEADER)
+        if requested and hmac.compare_digest(requested.encode(), token.encode()):
+            return "header"
+    if settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+        return "sampled"
+    return None
+
+
+class RequestTimingMiddleware:
+    """Pure ASGI middleware (no body buffering, safe for streaming responses)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = request_timing.begin()
+        reason = _profile_reason(scope)
+        session: ProfileSession | None = None
+        if reason is not None:
+            session = get_profiler().start(scope["method"], scope["path"], reason)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header())
+                if session is not None:
+                    headers.append(PROFILE_ID_HEADER, str(session.id))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = _route_template(scope)
+            HTTP_DURATION.observe(timings.elapsed(), method=scope["method"], route=route, status=str(status))
+            if session is not None:
+                get_profiler().stop(session, status)
+            request_timing.end(token)
@@ -0,0 +1 @@
+"""Pipeline benchmarks on synthetic catalogs (``python -m backend.benchmarks.run``)."""
@@ -0,0 +1,210 @@
+"""Time the optimization pipeline on synthetic catalogs and compare with a baseline.
+
+Usage::
+
+    python -m backend.benchmarks.run [--scales small,medium,large] [--repeat N]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+
+Every scale builds a :class:`~backend.benchmarks.synthetic.SyntheticWorld`, runs
+``match_items``, ``fetch_prices`` (price cache cleared, so every key goes to the
+stub provider), ``plan_route`` and a full ``POST /api/optimize`` round trip with
+Celery in eager mode, and records the median/p95 wall time of ``--repeat`` runs
+plus the tracemalloc peak of one extra run. With ``--baseline`` the exit status
+is 1 when any median or memory peak grew by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import numpy as np
+
+from backend.benchmarks.stubs import pipeline_environment
+from backend.benchmarks.synthetic import make_world, shopping_list
+
+
+@dataclass(frozen=True)
+class Scale:
+    products: int
+    stores: int
+    items: int = 25
+    list_stores: int = 50
+
+
+SCALES: dict[str, Scale] = {
+    "small": Scale(products=1_000, stores=5),
+    "medium": Scale(products=100_000, stores=50),
+    "large": Scale(products=1_000_000, stores=500),
+}
+
+STAGES = ("match_items", "fetch_prices", "plan_route", "optimize_round_trip")
+
+
+def _measure(run: Callable[[], Any], *, repeat: int, before: Callable[[], None] | None = None) -> dict[str, float]:
+    """Median/p95/min wall time over ``repeat`` runs and the peak traced memory of one more."""
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000.0)
+
+    if before is not None:
+        before()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples = np.asarray(timings)
+    return {
+        "median_ms": round(float(np.median(samples)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+def run_scale(scale: Scale, *, repeat: int, seed: int = 0) -> dict[str, Any]:
+    """Benchmark every pipeline stage on one synthetic world."""
+
+    from fastapi.testclient import TestClient
+
+    from backend.app.main import create_app
+    from backend.core.config import settings
+    from backend.workers.tasks.matching import match_items
+    from backend.workers.tasks.optimize import plan_route
+    from backend.workers.tasks.scraping import fetch_prices
+
+    started = time.perf_counter()
+    world = make_world(scale.products, scale.stores, seed=seed)
+    payload = shopping_list(world, scale.items, stores=scale.list_stores, seed=seed)
+
+    with pipeline_environment(world) as cache:
+        setup_s = time.perf_counter() - started
+        matched = match_items(payload)
+        cache.invalidate()
+        priced = fetch_prices(matched)
+        client = TestClient(create_app())
+        url = f"{settings.api_prefix}/optimize"
+
+        def round_trip() -> None:
+            response = client.post(url, json=payload)
+            response.raise_for_status()
+
+        stages = {
+            "match_items": _measure(lambda: match_items(payload), repeat=repeat),
+            "fetch_prices": _measure(lambda: fetch_prices(matched), repeat=repeat, before=cache.invalidate),
+            "plan_route": _measure(lambda: plan_route(priced), repeat=repeat),
+            "optimize_round_trip": _measure(round_trip, repeat=repeat, before=cache.invalidate),
+        }
+
+    return {
+        "products": scale.products,
+        "stores": scale.stores,
+        "items": len(payload["items"]),
+        "list_stores": len(payload["store_ids"]),
+        "setup_s": round(setup_s, 3),
+        "stages": stages,
+    }
+
+
+def run(scales: list[str], *, repeat: int, seed: int = 0) -> dict[str, Any]:
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "scales": {name: run_scale(SCALES[name], repeat=repeat, seed=seed) for name in scales},
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Describe every stage whose median time or memory peak regressed past ``threshold``.
+
+    Scales and stages missing from either side are ignored.
+    """
+
+    regressions: list[str] = []
+    for name, scale in results.get("scales", {}).items():
+        reference = baseline.get("scales", {}).get(name)
+        if reference is None:
+            continue
+        for stage, current in scale["stages"].items():
+            previous = reference["stages"].get(stage)
+            if previous is None:
+                continue
+            for metric in ("median_ms", "peak_kib"):
+                before, after = previous.get(metric), current.get(metric)
+                if before and after is not None and after > before * (1.0 + threshold):
+                    regressions.append(
+                        f"{name}/{stage} {metric}: {before:g} -> {after:g} (+{(after / before - 1.0) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def _summary(results: dict[str, Any]) -> str:
+    lines = [f"{'scale':<8} {'stage':<20} {'median ms':>10} {'p95 ms':>10} {'peak KiB':>10}"]
+    for name, scale in results["scales"].items():
+        for stage, metrics in scale["stages"].items():
+            lines.append(
+                f"{name:<8} {stage:<20} {metrics['median_ms']:>10.2f} {metrics['p95_ms']:>10.2f}"
+                f" {metrics['peak_kib']:>10.0f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium,large", help=f"Comma-separated subset of {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    scales = [name.strip() for name in args.scales.split(",") if name.strip()]
+    unknown = [name for name in scales if name not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = run(scales, repeat=max(args.repeat, 1), seed=args.seed)
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            stream.write(document + "\n")
+    else:
+        print(document)
+    print(_summary(results), file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as stream:
+            regressions = compare(results, json.load(stream), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Stub providers and an in-process environment for running the pipeline offline.
+
+:func:`pipeline_environment` points the pipeline at a :class:`SyntheticWorld`:
+the matching index is built from its catalog, prices come from
+:class:`StubProvider` through the real provider pool, an in-memory price cache
+and an in-process single-flight, store locations come from the world, Celery
+runs eagerly, and every database-backed feature (result cache, job store,
+progress events, claim check) is switched off.
+"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+from typing import Any, Iterator
+from unittest import mock
+
+import httpx
+
+from backend.benchmarks.synthetic import SyntheticWorld
+from backend.core.config import settings
+from backend.core.matching import catalog as matching_catalog
+from backend.core.matching.text_index import ProductTextIndex
+from backend.core.price_cache import CachedPrice, PriceCache
+from backend.core.singleflight import SingleFlight
+from backend.workers.providers import OfferRequest, ProviderClient, ProviderPool
+
+
+class StubProvider(ProviderClient):
+    """Answers every lookup from the synthetic world without network I/O."""
+
+    def __init__(self, world: SyntheticWorld, name: str = "bench") -> None:
+        super().__init__("http://stub.invalid")
+        self.world = world
+        self.name = name
+
+    def build_request(self, client: httpx.AsyncClient, request: OfferRequest) -> httpx.Request:
+        raise NotImplementedError("StubProvider never issues HTTP requests")
+
+    def parse_offer(self, request: OfferRequest, payload: Any) -> CachedPrice | None:
+        raise NotImplementedError("StubProvider never issues HTTP requests")
+
+    async def fetch(self, client: httpx.AsyncClient, request: OfferRequest) -> CachedPrice | None:
+        product = request.key[0]
+        if not product.isdigit():
+            return None
+        row = int(product) - 1
+        return self.entry(
+            request,
+            list_price=self.world.price(int(product), request.store_id),
+            unit=self.world.sizes[row],
+            product_name=self.world.names[row],
+        )
+
+
+@contextmanager
+def pipeline_environment(world: SyntheticWorld) -> Iterator[PriceCache]:
+    """Run the pipeline against ``world`` inside the block; yields the price cache."""
+
+    from backend.workers.celery_app import celery_app
+    from backend.workers.tasks import optimize, scraping
+
+    index = ProductTextIndex.build(world.product_ids.tolist(), world.names)
+    pool = ProviderPool([StubProvider(world)], max_concurrency=64, max_retries=0)
+    cache = PriceCache(max_entries=settings.price_cache_max_entries, default_ttl=3600, use_database=False)
+    single_flight = SingleFlight("price", distributed=False)
+    locations = world.locations()
+
+    with ExitStack() as stack:
+        for name, value in {
+            "result_cache_enabled": False,
+            "job_store_enabled": False,
+            "progress_events_enabled": False,
+            "celery_claim_check": False,
+            "embedding_index_dir": None,
+            "matching_refresh_seconds": 10**9,
+        }.items():
+            stack.enter_context(mock.patch.object(settings, name, value))
+        stack.enter_context(mock.patch.object(scraping, "get_provider_pool", lambda: pool))
+        stack.enter_context(mock.patch.object(scraping, "get_price_cache", lambda: cache))
+        stack.enter_context(mock.patch.object(scraping, "get_single_flight", lambda namespace: single_flight))
+        stack.enter_context(
+            mock.patch.object(
+                optimize, "_load_store_locations", lambda ids: {i: locations[i] for i in ids if i in locations}
+            )
+        )
+        eager = {"task_always_eager": True, "task_eager_propagates": True}
+        stack.callback(celery_app.conf.update, {name: celery_app.conf[name] for name in eager})
+        celery_app.conf.update(eager)
+        previous = matching_catalog._catalog
+        matching_catalog.set_catalog_index(matching_catalog.CatalogIndex(index, None))
+        stack.callback(matching_catalog.set_catalog_index, previous)
+        stack.callback(pool.close)
+        yield cache
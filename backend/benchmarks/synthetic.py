@@ -0,0 +1,103 @@
+"""Deterministic synthetic catalogs, stores and shopping lists for benchmarks."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+_BRANDS = (
+    "acme", "harvest", "golden", "valley", "sunrise", "prairie", "orchard", "coastal",
+    "summit", "meadow", "northern", "heritage", "simple", "urban", "rustic", "pure",
+)
+_ADJECTIVES = (
+    "organic", "whole", "low fat", "fresh", "frozen", "unsalted", "sweet", "spicy",
+    "smoked", "roasted", "sliced", "shredded", "reduced sodium", "gluten free", "extra virgin",
+    "large", "small", "family size", "classic", "original",
+)
+_NOUNS = (
+    "milk", "eggs", "bread", "butter", "cheddar cheese", "yogurt", "chicken breast",
+    "ground beef", "salmon fillet", "bananas", "apples", "oranges", "spinach", "carrots",
+    "potatoes", "onions", "tomatoes", "rice", "pasta", "olive oil", "coffee", "tea",
+    "cereal", "oatmeal", "peanut butter", "strawberry jam", "honey", "flour", "sugar",
+    "black beans", "chickpeas", "tortillas", "bacon", "ham", "turkey", "tofu", "almonds",
+    "orange juice", "sparkling water", "ice cream",
+)
+_SIZES = ("16 oz", "1 lb", "2 lb", "32 fl oz", "1 gal", "12 ct", "500 g", "1 l", "6 ct", "5 lb")
+
+
+@dataclass
+class SyntheticWorld:
+    """A product catalog, a set of located stores and a price for every pair."""
+
+    product_ids: np.ndarray
+    names: list[str]
+    sizes: list[str]
+    store_ids: list[str]
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    base_prices: np.ndarray
+    seed: int
+    _store_index: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._store_index = {store_id: index for index, store_id in enumerate(self.store_ids)}
+
+    def price(self, product_id: int, store_id: str) -> float:
+        """Stable price of ``product_id`` at ``store_id`` (base price +/- 25%)."""
+
+        row = int(product_id) - 1
+        store = self._store_index.get(store_id, 0)
+        jitter = ((row * 2654435761 + store * 40503 + self.seed) % 1000) / 1000.0
+        return round(float(self.base_prices[row % len(self.base_prices)]) * (0.75 + 0.5 * jitter), 2)
+
+    def locations(self) -> dict[str, dict[str, object]]:
+        return {
+            store_id: {"name": store_id, "latitude": float(lat), "longitude": float(lon)}
+            for store_id, lat, lon in zip(self.store_ids, self.latitudes, self.longitudes)
+        }
+
+
+def make_world(products: int, stores: int, *, seed: int = 0, provider: str = "bench") -> SyntheticWorld:
+    """Build ``products`` catalog entries and ``stores`` stores around Albany, NY."""
+
+    rng = np.random.default_rng(seed)
+    brand = rng.integers(0, len(_BRANDS), products)
+    adjective = rng.integers(0, len(_ADJECTIVES), products)
+    noun = rng.integers(0, len(_NOUNS), products)
+    variant = rng.integers(1, 400, products)
+    names = [
+        f"{_BRANDS[b]} {_ADJECTIVES[a]} {_NOUNS[n]} {v}"
+        for b, a, n, v in zip(brand.tolist(), adjective.tolist(), noun.tolist(), variant.tolist())
+    ]
+    sizes = [_SIZES[i] for i in rng.integers(0, len(_SIZES), products).tolist()]
+    return SyntheticWorld(
+        product_ids=np.arange(1, products + 1, dtype=np.int64),
+        names=names,
+        sizes=sizes,
+        store_ids=[f"{provider}-{index:05d}" for index in range(stores)],
+        latitudes=42.65 + rng.normal(0.0, 0.15, stores),
+        longitudes=-73.75 + rng.normal(0.0, 0.15, stores),
+        base_prices=np.round(rng.uniform(0.99, 14.99, products), 2),
+        seed=seed,
+    )
+
+
+def shopping_list(world: SyntheticWorld, items: int, *, stores: int, seed: int = 0) -> dict[str, object]:
+    """An ``OptimizationRequest`` payload whose items are noisy catalog names."""
+
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.choice(len(world.names), size=min(items, len(world.names)), replace=False)
+    chosen = rng.choice(len(world.store_ids), size=min(stores, len(world.store_ids)), replace=False)
+    list_items = []
+    for row in rows.tolist():
+        # Users type a shortened name: drop the brand and the variant number.
+        words = world.names[row].split()[1:-1]
+        list_items.append({"name": " ".join(words), "quantity": int(rng.integers(1, 4)), "unit": None})
+    return {
+        "items": list_items,
+        "store_ids": [world.store_ids[index] for index in chosen.tolist()],
+        "latitude": 42.65,
+        "longitude": -73.75,
+        "preferences": {"cost_priority": 0.6, "max_stores": 3, "allow_bulk": False},
+    }
@@ -0,0 +1,116 @@
+"""Admission control for optimization requests.
+
+Before a job is published, :class:`AdmissionController` checks the lane it would
+run in:
+
+* queue depth – ready messages in each of the lane's stage queues, sampled from
+  the broker at most every ``SAVERY_METRICS_QUEUE_SAMPLE_SECONDS`` (the sample
+  ``/metrics`` uses). A queue holding ``SAVERY_ADMISSION_MAX_QUEUE_DEPTH``
+  messages, or more than ``SAVERY_ADMISSION_MAX_BACKLOG_PER_CONSUMER`` per
+  attached consumer, is full;
+* latency – for the interactive lane, the p90 enqueue-to-finish time of jobs
+  finished within ``SAVERY_ADMISSION_LATENCY_WINDOW_SECONDS`` (read from
+  ``optimization_jobs``), against ``SAVERY_ADMISSION_MAX_LATENCY_SECONDS``.
+
+A rejected request surfaces as :class:`OverCapacity`; the API answers 429 with
+``Retry-After``, or serves a stale cached result for single requests. A signal
+that cannot be read (broker or database down) admits: admission control sheds
+load, it does not decide availability. Neither check waits on another request
+that is already refreshing a signal.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+
+from backend.core import job_store
+from backend.core.config import settings
+from backend.core.metrics import get_metrics
+from backend.core.producer import INTERACTIVE, STAGE_QUEUES, lane_queue
+from backend.core.queue_depth import QueueDepthSampler, get_queue_sampler
+
+MAX_RETRY_AFTER_SECONDS = 60
+
+REJECTED = get_metrics().counter("savery_admission_rejected_total", "Requests refused by admission control.")
+
+
+@dataclass(frozen=True)
+class Decision:
+    admitted: bool
+    reason: str | None = None
+    retry_after: int = 0
+
+
+class OverCapacity(RuntimeError):
+    """The lane is over capacity and nothing was queued.
+
+    ``stale_task_id`` names a cached (possibly outdated) result for the request
+    when one may be served instead.
+    """
+
+    def __init__(self, decision: Decision, stale_task_id: str | None = None) -> None:
+        super().__init__(f"Over capacity ({decision.reason})")
+        self.decision = decision
+        self.stale_task_id = stale_task_id
+
+    @property
+    def retry_after(self) -> int:
+        return self.decision.retry_after
+
+
+class AdmissionController:
+    """Admits or refuses new jobs per lane from queue depth and recent latency."""
+
+    def __init__(self, sampler: QueueDepthSampler | None = None) -> None:
+        self.sampler = sampler
+        self._latency: float | None = None
+        self._latency_at = 0.0
+        self._lock = threading.Lock()
+
+    def latency(self) -> float | None:
+        """Recent p90 latency of interactive jobs, re-read at most every sample interval."""
+
+        if not settings.job_store_enabled:
+            return None
+        now = time.monotonic()
+        if now - self._latency_at >= settings.metrics_queue_sample_seconds and self._lock.acquire(blocking=False):
+            try:
+                window = timedelta(seconds=settings.admission_latency_window_seconds)
+                self._latency = job_store.recent_latency(window)
+                self._latency_at = now
+            finally:
+                self._lock.release()
+        return self._latency
+
+    def check(self, lane: str = INTERACTIVE) -> Decision:
+        sampler = self.sampler or get_queue_sampler()
+        depths = sampler.sample_if_due(settings.metrics_queue_sample_seconds, wait=False)
+        latency = self.latency() if lane == INTERACTIVE else None
+        # Come back after about one job's latency, by when the signals were re-sampled.
+        retry_after = min(max(math.ceil(latency or settings.metrics_queue_sample_seconds), 1), MAX_RETRY_AFTER_SECONDS)
+
+        reason = None
+        for prefix in STAGE_QUEUES:
+            messages, consumers = depths.get(lane_queue(prefix, lane), (0, 0))
+            backlog_limit = settings.admission_max_backlog_per_consumer * max(consumers, 1)
+            if messages >= settings.admission_max_queue_depth or messages > backlog_limit:
+                reason = "queue_depth"
+                break
+        if reason is None and latency is not None and latency > settings.admission_max_latency_seconds:
+            reason = "latency"
+        if reason is None:
+            return Decision(True)
+        REJECTED.inc(lane=lane, reason=reason)
+        return Decision(False, reason, retry_after)
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+
+    return AdmissionController()
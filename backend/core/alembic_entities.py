@@ -5,10 +5,15 @@ from __future__ import annotations
 from typing import Iterable
 
 try:
+    from alembic_utils.pg_materialized_view import PGMaterializedView
     from alembic_utils.replaceable_entity import ReplaceableEntity
 except ModuleNotFoundError:  # pragma: no cover - library optional during install bootstrap
+    PGMaterializedView = None  # type: ignore[misc, assignment]
     ReplaceableEntity = object  # type: ignore[misc, assignment]
 
+from backend.core.latest_prices import VIEW_DEFINITION as LATEST_PRICES_DEFINITION
+from backend.core.latest_prices import VIEW_NAME as LATEST_PRICES_VIEW
+
 
 def iter_replaceable_entities() -> Iterable[ReplaceableEntity]:
     """Return replaceable entities (functions/views/triggers) to track.
@@ -19,15 +24,12 @@ def iter_replaceable_entities() -> Iterable[ReplaceableEntity]:
     place to expand the DDL surface managed by migrations.
     """
 
-    # Example placeholder:
-    # yield PGFunction(
-    #     schema="public",
-    #     signature="to_upper(some_text text)",
-    #     definition="""\
-    #     RETURNS text AS $$
-    #         SELECT upper(some_text)
-    #     $$ LANGUAGE SQL;
-    #     """,
-    # )
-
-    yield from ()
+    if PGMaterializedView is None:  # pragma: no cover - alembic_utils not installed
+        return
+
+    yield PGMaterializedView(
+        schema="public",
+        signature=LATEST_PRICES_VIEW,
+        definition=LATEST_PRICES_DEFINITION.strip(),
+        with_data=True,
+    )
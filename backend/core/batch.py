@@ -0,0 +1,96 @@
+"""Batch optimization: one matching/pricing pass shared by many shopping lists.
+
+:func:`build_union` collapses the lists of a batch into a single matching
+payload. Items are deduplicated by normalized name, and each union item is
+matched and priced only at the stores of the lists that contain it. After
+pricing, :func:`split_priced` rebuilds one ``fetch_prices``-shaped payload per
+list, which the per-list routing tasks consume unchanged.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def item_key(item: dict[str, Any]) -> str:
+    """Dedup key of a list item; matches the normalization used by ``match_items``."""
+
+    return " ".join(item.get("name", "").split()).lower()
+
+
+def build_union(requests: list[dict[str, Any]]) -> tuple[dict[str, Any], list[list[int]]]:
+    """Return the union matching payload and, per request, its union item indexes.
+
+    ``item_store_ids`` in the payload restricts each union item to the stores it
+    is actually needed at, so overlapping lists never price the same
+    (item, store) pair twice and disjoint lists never price each other's stores.
+    """
+
+    index: dict[str, int] = {}
+    items: list[dict[str, Any]] = []
+    item_stores: list[dict[str, None]] = []
+    all_stores: dict[str, None] = {}
+    positions: list[list[int]] = []
+
+    for request in requests:
+        stores = request.get("store_ids", [])
+        all_stores.update(dict.fromkeys(stores))
+        row: list[int] = []
+        for item in request.get("items", []):
+            key = item_key(item)
+            position = index.get(key)
+            if position is None:
+                position = index[key] = len(items)
+                items.append({"name": item.get("name", "")})
+                item_stores.append({})
+            item_stores[position].update(dict.fromkeys(stores))
+            row.append(position)
+        positions.append(row)
+
+    payload = {
+        "items": items,
+        "store_ids": list(all_stores),
+        "item_store_ids": [list(stores) for stores in item_stores],
+    }
+    return payload, positions
+
+
+def split_priced(
+    priced_union: dict[str, Any],
+    requests: list[dict[str, Any]],
+    positions: list[list[int]],
+) -> list[dict[str, Any]]:
+    """Per-request priced payloads carved out of the union pricing result."""
+
+    matched_union = priced_union.get("matched_items", [])
+    priced_union_items = priced_union.get("priced_items", [])
+    payloads: list[dict[str, Any]] = []
+
+    for request, row in zip(requests, positions):
+        stores = set(request.get("store_ids", []))
+        matched: list[dict[str, Any]] = []
+        priced: list[dict[str, Any]] = []
+        for item, position in zip(request.get("items", []), row):
+            shared = {
+                **matched_union[position],
+                "list_item": item,
+                "candidates": [
+                    candidate
+                    for candidate in matched_union[position].get("candidates", [])
+                    if candidate.get("store_id") in stores
+                ],
+            }
+            matched.append(shared)
+            priced.append(
+                {
+                    **shared,
+                    "offers": [
+                        offer
+                        for offer in priced_union_items[position].get("offers", [])
+                        if offer.get("store_id") in stores
+                    ],
+                }
+            )
+        payloads.append({"request": request, "matched_items": matched, "priced_items": priced})
+
+    return payloads
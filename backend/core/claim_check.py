@@ -0,0 +1,123 @@
+"""Claim-check storage for payloads passed between pipeline stages.
+
+With ``celery_claim_check`` enabled, a stage stores its output in the
+content-addressed ``pipeline_blobs`` table (zlib-compressed JSON keyed by its
+SHA-256) and hands the next stage a small reference instead::
+
+    {"$claim": "<sha256>", "bytes": 48213}
+
+Stages call :func:`resolve` on their input, so inline payloads and references are
+both accepted and the mode can be toggled without draining queues. Payloads under
+``claim_check_min_bytes`` stay inline, and so does everything when the database
+cannot be reached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.db import session_scope
+
+logger = logging.getLogger(__name__)
+
+CLAIM_KEY = "$claim"
+
+_recent: OrderedDict[str, Any] = OrderedDict()
+_recent_lock = threading.Lock()
+_RECENT_LIMIT = 32
+
+
+def is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and CLAIM_KEY in value
+
+
+def _remember(digest: str, payload: Any) -> None:
+    # Consecutive stages often run in the same worker; skip the round trip then.
+    with _recent_lock:
+        _recent[digest] = payload
+        _recent.move_to_end(digest)
+        while len(_recent) > _RECENT_LIMIT:
+            _recent.popitem(last=False)
+
+
+def _encode(payload: Any) -> tuple[str, bytes]:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest(), raw
+
+
+def put(payload: Any) -> Any:
+    """Return a reference to ``payload`` when claim-check applies, else ``payload``."""
+
+    if not settings.celery_claim_check or is_reference(payload):
+        return payload
+    digest, raw = _encode(payload)
+    if len(raw) < settings.claim_check_min_bytes:
+        return payload
+
+    try:
+        from sqlalchemy.dialects.postgresql import insert
+
+        from backend.core.schema import PipelineBlob
+
+        now = datetime.utcnow()
+        with session_scope() as session:
+            session.execute(
+                insert(PipelineBlob)
+                .values(
+                    digest=digest,
+                    payload=zlib.compress(raw, settings.claim_check_compression_level),
+                    size_bytes=len(raw),
+                    created_at=now,
+                )
+                # Storing the same content again restarts its retention, so purge()
+                # cannot drop a blob a newly queued stage still references.
+                .on_conflict_do_update(index_elements=["digest"], set_={"created_at": now})
+            )
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Claim-check write failed, passing payload inline: %s", exc)
+        return payload
+
+    _remember(digest, payload)
+    return {CLAIM_KEY: digest, "bytes": len(raw)}
+
+
+def resolve(value: Any) -> Any:
+    """Return the payload behind ``value`` if it is a reference, else ``value``."""
+
+    if not is_reference(value):
+        return value
+    digest = value[CLAIM_KEY]
+    with _recent_lock:
+        if digest in _recent:
+            return _recent[digest]
+
+    from backend.core.schema import PipelineBlob
+
+    with session_scope() as session:
+        blob = session.get(PipelineBlob, digest)
+        if blob is None:
+            raise LookupError(f"Claim-check payload {digest} not found")
+        payload = json.loads(zlib.decompress(blob.payload))
+    _remember(digest, payload)
+    return payload
+
+
+def purge(older_than: timedelta) -> int:
+    """Delete blobs created before ``older_than`` ago; return how many were removed."""
+
+    from sqlalchemy import delete
+
+    from backend.core.schema import PipelineBlob
+
+    cutoff = datetime.utcnow() - older_than
+    with session_scope() as session:
+        result = session.execute(delete(PipelineBlob).where(PipelineBlob.created_at < cutoff))
+        return result.rowcount or 0
@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from importlib import import_module
-from typing import Any, Generator
+from typing import Any, AsyncGenerator, Generator
 
 from backend.core.config import settings
 
@@ -13,6 +13,29 @@ logger = logging.getLogger(__name__)
 
 _engine: Any | None = None
 _session_factory: Any | None = None
+_async_engine: Any | None = None
+_async_session_factory: Any | None = None
+
+
+def _pool_options(url: str) -> dict[str, Any]:
+    """Connection pool sizing shared by the sync and async engines."""
+
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+
+def _instrument(engine: Any, name: str) -> None:
+    if settings.db_instrumentation_enabled:
+        from backend.core.db_metrics import get_db_instrumentation
+
+        get_db_instrumentation().attach(engine, name)
 
 
 def _bootstrap_sqlalchemy() -> tuple[Any, Any]:
@@ -36,7 +59,13 @@ def _bootstrap_sqlalchemy() -> tuple[Any, Any]:
     create_engine = getattr(sqlalchemy, "create_engine")
     sessionmaker = getattr(orm, "sessionmaker")
 
-    engine = create_engine(settings.database_url, future=True, echo=settings.debug)
+    engine = create_engine(
+        settings.database_url,
+        future=True,
+        echo=settings.debug,
+        **_pool_options(settings.database_url),
+    )
+    _instrument(engine, "sync")
     _engine = engine
     _session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
@@ -57,6 +86,82 @@ def get_session_factory() -> Any:
     return session_factory
 
 
+def _bootstrap_async_sqlalchemy() -> tuple[Any, Any]:
+    """Lazy-load the async engine used by request handlers.
+
+    ``postgresql+psycopg`` URLs work unchanged (SQLAlchemy selects psycopg's async
+    driver); ``SAVERY_ASYNC_DATABASE_URL`` can point at e.g. ``postgresql+asyncpg``.
+    """
+
+    global _async_engine, _async_session_factory
+
+    if _async_engine is not None and _async_session_factory is not None:
+        return _async_engine, _async_session_factory
+
+    try:
+        asyncio_ext = import_module("sqlalchemy.ext.asyncio")
+    except ModuleNotFoundError as exc:  # pragma: no cover - triggered only without dependency installed
+        message = (
+            "SQLAlchemy is required for database access. "
+            "Install it with `pip install SQLAlchemy psycopg[binary]`."
+        )
+        raise RuntimeError(message) from exc
+
+    url = settings.async_database_url or settings.database_url
+    _async_engine = asyncio_ext.create_async_engine(url, echo=settings.debug, **_pool_options(url))
+    _instrument(_async_engine, "async")
+    _async_session_factory = asyncio_ext.async_sessionmaker(
+        bind=_async_engine, autoflush=False, expire_on_commit=False
+    )
+    return _async_engine, _async_session_factory
+
+
+def get_async_engine() -> Any:
+    """Return the configured async SQLAlchemy engine."""
+
+    engine, _ = _bootstrap_async_sqlalchemy()
+    return engine
+
+
+def get_async_session_factory() -> Any:
+    """Return a configured ``async_sessionmaker``."""
+
+    _, session_factory = _bootstrap_async_sqlalchemy()
+    return session_factory
+
+
+def dispose_engine() -> None:
+    """Close pooled sync connections, e.g. in a worker parent before it forks."""
+
+    if _engine is not None:
+        _engine.dispose()
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (called on application shutdown)."""
+
+    global _async_engine, _async_session_factory
+
+    engine, _async_engine, _async_session_factory = _async_engine, None, None
+    if engine is not None:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncGenerator[Any, None]:
+    """Async counterpart of :func:`session_scope`."""
+
+    session = get_async_session_factory()()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 @contextmanager
 def session_scope() -> Generator[Any, None, None]:
     """Provide a transactional scope around operations for use in dependencies."""
@@ -0,0 +1,274 @@
+"""Connection-pool and statement instrumentation built on SQLAlchemy events.
+
+:func:`get_db_instrumentation` returns the process-wide collector that
+``core.db`` attaches to every engine it creates. It records
+
+* pool checkout wait time, checkouts, new connections and invalidations, plus
+  the pool's live size / checked-out / overflow gauges,
+* statement latency histograms, overall and per normalized SQL fingerprint,
+* a bounded sample of slow statements (fingerprint only, never parameters).
+
+``snapshot()`` returns everything as plain data for logs, ``/api/diagnostics/db``
+and the ``db_stats`` worker control command.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from backend.core import request_timing
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_RE = re.compile(r"(values\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint_sql(statement: str) -> str:
+    """Normalize ``statement`` so queries differing only in literals group together."""
+
+    text = _STRING_RE.sub("?", statement)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(?)", text)
+    text = _VALUES_RE.sub(r"\1", text)
+    return _SPACE_RE.sub(" ", text).strip().lower()
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram (Prometheus-style ``le`` buckets)."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative: dict[str, int] = {}
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[str(bound)] = seen
+        cumulative["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+class _PoolStats:
+    def __init__(self, engine: Any) -> None:
+        # Read the pool through the engine: Engine.dispose() swaps in a new one.
+        self.engine = engine
+        self.checkout_wait = LatencyHistogram()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        gauges: dict[str, Any] = {"class": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                gauges[name] = method()
+        return {
+            **gauges,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+        }
+
+
+class DatabaseInstrumentation:
+    """Collects pool and statement metrics from every attached engine."""
+
+    def __init__(
+        self,
+        *,
+        slow_query_seconds: float = 0.25,
+        slow_query_samples: int = 100,
+        max_fingerprints: int = 200,
+    ) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self.max_fingerprints = max_fingerprints
+        self.started_at = datetime.utcnow()
+        self._pools: dict[str, _PoolStats] = {}
+        self._statements = LatencyHistogram()
+        self._fingerprints: dict[str, LatencyHistogram] = {}
+        self._slow: deque[dict[str, Any]] = deque(maxlen=slow_query_samples)
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Any, name: str) -> None:
+        """Register event listeners on ``engine`` (sync or async) under ``name``."""
+
+        from sqlalchemy import event
+        from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+        sync_engine = getattr(engine, "sync_engine", engine)
+        pool = sync_engine.pool
+        stats = _PoolStats(sync_engine)
+        with self._lock:
+            self._pools[name] = stats
+
+        def time_checkouts(pool: Any) -> None:
+            # SQLAlchemy has no "checkout requested" event, so time the public
+            # Pool.connect() call that every checkout goes through.
+            connect = pool.connect
+
+            def timed_connect(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return connect(*args, **kwargs)
+                except PoolTimeoutError:
+                    stats.timeouts += 1
+                    raise
+                finally:
+                    with self._lock:
+                        stats.checkout_wait.observe(time.perf_counter() - started)
+
+            pool.connect = timed_connect
+
+        time_checkouts(pool)
+
+        @event.listens_for(sync_engine, "engine_disposed")
+        def _disposed(disposed: Any) -> None:
+            # dispose() replaces the pool with pool.recreate(); the pool event
+            # listeners carry over to it, the patched connect() does not.
+            time_checkouts(disposed.pool)
+
+        @event.listens_for(pool, "checkout")
+        def _checkout(*_: Any) -> None:
+            stats.checkouts += 1
+
+        @event.listens_for(pool, "connect")
+        def _connect(*_: Any) -> None:
+            stats.connects += 1
+
+        @event.listens_for(pool, "invalidate")
+        def _invalidate(*_: Any) -> None:
+            stats.invalidations += 1
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn: Any, cursor: Any, statement: str, *_: Any) -> None:
+            conn.info.setdefault("_savery_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            starts = conn.info.get("_savery_query_start")
+            if starts:
+                self.record_statement(statement, time.perf_counter() - starts.pop(), engine=name)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(context: Any) -> None:
+            connection = context.connection
+            starts = connection.info.get("_savery_query_start") if connection is not None else None
+            if starts:
+                starts.pop()
+
+    def record_statement(self, statement: str, seconds: float, *, engine: str = "default") -> None:
+        request_timing.record("db", seconds)
+        fingerprint = fingerprint_sql(statement)
+        with self._lock:
+            self._statements.observe(seconds)
+            histogram = self._fingerprints.get(fingerprint)
+            if histogram is None:
+                if len(self._fingerprints) >= self.max_fingerprints:
+                    fingerprint = "<other>"
+                histogram = self._fingerprints.setdefault(fingerprint, LatencyHistogram())
+            histogram.observe(seconds)
+            slow = seconds >= self.slow_query_seconds
+            if slow:
+                self._slow.append(
+                    {
+                        "fingerprint": fingerprint,
+                        "seconds": round(seconds, 6),
+                        "engine": engine,
+                        "at": datetime.utcnow().isoformat(),
+                    }
+                )
+        if slow:
+            logger.warning("Slow query (%.3fs): %s", seconds, fingerprint[:500])
+
+    def snapshot(self, *, top: int = 20) -> dict[str, Any]:
+        with self._lock:
+            pools = {name: stats.snapshot() for name, stats in self._pools.items()}
+            ranked = sorted(self._fingerprints.items(), key=lambda item: item[1].total, reverse=True)
+            statements = [
+                {"fingerprint": fingerprint, **histogram.snapshot()} for fingerprint, histogram in ranked[:top]
+            ]
+            return {
+                "since": self.started_at.isoformat(),
+                "pools": pools,
+                "statements": self._statements.snapshot(),
+                "top_statements": statements,
+                "slow_queries": list(self._slow),
+                "slow_query_seconds": self.slow_query_seconds,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            for stats in self._pools.values():
+                stats.checkout_wait = LatencyHistogram()
+                stats.checkouts = stats.connects = stats.invalidations = stats.timeouts = 0
+            self._statements = LatencyHistogram()
+            self._fingerprints.clear()
+            self._slow.clear()
+            self.started_at = datetime.utcnow()
+
+
+@lru_cache
+def get_db_instrumentation() -> DatabaseInstrumentation:
+    """Return the process-wide instrumentation collector."""
+
+    return DatabaseInstrumentation(
+        slow_query_seconds=settings.db_slow_query_seconds,
+        slow_query_samples=settings.db_slow_query_samples,
+        max_fingerprints=settings.db_max_fingerprints,
+    )
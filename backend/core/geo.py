@@ -0,0 +1,33 @@
+"""Geographic helpers shared by routing and store lookups."""
+
+from __future__ import annotations
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_matrix(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    other_latitudes: np.ndarray | None = None,
+    other_longitudes: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return great-circle distances in kilometres between two point sets.
+
+    When ``other_*`` is omitted the result is the symmetric pairwise matrix of the
+    first set. All inputs are degrees; the computation is fully vectorized.
+    """
+
+    lat1 = np.radians(np.asarray(latitudes, dtype=float))[:, None]
+    lon1 = np.radians(np.asarray(longitudes, dtype=float))[:, None]
+    if other_latitudes is None or other_longitudes is None:
+        lat2, lon2 = lat1.T, lon1.T
+    else:
+        lat2 = np.radians(np.asarray(other_latitudes, dtype=float))[None, :]
+        lon2 = np.radians(np.asarray(other_longitudes, dtype=float))[None, :]
+
+    half_dlat = np.sin((lat2 - lat1) / 2.0)
+    half_dlon = np.sin((lon2 - lon1) / 2.0)
+    a = half_dlat**2 + np.cos(lat1) * np.cos(lat2) * half_dlon**2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
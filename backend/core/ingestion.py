@@ -0,0 +1,232 @@
+"""Bulk price ingestion through PostgreSQL ``COPY``.
+
+Offers are streamed into a temporary staging table with ``COPY ... FROM STDIN``,
+then moved into ``prices`` by one set-based statement per batch that
+
+* keeps the last offer for each (store, product, observed_at) in the batch,
+* resolves ``store_id``/``product_id`` through ``stores.external_id`` and
+  ``products.external_id``,
+* skips observations already present in ``prices``.
+
+Rows whose store or product is unknown are counted as ``unresolved``. Use
+:func:`ingest_prices` from tasks and ``python -m backend.tools.ingest_prices`` from
+the shell.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable, Iterator, TextIO
+
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+STAGING_COLUMNS = (
+    "seq",
+    "store_external_id",
+    "product_external_id",
+    "list_price",
+    "promo_price",
+    "unit",
+    "currency",
+    "observed_at",
+    "raw_payload",
+)
+
+_CREATE_STAGING = """
+CREATE TEMP TABLE IF NOT EXISTS price_staging (
+    seq bigint NOT NULL,
+    store_external_id varchar(64) NOT NULL,
+    product_external_id varchar(128) NOT NULL,
+    list_price numeric(10, 2) NOT NULL,
+    promo_price numeric(10, 2),
+    unit varchar(32),
+    currency varchar(8) NOT NULL,
+    observed_at timestamp NOT NULL,
+    raw_payload jsonb
+) ON COMMIT DELETE ROWS
+"""
+
+_MERGE_STAGING = """
+WITH deduped AS (
+    SELECT DISTINCT ON (store_external_id, product_external_id, observed_at) *
+    FROM price_staging
+    ORDER BY store_external_id, product_external_id, observed_at, seq DESC
+),
+resolved AS (
+    SELECT s.id AS store_id, p.id AS product_id, d.*
+    FROM deduped d
+    JOIN stores s ON s.external_id = d.store_external_id
+    JOIN products p ON p.external_id = d.product_external_id
+),
+inserted AS (
+    INSERT INTO prices (
+        store_id, product_id, list_price, promo_price, unit, currency, observed_at, raw_payload
+    )
+    SELECT r.store_id, r.product_id, r.list_price, r.promo_price, r.unit, r.currency,
+           r.observed_at, r.raw_payload
+    FROM resolved r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM prices existing
+        WHERE existing.store_id = r.store_id
+          AND existing.product_id = r.product_id
+          AND existing.observed_at = r.observed_at
+    )
+    RETURNING 1
+)
+SELECT
+    (SELECT count(*) FROM deduped),
+    (SELECT count(*) FROM resolved),
+    (SELECT count(*) FROM inserted)
+"""
+
+
+class InvalidPriceRecord(ValueError):
+    """Raised when an input record is missing a required field or is malformed."""
+
+
+@dataclass
+class IngestionReport:
+    """Counters and throughput for one ingestion run."""
+
+    received: int = 0
+    rejected: int = 0
+    deduplicated: int = 0
+    unresolved: int = 0
+    existing: int = 0
+    inserted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.received / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second, 1)}
+
+
+def _decimal(value: Any, field: str, *, required: bool) -> Decimal | None:
+    if value in (None, ""):
+        if required:
+            raise InvalidPriceRecord(f"missing {field}")
+        return None
+    try:
+        return Decimal(str(value)).quantize(Decimal("0.01"))
+    except InvalidOperation as exc:
+        raise InvalidPriceRecord(f"invalid {field}: {value!r}") from exc
+
+
+def _timestamp(value: Any) -> datetime:
+    """Parse ``observed_at`` as naive UTC, the form ``prices.observed_at`` stores.
+
+    The staging column is ``timestamp`` without time zone, so ``COPY`` would drop
+    an offset rather than apply it; aware values are converted here first.
+    """
+
+    if value in (None, ""):
+        return datetime.utcnow()
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError as exc:
+            raise InvalidPriceRecord(f"invalid observed_at: {value!r}") from exc
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def coerce_record(record: dict[str, Any]) -> tuple[Any, ...]:
+    """Validate ``record`` and return the staging row without ``seq``."""
+
+    store = record.get("store_external_id")
+    product = record.get("product_external_id")
+    if not store or not product:
+        raise InvalidPriceRecord("missing store_external_id or product_external_id")
+    raw_payload = record.get("raw_payload")
+    return (
+        str(store),
+        str(product),
+        _decimal(record.get("list_price"), "list_price", required=True),
+        _decimal(record.get("promo_price"), "promo_price", required=False),
+        record.get("unit") or None,
+        record.get("currency") or "USD",
+        _timestamp(record.get("observed_at")),
+        json.dumps(raw_payload) if raw_payload is not None else None,
+    )
+
+
+def read_records(stream: TextIO, *, fmt: str = "csv") -> Iterator[dict[str, Any]]:
+    """Yield price records from a CSV (with header) or JSON-lines stream."""
+
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"unsupported format {fmt!r}")
+
+
+def ingest_prices(records: Iterable[dict[str, Any]], *, batch_size: int = 50_000) -> IngestionReport:
+    """Stream ``records`` into ``prices`` in batches of ``batch_size``.
+
+    Each batch runs in its own transaction: COPY into staging, then the merge
+    statement. Malformed records are skipped and counted as ``rejected``.
+    """
+
+    report = IngestionReport()
+    started = time.perf_counter()
+    connection = get_engine().raw_connection()
+    try:
+        batch: list[tuple[Any, ...]] = []
+        for record in records:
+            report.received += 1
+            try:
+                batch.append((report.received, *coerce_record(record)))
+            except InvalidPriceRecord as exc:
+                report.rejected += 1
+                logger.debug("Rejected price record %d: %s", report.received, exc)
+                continue
+            if len(batch) >= batch_size:
+                _flush(connection, batch, report)
+                batch = []
+        if batch:
+            _flush(connection, batch, report)
+    finally:
+        connection.close()
+
+    report.seconds = time.perf_counter() - started
+    logger.info("Price ingestion finished: %s", report.as_dict())
+    return report
+
+
+def _flush(connection: Any, batch: list[tuple[Any, ...]], report: IngestionReport) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute(_CREATE_STAGING)
+        with cursor.copy(f"COPY price_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN") as copy:
+            for row in batch:
+                copy.write_row(row)
+        cursor.execute(_MERGE_STAGING)
+        deduped, resolved, inserted = cursor.fetchone()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    report.batches += 1
+    report.deduplicated += len(batch) - deduped
+    report.unresolved += deduped - resolved
+    report.existing += resolved - inserted
+    report.inserted += inserted
@@ -0,0 +1,235 @@
+"""Durable job state and results in the ``optimization_jobs`` table.
+
+The API inserts a ``pending`` row when it enqueues a job; worker signals move it
+through ``running`` (with the current stage) to ``succeeded`` or ``failed``. The
+final result is stored zlib-compressed in ``result_compressed``.
+
+:func:`load_job` is a unique-index lookup on ``task_id`` behind an in-process
+read-through cache: finished jobs are cached for ``job_result_ttl_seconds``,
+unfinished ones for ``job_status_cache_seconds`` so frequent polling collapses to
+one query per interval.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+from backend.core.config import settings
+from backend.core.db import session_scope
+from backend.core.producer import INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = {SUCCEEDED, FAILED}
+
+CELERY_STATES = {PENDING: "PENDING", RUNNING: "STARTED", SUCCEEDED: "SUCCESS", FAILED: "FAILURE"}
+
+
+def compress_result(result: Any) -> bytes:
+    raw = json.dumps(result, separators=(",", ":"), default=str).encode("utf-8")
+    return zlib.compress(raw, settings.claim_check_compression_level)
+
+
+def decompress_result(blob: bytes | None) -> Any:
+    return json.loads(zlib.decompress(blob)) if blob else None
+
+
+class _StatusCache:
+    """Small LRU of job snapshots with per-entry expiry."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            expires, snapshot = entry
+            if expires < time.monotonic():
+                del self._entries[job_id]
+                return None
+            self._entries.move_to_end(job_id)
+            return snapshot
+
+    def put(self, job_id: str, snapshot: dict[str, Any], ttl: float) -> None:
+        with self._lock:
+            self._entries[job_id] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(job_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, job_id: str) -> None:
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+
+_cache = _StatusCache(max_entries=2048)
+
+
+def create_job(job_id: str, payload: dict[str, Any], lane: str = INTERACTIVE) -> None:
+    """Record a newly enqueued job (best effort; the pipeline runs regardless)."""
+
+    try:
+        from backend.core.schema import OptimizationJob
+
+        with session_scope() as session:
+            session.add(OptimizationJob(task_id=job_id, input_payload=payload, status=PENDING, lane=lane))
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Could not record job %s: %s", job_id, exc)
+
+
+def update_job(
+    job_id: str,
+    status: str,
+    *,
+    stage: str | None = None,
+    error: str | None = None,
+    result: Any = None,
+) -> None:
+    """Apply a status transition; finished jobs are never moved back to running."""
+
+    update_jobs([job_id], status, stage=stage, error=error, result=result)
+
+
+def update_jobs(
+    job_ids: Sequence[str],
+    status: str,
+    *,
+    stage: str | None = None,
+    error: str | None = None,
+    result: Any = None,
+) -> None:
+    """:func:`update_job` for several jobs in one statement (the members of a batch)."""
+
+    values: dict[str, Any] = {"status": status, "updated_at": datetime.utcnow()}
+    if stage is not None:
+        values["stage"] = stage
+    if error is not None:
+        values["error"] = error
+    if result is not None:
+        values["result_compressed"] = compress_result(result)
+
+    try:
+        from sqlalchemy import update
+
+        from backend.core.schema import OptimizationJob
+
+        statement = update(OptimizationJob).where(OptimizationJob.task_id.in_(list(job_ids)))
+        if status not in FINISHED:
+            statement = statement.where(OptimizationJob.status.notin_(sorted(FINISHED)))
+        with session_scope() as session:
+            session.execute(statement.values(**values))
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Could not update jobs %s to %s: %s", ", ".join(job_ids), status, exc)
+    for job_id in job_ids:
+        _cache.discard(job_id)
+
+
+def invalidate(job_id: str) -> None:
+    """Drop the cached snapshot so the next :func:`load_job` reads the table."""
+
+    _cache.discard(job_id)
+
+
+def _snapshot(row: Any) -> dict[str, Any]:
+    succeeded = row.status == SUCCEEDED
+    result = decompress_result(row.result_compressed) if succeeded else None
+    if row.status == FAILED:
+        result = {"error": row.error, "stage": row.stage}
+    return {
+        "id": row.task_id,
+        "status": CELERY_STATES.get(row.status, row.status.upper()),
+        "ready": row.status in FINISHED,
+        "successful": succeeded,
+        "result": result,
+        "stage": row.stage,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+def load_job(job_id: str) -> dict[str, Any] | None:
+    """Return the job's status snapshot, or ``None`` if it is not recorded."""
+
+    cached = _cache.get(job_id)
+    if cached is not None:
+        return cached
+    try:
+        from sqlalchemy import select
+
+        from backend.core.schema import OptimizationJob
+
+        with session_scope() as session:
+            row = session.execute(
+                select(OptimizationJob).where(OptimizationJob.task_id == job_id)
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+            snapshot = _snapshot(row)
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Could not load job %s: %s", job_id, exc)
+        return None
+
+    ttl = settings.job_result_ttl_seconds if snapshot["ready"] else settings.job_status_cache_seconds
+    _cache.put(job_id, snapshot, ttl)
+    return snapshot
+
+
+def recent_latency(
+    window: timedelta, *, lane: str = INTERACTIVE, quantile: float = 0.9, limit: int = 500
+) -> float | None:
+    """``quantile`` of enqueue-to-finish seconds over jobs in ``lane`` finished within ``window``.
+
+    Looks at the ``limit`` most recent jobs only; ``None`` when there are none.
+    """
+
+    try:
+        from sqlalchemy import select
+
+        from backend.core.schema import OptimizationJob
+
+        with session_scope() as session:
+            rows = session.execute(
+                select(OptimizationJob.created_at, OptimizationJob.updated_at)
+                .where(
+                    OptimizationJob.lane == lane,
+                    OptimizationJob.status.in_(sorted(FINISHED)),
+                    OptimizationJob.updated_at >= datetime.utcnow() - window,
+                )
+                .order_by(OptimizationJob.updated_at.desc())
+                .limit(limit)
+            ).all()
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Could not read recent job latency: %s", exc)
+        return None
+    if not rows:
+        return None
+    durations = sorted((updated_at - created_at).total_seconds() for created_at, updated_at in rows)
+    return durations[min(int(quantile * len(durations)), len(durations) - 1)]
+
+
+def purge_jobs(older_than: timedelta) -> int:
+    """Delete jobs last updated before ``older_than`` ago; return how many were removed."""
+
+    from sqlalchemy import delete
+
+    from backend.core.schema import OptimizationJob
+
+    cutoff = datetime.utcnow() - older_than
+    with session_scope() as session:
+        result = session.execute(delete(OptimizationJob).where(OptimizationJob.updated_at < cutoff))
+        return result.rowcount or 0
@@ -0,0 +1,127 @@
+"""The ``latest_prices`` materialized view: newest observation per (product, store).
+
+``prices`` keeps the full history, so "current price of P at S" over a shopping
+list used to be a window function over every observation of those pairs. The
+view holds one row per pair (unique index on ``product_id, store_id``), which
+turns the lookup into an index probe per key.
+
+The view is refreshed ``CONCURRENTLY`` after bulk ingestion and periodically by
+beat (``workers.maintenance.refresh_latest_prices``). Rows written since the last
+refresh are picked up by :data:`LOOKUP_SQL` from ``prices`` itself: for each
+requested pair, rows observed at or after the pair's view row (all rows when the
+pair is not in the view yet), through the ``(product_id, store_id, observed_at
+DESC)`` index. Readers therefore get the newest observation in the table even
+when a late insert carries an older feed timestamp than the last refresh.
+
+The view DDL lives here and is registered with Alembic through
+``backend.core.alembic_entities``.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+VIEW_NAME = "latest_prices"
+
+VIEW_DEFINITION = """
+SELECT DISTINCT ON (p.product_id, p.store_id)
+    p.product_id,
+    p.store_id,
+    p.id AS price_id,
+    p.list_price,
+    p.promo_price,
+    p.currency,
+    p.unit,
+    p.observed_at,
+    p.raw_payload
+FROM prices p
+ORDER BY p.product_id, p.store_id, p.observed_at DESC, p.id DESC
+"""
+
+# Arbitrary constant identifying the refresh in pg_try_advisory_lock().
+_REFRESH_LOCK_KEY = 0x5A7E_0016
+
+# Current row per key: the view's row, plus anything written to ``prices`` for that
+# pair since the view's row was observed. The bound is per pair, not the view's
+# overall max(observed_at): ingestion keeps feed timestamps, so a row inserted
+# after the last refresh may carry an older time than other pairs' view rows.
+CANDIDATES_SQL = """
+    SELECT lp.product_id, lp.store_id, lp.price_id, lp.list_price, lp.promo_price, lp.currency,
+           lp.unit, lp.observed_at, lp.raw_payload
+    FROM latest_prices lp
+    JOIN keys USING (product_id, store_id)
+    UNION ALL
+    SELECT p.product_id, p.store_id, p.id AS price_id, p.list_price, p.promo_price, p.currency,
+           p.unit, p.observed_at, p.raw_payload
+    FROM keys
+    LEFT JOIN latest_prices lp USING (product_id, store_id)
+    JOIN prices p ON p.product_id = keys.product_id AND p.store_id = keys.store_id
+    WHERE lp.observed_at IS NULL OR p.observed_at >= lp.observed_at
+"""
+
+LOOKUP_SQL = f"""
+WITH keys AS (
+    SELECT k.product_id, s.id AS store_id, s.external_id
+    FROM unnest(CAST(:product_ids AS integer[]), CAST(:store_ids AS varchar[]))
+        AS k(product_id, store_external_id)
+    JOIN stores s ON s.external_id = k.store_external_id
+),
+candidates AS ({CANDIDATES_SQL})
+SELECT DISTINCT ON (c.product_id, c.store_id)
+    c.product_id, keys.external_id, c.list_price, c.promo_price, c.currency, c.unit,
+    c.observed_at, c.raw_payload, products.name
+FROM candidates c
+JOIN keys USING (product_id, store_id)
+JOIN products ON products.id = c.product_id
+ORDER BY c.product_id, c.store_id, c.observed_at DESC, c.price_id DESC
+"""
+
+
+def fetch_latest(session: Any, keys: list[tuple[int, str]]) -> list[Any]:
+    """Latest price rows for ``(product_id, store_external_id)`` pairs, one query.
+
+    Rows are ``(product_id, store_external_id, list_price, promo_price, currency,
+    unit, observed_at, raw_payload, product_name)``.
+    """
+
+    from sqlalchemy import text
+
+    if not keys:
+        return []
+    product_ids, store_ids = zip(*keys)
+    return session.execute(
+        text(LOOKUP_SQL), {"product_ids": list(product_ids), "store_ids": list(store_ids)}
+    ).all()
+
+
+def refresh_latest_prices(*, concurrently: bool = True) -> bool:
+    """Refresh the view; return ``False`` if another process is already refreshing it.
+
+    ``CONCURRENTLY`` keeps the view readable during the refresh (it needs the
+    unique index created by the migration). Only one refresh runs at a time,
+    guarded by a session-level advisory lock.
+    """
+
+    from sqlalchemy import text
+
+    statement = f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{VIEW_NAME}"
+    with get_engine().connect() as connection:
+        locked = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _REFRESH_LOCK_KEY}
+        ).scalar()
+        connection.commit()
+        if not locked:
+            return False
+        try:
+            connection.execute(text(statement))
+            connection.commit()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _REFRESH_LOCK_KEY})
+            connection.commit()
+    logger.info("Refreshed %s", VIEW_NAME)
+    return True
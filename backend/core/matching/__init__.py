@@ -0,0 +1,18 @@
+"""Product matching engines used by the matching stage."""
+
+from .catalog import CatalogIndex, get_catalog_index, set_catalog_index
+from .embeddings import EmbeddingCatalog, EmbeddingIndex, get_embedding_catalog, set_embedding_catalog
+from .text_index import ProductMatch, ProductTextIndex, extract_features
+
+__all__ = [
+    "CatalogIndex",
+    "EmbeddingCatalog",
+    "EmbeddingIndex",
+    "ProductMatch",
+    "ProductTextIndex",
+    "extract_features",
+    "get_catalog_index",
+    "get_embedding_catalog",
+    "set_catalog_index",
+    "set_embedding_catalog",
+]
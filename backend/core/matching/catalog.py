@@ -0,0 +1,179 @@
+"""Process-wide product catalog index with incremental refresh."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.db import session_scope
+
+from .text_index import ProductTextIndex
+
+logger = logging.getLogger(__name__)
+
+
+def product_text(name: str, brand: str | None) -> str:
+    """Text indexed for a product: brand and name, so either can match."""
+
+    return f"{brand} {name}" if brand else name
+
+
+def _load_products(since: datetime | None = None) -> list[tuple[int, str, datetime]]:
+    from backend.core.schema import Product
+
+    with session_scope() as session:
+        query = session.query(Product.id, Product.name, Product.brand, Product.updated_at)
+        if since is not None:
+            # Inclusive: a row committed late with the watermark's timestamp would
+            # otherwise be skipped for good. Refresh drops the ones already applied.
+            query = query.filter(Product.updated_at >= since)
+        return [
+            (product_id, product_text(name, brand), updated_at)
+            for product_id, name, brand, updated_at in query.yield_per(10_000)
+        ]
+
+
+def _count_products() -> int:
+    from backend.core.schema import Product
+
+    with session_scope() as session:
+        return session.query(Product.id).count()
+
+
+def _load_product_ids() -> set[int]:
+    from backend.core.schema import Product
+
+    with session_scope() as session:
+        return {product_id for (product_id,) in session.query(Product.id).yield_per(50_000)}
+
+
+def _at(rows: list[tuple[int, str, datetime]], watermark: datetime | None) -> set[int]:
+    return {product_id for product_id, _, updated_at in rows if updated_at == watermark}
+
+
+class CatalogIndex:
+    """Holds the current :class:`ProductTextIndex` and keeps it in sync with Postgres.
+
+    The index is built once per worker process (or once in the prefork parent,
+    see ``core.warmup``). :meth:`refresh` builds the next version from products
+    updated since the last watermark, either as a delta over the shared base
+    arrays or as a compacted rebuild once the delta grows too large, and swaps it
+    in with one assignment; readers holding the previous ``index`` are unaffected.
+
+    Deleted products leave no row to pick up, so each refresh compares the
+    catalog's row count with the index and, when they differ, diffs the id sets
+    and drops the products that are gone.
+    """
+
+    def __init__(
+        self,
+        index: ProductTextIndex,
+        watermark: datetime | None,
+        seen: set[int] | None = None,
+    ) -> None:
+        self.index = index
+        self.watermark = watermark
+        # Ids already applied with ``updated_at == watermark``; the inclusive
+        # refresh query returns them again.
+        self._seen = seen or set()
+        self.version = 1
+        self.refreshed_at = time.monotonic()
+        # Set when a background refresher owns refreshes; lookups then skip them.
+        self.background_refresh = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> "CatalogIndex":
+        rows = _load_products()
+        index = ProductTextIndex.build([row[0] for row in rows], [row[1] for row in rows])
+        watermark = max((row[2] for row in rows), default=None)
+        logger.info("Built product index with %d products", len(rows))
+        return cls(index, watermark, _at(rows, watermark))
+
+    def refresh(self) -> int:
+        """Apply products changed or deleted since the watermark; return how many."""
+
+        with self._lock:
+            rows = [
+                row
+                for row in _load_products(self.watermark)
+                if row[2] != self.watermark or row[0] not in self._seen
+            ]
+            index = self.index
+            if rows:
+                index = index.updated((product_id, text) for product_id, text, _ in rows)
+            removed: list[int] = []
+            if _count_products() != len(index):
+                live = _load_product_ids()
+                removed = [int(pid) for pid in index.live_product_ids() if int(pid) not in live]
+                if removed:
+                    index = index.updated((), removed)
+            if rows or removed:
+                if index.needs_compaction:
+                    index = index.compacted()
+                self.index = index
+                self.version += 1
+            if rows:
+                watermark = max(row[2] for row in rows)
+                seen = _at(rows, watermark)
+                self._seen = seen | self._seen if watermark == self.watermark else seen
+                self.watermark = watermark
+            self.refreshed_at = time.monotonic()
+            return len(rows) + len(removed)
+
+    def refresh_if_due(self, interval: float) -> None:
+        if time.monotonic() - self.refreshed_at < interval:
+            return
+        try:
+            self.refresh()
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Product index refresh failed: %s", exc)
+            self.refreshed_at = time.monotonic()
+
+
+_catalog: CatalogIndex | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_index() -> CatalogIndex | None:
+    """Return the worker's catalog index, building it on first use.
+
+    Returns ``None`` when the catalog cannot be loaded (e.g. no database), so
+    callers can degrade to unmatched candidates.
+    """
+
+    global _catalog
+
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                try:
+                    _catalog = CatalogIndex.load()
+                except Exception as exc:  # pragma: no cover - depends on database availability
+                    logger.warning("Product catalog unavailable: %s", exc)
+                    return None
+    if not _catalog.background_refresh:
+        _catalog.refresh_if_due(settings.matching_refresh_seconds)
+    return _catalog
+
+
+def set_catalog_index(catalog: CatalogIndex | None) -> None:
+    """Install ``catalog`` as the process-wide index (used by warm-up and tests)."""
+
+    global _catalog
+    _catalog = catalog
+
+
+def catalog_stats() -> dict[str, Any]:
+    if _catalog is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "products": len(_catalog.index),
+        "version": _catalog.version,
+        "watermark": _catalog.watermark.isoformat() if _catalog.watermark else None,
+    }
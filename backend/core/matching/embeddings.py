@@ -0,0 +1,502 @@
+"""IVF approximate nearest-neighbour index over product embeddings.
+
+``Product.vector_embedding`` is exported once into contiguous float32 ``.npy``
+files (L2-normalized, grouped by IVF list) that every worker process opens with
+``mmap_mode="r"``. The OS page cache then holds a single copy of the vectors no
+matter how many processes search them.
+
+Layout of one index version directory::
+
+    ids.npy        int64  (n,)     product id of each row
+    vectors.npy    float32 (n, d)  unit vectors, rows grouped by IVF list
+    centroids.npy  float32 (L, d)  spherical k-means centroids
+    offsets.npy    int64  (L + 1,) row range of each list
+    WATERMARK      latest ``products.updated_at`` included (ISO format)
+
+``<root>/CURRENT`` names the active version and is swapped atomically after a
+rebuild. Products added since the build are kept in an in-memory delta that is
+searched exhaustively until the next rebuild. Opening, rebuilding, saving and
+pruning versions happen under an exclusive lock on ``<root>/.lock``, so one
+process on the host rebuilds and the others adopt its version.
+"""
+
+from __future__ import annotations
+
+import copy
+import fcntl
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_FILES = ("ids", "vectors", "centroids", "offsets")
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return ``vectors`` as float32 rows scaled to unit length (zero rows stay zero)."""
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.float32(1e-12))
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_lists: int,
+    *,
+    iterations: int = 10,
+    sample_size: int = 65_536,
+    seed: int = 0,
+) -> np.ndarray:
+    """Cluster unit ``vectors`` by cosine similarity and return unit centroids."""
+
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    n_lists = max(1, min(n_lists, len(vectors)))
+    centroids = np.array(vectors[rng.choice(len(vectors), n_lists, replace=False)])
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty lists with random points so every list stays useful.
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+    return np.concatenate(
+        [np.argmax(vectors[i : i + chunk] @ centroids.T, axis=1) for i in range(0, len(vectors), chunk)]
+    ) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+class EmbeddingIndex:
+    """Top-k cosine search over an IVF-partitioned, memory-mapped vector set."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        *,
+        nprobe: int = 8,
+        rebuild_threshold: int = 10_000,
+        path: Path | None = None,
+    ) -> None:
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+        self.rebuild_threshold = rebuild_threshold
+        self.path = path
+        self.dimension = int(vectors.shape[1]) if vectors.ndim == 2 else int(centroids.shape[1])
+
+        self._row_of = {int(pid): row for row, pid in enumerate(ids)}
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._delta_ids = np.zeros(0, dtype=np.int64)
+        self._delta_vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[int],
+        vectors: np.ndarray,
+        *,
+        n_lists: int | None = None,
+        iterations: int = 10,
+        **options,
+    ) -> "EmbeddingIndex":
+        """Normalize ``vectors``, partition them with k-means and group rows by list."""
+
+        vectors = normalize(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(ids))) or 1
+        if len(ids):
+            centroids = spherical_kmeans(vectors, n_lists, iterations=iterations)
+        else:
+            centroids = np.zeros((1, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32)
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=len(centroids)), out=offsets[1:])
+        return cls(ids[order], vectors[order], centroids, offsets, **options)
+
+    @classmethod
+    def open(cls, root: str | os.PathLike[str], **options) -> "EmbeddingIndex | None":
+        """Memory-map the active version under ``root``; ``None`` if none was saved."""
+
+        root = Path(root)
+        try:
+            version = (root / "CURRENT").read_text().strip()
+        except FileNotFoundError:
+            return None
+        path = root / version
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in _FILES}
+        return cls(
+            arrays["ids"],
+            arrays["vectors"],
+            np.asarray(arrays["centroids"]),
+            np.asarray(arrays["offsets"]),
+            path=path,
+            **options,
+        )
+
+    def save(self, root: str | os.PathLike[str], *, watermark: datetime | None = None) -> Path:
+        """Write the base segment as a new version under ``root`` and make it active.
+
+        Older versions are removed, so callers sharing ``root`` must hold
+        :func:`host_lock` around this and around :meth:`open`.
+        """
+
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        version = f"v{time.time_ns()}"
+        staging = Path(tempfile.mkdtemp(dir=root, prefix=".staging-"))
+        for name in _FILES:
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        if watermark is not None:
+            (staging / "WATERMARK").write_text(watermark.isoformat())
+        staging.rename(root / version)
+
+        pointer = root / ".CURRENT.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, root / "CURRENT")
+        _prune_versions(root, keep=version)
+        self.path = root / version
+        return self.path
+
+    def __len__(self) -> int:
+        return int(self._alive.sum()) + len(self._delta_ids)
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return len(self._delta_ids) > self.rebuild_threshold
+
+    def updated(self, ids: Sequence[int], vectors: np.ndarray) -> "EmbeddingIndex":
+        """Return a copy with ``ids`` added or replaced, leaving this index untouched.
+
+        The copy shares the (memory-mapped) base arrays; only the liveness mask
+        and the delta are its own.
+        """
+
+        clone = copy.copy(self)
+        with self._lock:
+            clone._alive = self._alive.copy()
+            clone._delta_ids = self._delta_ids
+            clone._delta_vectors = self._delta_vectors
+        clone._lock = threading.Lock()
+        clone.add(ids, vectors)
+        return clone
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Add or replace products without rewriting the mapped base segment."""
+
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        vectors = normalize(vectors)
+        with self._lock:
+            for product_id in ids:
+                row = self._row_of.get(int(product_id))
+                if row is not None:
+                    self._alive[row] = False
+            keep = ~np.isin(self._delta_ids, ids)
+            self._delta_ids = np.concatenate([self._delta_ids[keep], ids])
+            self._delta_vectors = np.concatenate([self._delta_vectors[keep], vectors])
+
+    def rebuilt(self, **options) -> "EmbeddingIndex":
+        """Return a new index over live base rows plus the delta, re-clustered."""
+
+        with self._lock:
+            ids = np.concatenate([np.asarray(self.ids)[self._alive], self._delta_ids])
+            vectors = np.concatenate([np.asarray(self.vectors)[self._alive], self._delta_vectors])
+        options.setdefault("nprobe", self.nprobe)
+        options.setdefault("rebuild_threshold", self.rebuild_threshold)
+        return EmbeddingIndex.build(ids, vectors, **options)
+
+    def vectors_for(self, product_ids: Iterable[int]) -> dict[int, np.ndarray]:
+        """Return the stored unit vector of each known product."""
+
+        with self._lock:
+            delta = {int(pid): row for row, pid in enumerate(self._delta_ids)}
+            found: dict[int, np.ndarray] = {}
+            for product_id in product_ids:
+                if product_id in delta:
+                    found[product_id] = self._delta_vectors[delta[product_id]]
+                elif (row := self._row_of.get(product_id)) is not None and self._alive[row]:
+                    found[product_id] = np.asarray(self.vectors[row])
+        return found
+
+    def search(self, queries: np.ndarray, *, k: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(ids, scores)`` of shape ``(m, k)`` for ``m`` query vectors.
+
+        Each query probes its ``nprobe`` closest lists. Queries are grouped by
+        list so every probed list is scored once with a single matrix product for
+        all queries that need it. Missing results are padded with id ``-1``.
+        """
+
+        queries = normalize(np.atleast_2d(queries))
+        m = len(queries)
+        candidate_ids: list[list[np.ndarray]] = [[] for _ in range(m)]
+        candidate_scores: list[list[np.ndarray]] = [[] for _ in range(m)]
+
+        if len(self.ids):
+            nprobe = min(self.nprobe, len(self.centroids))
+            centroid_scores = queries @ self.centroids.T
+            probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+            query_of = np.repeat(np.arange(m), nprobe)
+            lists = probes.ravel()
+            order = np.argsort(lists, kind="stable")
+            lists, query_of = lists[order], query_of[order]
+            starts = np.flatnonzero(np.r_[True, lists[1:] != lists[:-1]])
+            ends = np.r_[starts[1:], len(lists)]
+
+            for start, end in zip(starts, ends):
+                lo, hi = self.offsets[lists[start]], self.offsets[lists[start] + 1]
+                if lo == hi:
+                    continue
+                members = query_of[start:end]
+                block = np.asarray(self.vectors[lo:hi]) @ queries[members].T
+                block[~self._alive[lo:hi]] = -np.inf
+                top = min(k, hi - lo)
+                best = np.argpartition(-block, top - 1, axis=0)[:top]
+                for column, query in enumerate(members):
+                    rows = best[:, column]
+                    candidate_ids[query].append(np.asarray(self.ids[lo + rows]))
+                    candidate_scores[query].append(block[rows, column])
+
+        with self._lock:
+            delta_ids, delta_vectors = self._delta_ids, self._delta_vectors
+        if len(delta_ids):
+            delta_scores = queries @ delta_vectors.T
+            for query in range(m):
+                candidate_ids[query].append(delta_ids)
+                candidate_scores[query].append(delta_scores[query])
+
+        result_ids = np.full((m, k), -1, dtype=np.int64)
+        result_scores = np.full((m, k), -np.inf, dtype=np.float32)
+        for query in range(m):
+            if not candidate_ids[query]:
+                continue
+            ids = np.concatenate(candidate_ids[query])
+            scores = np.concatenate(candidate_scores[query])
+            valid = np.isfinite(scores)
+            ids, scores = ids[valid], scores[valid]
+            top = np.argsort(-scores, kind="stable")[:k]
+            result_ids[query, : len(top)] = ids[top]
+            result_scores[query, : len(top)] = scores[top]
+        return result_ids, result_scores
+
+
+@contextmanager
+def host_lock(root: Path) -> Iterator[None]:
+    """Exclusive lock serializing version changes under ``root`` across processes."""
+
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _saved_watermark(index: EmbeddingIndex) -> datetime | None:
+    try:
+        return datetime.fromisoformat((index.path / "WATERMARK").read_text()) if index.path else None
+    except FileNotFoundError:
+        return None
+
+
+def _prune_versions(root: Path, *, keep: str) -> None:
+    # Processes that still map an older version keep their pages until they
+    # reopen; unlinking only removes the directory entry.
+    for entry in root.iterdir():
+        if entry.is_dir() and entry.name.startswith("v") and entry.name != keep:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+# Rows fetched per round trip while exporting, and the initial size of a delta.
+_EXPORT_CHUNK_ROWS = 2_000
+_DELTA_ROWS = 1_024
+
+
+def load_embeddings(
+    since: datetime | None = None,
+    *,
+    dimension: int | None = None,
+) -> tuple[list[int], np.ndarray, datetime | None]:
+    """Read product embeddings from Postgres into one contiguous float32 array.
+
+    Rows are streamed in chunks straight into a preallocated array (sized from a
+    row count for a full export, doubled when more rows arrive), so the catalog
+    is never held as Python floats. Rows whose embedding is missing or has a
+    different dimension are skipped. Returns ``(ids, vectors, watermark)``.
+    """
+
+    from backend.core.db import session_scope
+    from backend.core.schema import Product
+
+    ids: list[int] = []
+    array: np.ndarray | None = None
+    watermark: datetime | None = since
+    with session_scope() as session:
+        query = session.query(Product.id, Product.vector_embedding, Product.updated_at).filter(
+            Product.vector_embedding.isnot(None)
+        )
+        if since is not None:
+            query = query.filter(Product.updated_at > since)
+        expected = query.order_by(None).count() if since is None else _DELTA_ROWS
+        for product_id, embedding, updated_at in query.yield_per(_EXPORT_CHUNK_ROWS):
+            if not isinstance(embedding, list) or not embedding:
+                continue
+            if dimension is None:
+                dimension = len(embedding)
+            if len(embedding) != dimension:
+                continue
+            if array is None:
+                array = np.empty((max(expected, 1), dimension), dtype=np.float32)
+            elif len(ids) == len(array):
+                grown = np.empty((len(array) * 2, dimension), dtype=np.float32)
+                grown[: len(array)] = array
+                array = grown
+            array[len(ids)] = embedding
+            ids.append(product_id)
+            if watermark is None or updated_at > watermark:
+                watermark = updated_at
+    if array is None:
+        return ids, np.zeros((0, dimension or 0), dtype=np.float32), watermark
+    if len(ids) < len(array):
+        # Shrink in place (realloc) rather than copying the export.
+        array.resize((len(ids), dimension), refcheck=False)
+    return ids, array, watermark
+
+
+class EmbeddingCatalog:
+    """Worker-wide embedding index kept in sync with ``products.vector_embedding``."""
+
+    def __init__(self, root: Path, index: EmbeddingIndex, watermark: datetime | None) -> None:
+        self.root = root
+        self.index = index
+        self.watermark = watermark
+        self.refreshed_at = time.monotonic()
+        # Set when a background refresher owns refreshes; lookups then skip them.
+        self.background_refresh = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, root: str | os.PathLike[str], *, nprobe: int, rebuild_threshold: int) -> "EmbeddingCatalog":
+        """Open the saved index, building and saving it first if none exists.
+
+        The host lock ensures only one process on the host exports and clusters
+        the catalog; the others wait and then map the files it wrote.
+        """
+
+        root = Path(root)
+        options = {"nprobe": nprobe, "rebuild_threshold": rebuild_threshold}
+        with host_lock(root):
+            index = EmbeddingIndex.open(root, **options)
+            if index is None:
+                ids, vectors, watermark = load_embeddings()
+                EmbeddingIndex.build(ids, vectors, **options).save(root, watermark=watermark)
+                index = EmbeddingIndex.open(root, **options)
+        assert index is not None and index.path is not None
+        catalog = cls(root, index, _saved_watermark(index))
+        catalog.refresh()
+        return catalog
+
+    def refresh(self) -> int:
+        """Add embeddings changed since the watermark; rebuild once the delta is large.
+
+        The next version is built beside the current one and swapped in with one
+        assignment, so searches holding the previous index are unaffected.
+        """
+
+        with self._lock:
+            ids, vectors, watermark = load_embeddings(self.watermark, dimension=self.index.dimension)
+            if ids:
+                index = self.index.updated(ids, vectors)
+                if index.needs_rebuild:
+                    index, watermark = self._rebuilt(index, watermark)
+                self.index = index
+                self.watermark = watermark
+            self.refreshed_at = time.monotonic()
+            return len(ids)
+
+    def _rebuilt(self, index: EmbeddingIndex, watermark: datetime | None) -> tuple[EmbeddingIndex, datetime | None]:
+        """Rebuild under the host lock, or adopt a version another process saved meanwhile."""
+
+        options = {"nprobe": index.nprobe, "rebuild_threshold": index.rebuild_threshold}
+        with host_lock(self.root):
+            saved = EmbeddingIndex.open(self.root, **options)
+            if saved is None or saved.path == index.path:
+                index.rebuilt().save(self.root, watermark=watermark)
+                saved = EmbeddingIndex.open(self.root, **options)
+                assert saved is not None
+                return saved, watermark
+        # Another process rebuilt first; catch its version up to now.
+        since = _saved_watermark(saved)
+        ids, vectors, latest = load_embeddings(since, dimension=saved.dimension)
+        return saved.updated(ids, vectors), latest
+
+    def refresh_if_due(self, interval: float) -> None:
+        if time.monotonic() - self.refreshed_at < interval:
+            return
+        try:
+            self.refresh()
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Embedding index refresh failed: %s", exc)
+            self.refreshed_at = time.monotonic()
+
+
+_catalog: EmbeddingCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_embedding_catalog() -> EmbeddingCatalog | None:
+    """Return the worker's embedding catalog, or ``None`` when disabled/unavailable."""
+
+    from backend.core.config import settings
+
+    global _catalog
+
+    if settings.embedding_index_dir is None:
+        return None
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                try:
+                    _catalog = EmbeddingCatalog.load(
+                        settings.embedding_index_dir,
+                        nprobe=settings.embedding_nprobe,
+                        rebuild_threshold=settings.embedding_rebuild_threshold,
+                    )
+                except Exception as exc:  # pragma: no cover - depends on database availability
+                    logger.warning("Embedding index unavailable: %s", exc)
+                    return None
+    if not _catalog.background_refresh:
+        _catalog.refresh_if_due(settings.matching_refresh_seconds)
+    return _catalog
+
+
+def set_embedding_catalog(catalog: EmbeddingCatalog | None) -> None:
+    """Install ``catalog`` as the process-wide embedding catalog (warm-up and tests)."""
+
+    global _catalog
+    _catalog = catalog
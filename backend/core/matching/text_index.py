@@ -0,0 +1,365 @@
+"""Token/trigram inverted index for fuzzy product-name matching.
+
+Product names are decomposed into word tokens (``w:milk``) and character
+trigrams of each padded token (`` mi``, ``mil``, ``ilk``, ``lk ``). Each feature
+maps to a posting array of catalog rows in CSR form, so a lookup only touches
+products sharing at least one feature with the query.
+
+Scores are IDF-weighted Dice coefficients in ``[0, 1]``::
+
+    score(q, d) = 2 * sum(idf[f] for f in q & d) / (|q|_idf + |d|_idf)
+
+Candidates come from the intersection of the query's word postings plus the most
+selective features up to a per-query posting budget. All list items of a job are
+scored in one vectorized pass over those postings; the best few candidates per
+item are then rescored exactly. Products added or renamed
+after the build live in a small delta segment, itself a CSR index searched the
+same way, until it grows past ``compact_threshold`` and the index is rebuilt.
+Delta candidates are rescored with the base IDF so both segments rank alike.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9%]+")
+
+
+def extract_features(text: str) -> set[str]:
+    """Return the word and trigram features of ``text``."""
+
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = {f"w:{token}" for token in tokens}
+    for token in tokens:
+        padded = f" {token} "
+        features.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+@dataclass(frozen=True)
+class ProductMatch:
+    """Scored catalog candidate for a list item."""
+
+    product_id: int
+    name: str
+    score: float
+
+
+class ProductTextIndex:
+    """Immutable CSR inverted index plus a mutable delta segment."""
+
+    def __init__(
+        self,
+        product_ids: np.ndarray,
+        names: list[str],
+        vocabulary: dict[str, int],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        *,
+        posting_budget: int = 20_000,
+        compact_threshold: int = 10_000,
+        rescore_factor: int = 4,
+    ) -> None:
+        self.product_ids = product_ids
+        self.names = names
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.postings = postings
+        self.posting_budget = posting_budget
+        self.compact_threshold = compact_threshold
+        self.rescore_factor = rescore_factor
+
+        n_docs = max(len(product_ids), 1)
+        document_frequency = np.diff(indptr)
+        self.idf = np.log1p(n_docs / np.maximum(document_frequency, 1)).astype(np.float32)
+        self.unknown_idf = float(math.log1p(n_docs))
+        self.doc_norms = np.bincount(
+            postings,
+            weights=np.repeat(self.idf, document_frequency),
+            minlength=len(product_ids),
+        ).astype(np.float32)
+
+        self._is_word = np.zeros(len(vocabulary), dtype=bool)
+        for feature, feature_id in vocabulary.items():
+            self._is_word[feature_id] = feature.startswith("w:")
+
+        self._row_of = {int(pid): row for row, pid in enumerate(product_ids)}
+        self._alive = np.ones(len(product_ids), dtype=bool)
+        self._delta: dict[int, str] = {}
+        self._delta_index: ProductTextIndex | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(
+        cls,
+        product_ids: Sequence[int],
+        names: Sequence[str],
+        **options: float,
+    ) -> "ProductTextIndex":
+        """Build the index from parallel ``product_ids``/``names`` sequences."""
+
+        vocabulary: dict[str, int] = {}
+        feature_ids: list[int] = []
+        rows: list[int] = []
+        for row, name in enumerate(names):
+            for feature in extract_features(name):
+                feature_ids.append(vocabulary.setdefault(feature, len(vocabulary)))
+                rows.append(row)
+
+        features = np.asarray(feature_ids, dtype=np.int32)
+        order = np.argsort(features, kind="stable")
+        postings = np.asarray(rows, dtype=np.int32)[order]
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(features, minlength=len(vocabulary)), out=indptr[1:])
+
+        return cls(
+            np.asarray(product_ids, dtype=np.int64),
+            list(names),
+            vocabulary,
+            indptr,
+            postings,
+            **options,
+        )
+
+    def __len__(self) -> int:
+        return int(self._alive.sum()) + len(self._delta)
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self._delta) > self.compact_threshold
+
+    def upsert(self, products: Iterable[tuple[int, str]]) -> None:
+        """Add or rename products without rebuilding the CSR arrays."""
+
+        with self._lock:
+            changed = False
+            for product_id, name in products:
+                row = self._row_of.get(int(product_id))
+                if row is not None:
+                    self._alive[row] = False
+                self._delta[int(product_id)] = name
+                changed = True
+            if changed:
+                self._reindex_delta()
+
+    def updated(
+        self,
+        products: Iterable[tuple[int, str]],
+        removed: Iterable[int] = (),
+    ) -> "ProductTextIndex":
+        """Return a copy with ``products`` upserted and ``removed`` dropped.
+
+        The copy shares the CSR arrays, vocabulary and names; only the liveness
+        mask and the delta segment are its own. Searches running on this index
+        keep a consistent view, and pages a forked worker inherited stay shared.
+        """
+
+        clone = copy.copy(self)
+        with self._lock:
+            clone._alive = self._alive.copy()
+            clone._delta = dict(self._delta)
+        clone._lock = threading.Lock()
+        clone.remove(removed)
+        clone.upsert(products)
+        return clone
+
+    def remove(self, product_ids: Iterable[int]) -> None:
+        with self._lock:
+            changed = False
+            for product_id in product_ids:
+                row = self._row_of.get(int(product_id))
+                if row is not None:
+                    self._alive[row] = False
+                changed |= self._delta.pop(int(product_id), None) is not None
+            if changed:
+                self._reindex_delta()
+
+    def live_product_ids(self) -> np.ndarray:
+        """Return the ids of every product currently in the index."""
+
+        with self._lock:
+            delta = np.fromiter(self._delta, dtype=np.int64, count=len(self._delta))
+            return np.concatenate([self.product_ids[self._alive], delta])
+
+    def _reindex_delta(self) -> None:
+        # Called with ``_lock`` held; the delta stays small, so a rebuild per
+        # refresh is cheaper than scanning it on every search.
+        self._delta_index = (
+            ProductTextIndex.build(
+                list(self._delta),
+                list(self._delta.values()),
+                posting_budget=self.posting_budget,
+                rescore_factor=self.rescore_factor,
+            )
+            if self._delta
+            else None
+        )
+
+    def compacted(self) -> "ProductTextIndex":
+        """Return a fresh index containing live base rows plus the delta segment."""
+
+        with self._lock:
+            ids = [int(pid) for pid, alive in zip(self.product_ids, self._alive) if alive]
+            names = [name for name, alive in zip(self.names, self._alive) if alive]
+            for product_id, name in self._delta.items():
+                ids.append(product_id)
+                names.append(name)
+        return ProductTextIndex.build(
+            ids,
+            names,
+            posting_budget=self.posting_budget,
+            compact_threshold=self.compact_threshold,
+            rescore_factor=self.rescore_factor,
+        )
+
+    def search_many(self, queries: Sequence[str], *, k: int = 5) -> list[list[ProductMatch]]:
+        """Return the top ``k`` matches for every query, scored in one batch."""
+
+        query_features = [extract_features(query) for query in queries]
+        query_norms = [sum(self._feature_weight(f) for f in features) for features in query_features]
+
+        base = self._search_base(query_features, query_norms, k)
+        delta = self._search_delta(query_features, query_norms, k)
+
+        results: list[list[ProductMatch]] = []
+        for base_matches, delta_matches in zip(base, delta):
+            merged = base_matches + delta_matches
+            merged.sort(key=lambda match: match.score, reverse=True)
+            results.append(merged[:k])
+        return results
+
+    def _posting(self, feature_id: int) -> np.ndarray:
+        return self.postings[self.indptr[feature_id] : self.indptr[feature_id + 1]]
+
+    def _feature_weight(self, feature: str) -> float:
+        feature_id = self.vocabulary.get(feature)
+        return self.unknown_idf if feature_id is None else float(self.idf[feature_id])
+
+    def _exact_score(self, features: set[str], query_norm: float, name: str) -> float:
+        doc_features = extract_features(name)
+        shared = sum(self._feature_weight(f) for f in features & doc_features)
+        doc_norm = sum(self._feature_weight(f) for f in doc_features)
+        return 2.0 * shared / (query_norm + doc_norm) if shared else 0.0
+
+    def _search_base(
+        self,
+        query_features: list[set[str]],
+        query_norms: list[float],
+        k: int,
+    ) -> list[list[ProductMatch]]:
+        n_docs = len(self.product_ids)
+        results: list[list[ProductMatch]] = [[] for _ in query_features]
+        if n_docs == 0:
+            return results
+
+        posting_chunks: list[np.ndarray] = []
+        weight_chunks: list[np.ndarray] = []
+        item_chunks: list[np.ndarray] = []
+
+        for item, features in enumerate(query_features):
+            known = np.asarray(
+                [self.vocabulary[f] for f in features if f in self.vocabulary], dtype=np.int64
+            )
+            if known.size == 0:
+                continue
+            lengths = self.indptr[known + 1] - self.indptr[known]
+            order = np.argsort(lengths, kind="stable")
+
+            # Products containing every query word are the strongest candidates;
+            # postings are row-sorted, so the intersection is a cheap merge.
+            words = [int(f) for f in known[order] if self._is_word[f]]
+            if len(words) > 1:
+                rows = self._posting(words[0])
+                for feature_id in words[1:]:
+                    rows = np.intersect1d(rows, self._posting(feature_id), assume_unique=True)
+                    if rows.size == 0:
+                        break
+                if rows.size:
+                    rows = rows[: self.posting_budget]
+                    bonus = float(self.idf[words].sum())
+                    posting_chunks.append(rows)
+                    weight_chunks.append(np.full(rows.size, bonus, dtype=np.float32))
+                    item_chunks.append(np.full(rows.size, item, dtype=np.int64))
+
+            # Walk features from most to least selective and stop once the posting
+            # budget is spent: common trigrams add little signal but dominate cost.
+            within = np.cumsum(lengths[order]) <= self.posting_budget
+            within[0] = True
+            for feature_id in known[order[within]]:
+                chunk = self._posting(feature_id)
+                posting_chunks.append(chunk)
+                weight_chunks.append(np.full(chunk.size, self.idf[feature_id], dtype=np.float32))
+                item_chunks.append(np.full(chunk.size, item, dtype=np.int64))
+
+        if not posting_chunks:
+            return results
+
+        # Combine (item, row) into one key so every query is reduced together.
+        keys = np.concatenate(item_chunks) * n_docs + np.concatenate(posting_chunks)
+        weights = np.concatenate(weight_chunks)
+        order = np.argsort(keys, kind="stable")
+        keys, weights = keys[order], weights[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        shared = np.add.reduceat(weights, starts)
+        items, rows = np.divmod(keys[starts], n_docs)
+
+        # Ranking proxy: features beyond the budget are missing from ``shared``.
+        proxy = shared / self.doc_norms[rows]
+        proxy[~self._alive[rows]] = -1.0
+
+        boundaries = np.searchsorted(items, np.arange(len(query_features) + 1))
+        for item, features in enumerate(query_features):
+            lo, hi = boundaries[item], boundaries[item + 1]
+            if lo == hi:
+                continue
+            segment = proxy[lo:hi]
+            shortlist = min(k * self.rescore_factor, segment.size)
+            best = np.argpartition(-segment, shortlist - 1)[:shortlist]
+            matches = []
+            for position in best:
+                if segment[position] <= 0:
+                    continue
+                row = int(rows[lo + position])
+                name = self.names[row]
+                matches.append(
+                    ProductMatch(
+                        product_id=int(self.product_ids[row]),
+                        name=name,
+                        score=self._exact_score(features, query_norms[item], name),
+                    )
+                )
+            matches.sort(key=lambda match: match.score, reverse=True)
+            results[item] = matches[:k]
+        return results
+
+    def _search_delta(
+        self,
+        query_features: list[set[str]],
+        query_norms: list[float],
+        k: int,
+    ) -> list[list[ProductMatch]]:
+        delta_index = self._delta_index
+        if delta_index is None:
+            return [[] for _ in query_features]
+        # The delta's own IDF only picks the shortlist; final scores use the
+        # base statistics so delta and base matches compare directly.
+        return [
+            [
+                ProductMatch(
+                    match.product_id, match.name, self._exact_score(features, norm, match.name)
+                )
+                for match in matches
+            ]
+            for features, norm, matches in zip(
+                query_features,
+                query_norms,
+                delta_index._search_base(query_features, query_norms, k),
+            )
+        ]
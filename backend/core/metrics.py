@@ -0,0 +1,262 @@
+"""Process-wide metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and histograms are declared once per process through
+:func:`get_metrics` and recorded with labels::
+
+    TASK_RUNTIME = get_metrics().histogram("savery_task_runtime_seconds", "Task run time.")
+    TASK_RUNTIME.observe(0.42, task="workers.matching.match_items", queue="matching")
+
+Histograms reuse :class:`~backend.core.db_metrics.LatencyHistogram` buckets.
+Prefork worker children cannot be scraped directly, so each one periodically
+writes :meth:`MetricsRegistry.snapshot` to a file (:func:`write_snapshot`) and
+the exporter in the parent merges the files (:meth:`MetricsRegistry.merge`),
+summing counters, gauges and histogram buckets across processes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+from backend.core.db_metrics import DEFAULT_BUCKETS, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any]) -> LabelSet:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricFamily:
+    """One named metric and its samples, keyed by label set."""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        kind: str,
+        help_text: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.buckets = buckets
+        self.samples: dict[LabelSet, Any] = {}
+
+    def inc(self, value: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0.0) + value
+
+    def dec(self, value: float = 1.0, **labels: Any) -> None:
+        self.inc(-value, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self.registry.lock:
+            self.samples[_labels(labels)] = float(value)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self.registry.lock:
+            histogram = self.samples.get(key)
+            if histogram is None:
+                histogram = self.samples[key] = LatencyHistogram(self.buckets)
+            histogram.observe(value)
+
+    def value(self, **labels: Any) -> Any:
+        """Current sample for ``labels`` (a number, or a histogram), ``None`` if unset."""
+
+        return self.samples.get(_labels(labels))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, sample in sorted(self.samples.items()):
+            if self.kind != HISTOGRAM:
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(sample)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets, sample.counts):
+                cumulative += count
+                bucket = _format_labels(labels + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {sample.count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(sample.total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {sample.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe collection of metric families for one process."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self._families: dict[str, MetricFamily] = {}
+
+    def _family(self, name: str, kind: str, help_text: str, buckets: tuple[float, ...]) -> MetricFamily:
+        with self.lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(self, name, kind, help_text, buckets)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+            return family
+
+    def counter(self, name: str, help_text: str) -> MetricFamily:
+        return self._family(name, COUNTER, help_text, DEFAULT_BUCKETS)
+
+    def gauge(self, name: str, help_text: str) -> MetricFamily:
+        return self._family(name, GAUGE, help_text, DEFAULT_BUCKETS)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> MetricFamily:
+        return self._family(name, HISTOGRAM, help_text, tuple(buckets))
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable copy of every family and sample."""
+
+        with self.lock:
+            families: dict[str, Any] = {}
+            for name, family in self._families.items():
+                samples = []
+                for labels, sample in family.samples.items():
+                    if family.kind == HISTOGRAM:
+                        sample = {"counts": list(sample.counts), "count": sample.count, "sum": sample.total}
+                    samples.append([list(map(list, labels)), sample])
+                families[name] = {
+                    "kind": family.kind,
+                    "help": family.help,
+                    "buckets": list(family.buckets),
+                    "samples": samples,
+                }
+            return families
+
+    def merge(self, snapshot: dict[str, Any], *, kinds: Iterable[str] = (COUNTER, GAUGE, HISTOGRAM)) -> None:
+        """Add the samples of ``snapshot`` (from another process) into this registry."""
+
+        kinds = set(kinds)
+        for name, data in snapshot.items():
+            if data["kind"] not in kinds:
+                continue
+            family = self._family(name, data["kind"], data["help"], tuple(data["buckets"]))
+            for labels, sample in data["samples"]:
+                key: LabelSet = tuple((label, value) for label, value in labels)
+                with self.lock:
+                    if family.kind != HISTOGRAM:
+                        family.samples[key] = family.samples.get(key, 0.0) + sample
+                        continue
+                    histogram = family.samples.get(key)
+                    if histogram is None:
+                        histogram = family.samples[key] = LatencyHistogram(family.buckets)
+                    if len(sample["counts"]) != len(histogram.counts):
+                        logger.warning("Skipping %s sample with mismatched buckets", name)
+                        continue
+                    histogram.counts = [a + b for a, b in zip(histogram.counts, sample["counts"])]
+                    histogram.count += sample["count"]
+                    histogram.total += sample["sum"]
+
+    def reset(self) -> None:
+        """Drop every sample but keep the declared families (used after fork)."""
+
+        with self.lock:
+            for family in self._families.values():
+                family.samples.clear()
+
+    def render(self) -> str:
+        with self.lock:
+            families = sorted(self._families.values(), key=lambda family: family.name)
+            lines = [line for family in families if family.samples for line in family.render()]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+
+    return MetricsRegistry()
+
+
+def write_snapshot(directory: str | Path, registry: MetricsRegistry | None = None) -> None:
+    """Atomically write this process's snapshot to ``directory/<pid>.json``."""
+
+    directory = Path(directory)
+    registry = registry or get_metrics()
+    target = directory / f"{os.getpid()}.json"
+    temporary = directory / f".{os.getpid()}.json.tmp"
+    temporary.write_text(json.dumps(registry.snapshot()), encoding="utf-8")
+    os.replace(temporary, target)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SnapshotCollector:
+    """Merges the snapshot files of child processes for an exporter.
+
+    Files of processes that have exited are folded into a retained registry and
+    deleted, so counters survive child recycling without the directory growing.
+    Their gauges are dropped: a dead process has nothing in flight.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._retired = MetricsRegistry()
+        self._lock = threading.Lock()
+
+    def collect(self, *local: MetricsRegistry) -> MetricsRegistry:
+        merged = MetricsRegistry()
+        for registry in local:
+            merged.merge(registry.snapshot())
+        with self._lock:
+            for path in sorted(self.directory.glob("*.json")):
+                try:
+                    snapshot = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as exc:
+                    logger.debug("Skipping unreadable metrics snapshot %s: %s", path, exc)
+                    continue
+                pid = int(path.stem) if path.stem.isdigit() else None
+                if pid is not None and not _alive(pid):
+                    self._retired.merge(snapshot, kinds=(COUNTER, HISTOGRAM))
+                    path.unlink(missing_ok=True)
+                    continue
+                merged.merge(snapshot)
+            merged.merge(self._retired.snapshot())
+        return merged
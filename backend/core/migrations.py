@@ -2,17 +2,11 @@
 
 from __future__ import annotations
 
+import ast
 import logging
 from pathlib import Path
 from typing import Any, Iterable, Tuple, Type
 
-try:  # pragma: no cover - optional during bootstrap
-    from sqlalchemy.exc import SQLAlchemyError
-except ModuleNotFoundError:  # pragma: no cover
-    class SQLAlchemyError(Exception):
-        """Fallback when SQLAlchemy is not installed yet."""
-
-
 from backend.core.config import settings
 from backend.core.db import get_engine
 
@@ -55,6 +49,60 @@ def _expected_heads(script: Any) -> Iterable[str]:
     return heads
 
 
+def _revision_ids(path: Path) -> tuple[str, tuple[str, ...]] | None:
+    """``(revision, down_revisions)`` from a version file's module-level literals."""
+
+    values: dict[str, Any] = {}
+    for node in ast.parse(path.read_text(encoding="utf-8"), str(path)).body:
+        target = node.target if isinstance(node, ast.AnnAssign) else None
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id in ("revision", "down_revision") and node.value is not None:
+            values[target.id] = ast.literal_eval(node.value)
+    revision = values.get("revision")
+    if not isinstance(revision, str):
+        return None
+    down = values.get("down_revision")
+    downs = () if down is None else (down,) if isinstance(down, str) else tuple(down)
+    return revision, downs
+
+
+def script_heads() -> set[str]:
+    """Head revisions of the migration scripts, read without importing them.
+
+    Building an Alembic ``ScriptDirectory`` imports every version module (and
+    with them SQLAlchemy and alembic_utils); parsing the ``revision`` /
+    ``down_revision`` literals is enough to find the heads. Falls back to Alembic
+    when a version file computes its identifiers dynamically.
+    """
+
+    _, migrations_path = _alembic_paths()
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    try:
+        for path in sorted((migrations_path / "versions").glob("*.py")):
+            ids = _revision_ids(path)
+            if ids is None:
+                raise ValueError(f"{path.name} has no literal revision identifier")
+            revisions.add(ids[0])
+            parents.update(ids[1])
+    except (SyntaxError, ValueError) as exc:
+        logger.debug("Falling back to Alembic for migration heads: %s", exc)
+        _, _, ScriptDirectory = _load_alembic()
+        return set(_expected_heads(ScriptDirectory.from_config(build_alembic_config())))
+    return revisions - parents
+
+
+def database_heads(connection: Any) -> set[str]:
+    """Revisions stamped in ``alembic_version`` (empty when the table is missing)."""
+
+    from sqlalchemy import inspect, text
+
+    if not inspect(connection).has_table("alembic_version"):
+        return set()
+    return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+
+
 def ensure_database_revision() -> None:
     """Validate that the connected database is on the latest Alembic head.
 
@@ -65,18 +113,14 @@ def ensure_database_revision() -> None:
     environment).
     """
 
-    Config, MigrationContext, ScriptDirectory = _load_alembic()
-
-    config = build_alembic_config()
-    script = ScriptDirectory.from_config(config)
-    expected = set(_expected_heads(script))
+    from sqlalchemy.exc import SQLAlchemyError
 
+    expected = script_heads()
     engine = get_engine()
 
     try:
         with engine.connect() as connection:
-            context = MigrationContext.configure(connection)
-            current = set(context.get_current_heads() or [])
+            current = database_heads(connection)
     except SQLAlchemyError:
         logger.exception("Unable to verify database revision via Alembic")
         raise
@@ -0,0 +1,12 @@
+"""Optimization engines used by the route planning stage."""
+
+from .assignment import AssignmentPlan, AssignmentProblem, solve_assignment
+from .routing import RoutePlan, order_stops
+
+__all__ = [
+    "AssignmentPlan",
+    "AssignmentProblem",
+    "RoutePlan",
+    "order_stops",
+    "solve_assignment",
+]
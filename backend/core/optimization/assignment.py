@@ -0,0 +1,312 @@
+"""Store-selection solver for the optimization pipeline.
+
+The problem: choose a subset ``S`` of the candidate stores (``|S| <= max_stores``)
+and buy every list item at the cheapest store in ``S``. The objective balances
+spend against travel using ``OptimizationPreferences.cost_priority``::
+
+    objective(S) = w * sum_i min_{s in S} cost[i, s]
+                   + (1 - w) * sum_{s in S} travel[s]
+                   + missing_penalty * |items unavailable in S|
+
+Small instances are solved exactly with depth-first branch-and-bound over store
+subsets; larger ones fall back to greedy construction followed by add/drop/swap
+local search. Both honour a wall-clock deadline and return the best plan found
+when it expires.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+DEFAULT_MISSING_PENALTY = 1_000_000.0
+
+
+@dataclass(frozen=True)
+class AssignmentProblem:
+    """Dense cost model consumed by :func:`solve_assignment`.
+
+    ``costs`` is an ``items x stores`` float matrix where ``np.inf`` marks an item
+    that cannot be bought at a store. ``travel`` holds the per-store penalty paid
+    for visiting that store at all.
+    """
+
+    costs: np.ndarray
+    travel: np.ndarray
+    cost_priority: float = 0.5
+    max_stores: int | None = None
+    missing_penalty: float = DEFAULT_MISSING_PENALTY
+
+    @property
+    def n_items(self) -> int:
+        return int(self.costs.shape[0])
+
+    @property
+    def n_stores(self) -> int:
+        return int(self.costs.shape[1])
+
+    @property
+    def store_limit(self) -> int:
+        if self.max_stores is None:
+            return self.n_stores
+        return max(1, min(self.max_stores, self.n_stores))
+
+
+@dataclass
+class AssignmentPlan:
+    """Solution returned by the solver."""
+
+    stores: list[int]
+    item_store: np.ndarray
+    objective: float
+    item_cost: float
+    travel_cost: float
+    optimal: bool = False
+    timed_out: bool = False
+    method: str = "exact"
+    explored: int = 0
+    missing_items: list[int] = field(default_factory=list)
+
+
+class _Evaluator:
+    """Vectorized objective helper shared by both search strategies."""
+
+    def __init__(self, problem: AssignmentProblem) -> None:
+        weight = float(problem.cost_priority)
+        self.problem = problem
+        # ``costs`` holds each item's full objective term: ``w * cost`` when it
+        # can be bought, the (unweighted) missing penalty when it cannot. That
+        # keeps the penalty in force at ``cost_priority=0`` and lets the
+        # searches sum item terms directly.
+        self.item_weight = 1.0
+        self.travel_weight = 1.0 - weight
+        available = np.isfinite(problem.costs)
+        self.costs = np.where(available, weight * np.where(available, problem.costs, 0.0), problem.missing_penalty)
+        self.missing_cost = float(problem.missing_penalty)
+        self.travel = np.asarray(problem.travel, dtype=float)
+
+    def column_min(self, stores: list[int]) -> np.ndarray:
+        if not stores:
+            return np.full(self.costs.shape[0], self.missing_cost)
+        return self.costs[:, stores].min(axis=1)
+
+    def score(self, best: np.ndarray, stores: list[int]) -> float:
+        travel = float(self.travel[stores].sum()) if stores else 0.0
+        return self.item_weight * float(best.sum()) + self.travel_weight * travel
+
+    def evaluate(self, stores: list[int]) -> float:
+        return self.score(self.column_min(stores), stores)
+
+
+def solve_assignment(
+    problem: AssignmentProblem,
+    *,
+    deadline_seconds: float = 0.5,
+    exact_store_limit: int = 16,
+) -> AssignmentPlan:
+    """Select stores and per-item assignments for ``problem``.
+
+    Instances with at most ``exact_store_limit`` stores use branch-and-bound;
+    larger ones use local search. ``deadline_seconds`` bounds wall-clock time in
+    both modes.
+    """
+
+    deadline = time.perf_counter() + max(deadline_seconds, 0.0)
+    evaluator = _Evaluator(problem)
+
+    if problem.n_items == 0 or problem.n_stores == 0:
+        return _finalize(problem, evaluator, [], optimal=True, method="trivial")
+
+    incumbent = _greedy(evaluator, problem.store_limit)
+    if problem.n_stores <= exact_store_limit:
+        stores, optimal, explored = _branch_and_bound(evaluator, incumbent, deadline)
+        method = "exact"
+    else:
+        stores, optimal, explored = _local_search(evaluator, incumbent, deadline)
+        method = "local-search"
+
+    plan = _finalize(problem, evaluator, stores, optimal=optimal, method=method)
+    plan.explored = explored
+    plan.timed_out = time.perf_counter() >= deadline and not optimal
+    return plan
+
+
+def _greedy(evaluator: _Evaluator, limit: int) -> list[int]:
+    """Add the store with the best objective improvement until none helps."""
+
+    n_stores = evaluator.costs.shape[1]
+    chosen: list[int] = []
+    best = evaluator.column_min(chosen)
+    current = float("inf")
+
+    while len(chosen) < limit:
+        remaining = [s for s in range(n_stores) if s not in chosen]
+        if not remaining:
+            break
+        # Objective for every single-store extension in one vectorized pass.
+        candidate_best = np.minimum(best[:, None], evaluator.costs[:, remaining])
+        scores = evaluator.item_weight * candidate_best.sum(axis=0) + evaluator.travel_weight * (
+            evaluator.travel[remaining] + (evaluator.travel[chosen].sum() if chosen else 0.0)
+        )
+        pick = int(np.argmin(scores))
+        if scores[pick] >= current:
+            break
+        chosen.append(remaining[pick])
+        best = candidate_best[:, pick]
+        current = float(scores[pick])
+
+    return chosen
+
+
+def _branch_and_bound(
+    evaluator: _Evaluator,
+    incumbent: list[int],
+    deadline: float,
+) -> tuple[list[int], bool, int]:
+    """Exact DFS over include/exclude decisions with suffix-minimum bounds."""
+
+    costs = evaluator.costs
+    n_items, n_stores = costs.shape
+    limit = evaluator.problem.store_limit
+
+    # Visit promising stores first so good incumbents appear early.
+    order = np.argsort(
+        evaluator.item_weight * costs.sum(axis=0) + evaluator.travel_weight * evaluator.travel,
+        kind="stable",
+    )
+    ordered_costs = costs[:, order]
+    ordered_travel = evaluator.travel[order]
+
+    # suffix_min[:, k] is the cheapest price of each item over stores k..end.
+    suffix_min = np.full((n_items, n_stores + 1), evaluator.missing_cost)
+    for k in range(n_stores - 1, -1, -1):
+        suffix_min[:, k] = np.minimum(suffix_min[:, k + 1], ordered_costs[:, k])
+
+    best_score = evaluator.evaluate(incumbent)
+    best_stores = [int(np.where(order == s)[0][0]) for s in incumbent]
+    explored = 0
+    timed_out = False
+
+    stack: list[tuple[int, tuple[int, ...], np.ndarray, float]] = [
+        (0, (), np.full(n_items, evaluator.missing_cost), 0.0)
+    ]
+    while stack:
+        explored += 1
+        if explored % 256 == 0 and time.perf_counter() >= deadline:
+            timed_out = True
+            break
+
+        index, chosen, current_min, travel = stack.pop()
+        score = evaluator.item_weight * float(current_min.sum()) + evaluator.travel_weight * travel
+        if chosen and score < best_score:
+            best_score = score
+            best_stores = list(chosen)
+
+        if index >= n_stores or len(chosen) >= limit:
+            continue
+
+        # Travel is non-negative, so the cheapest completion is bounded below by
+        # the current travel plus every item at its best remaining price.
+        bound = (
+            evaluator.item_weight * float(np.minimum(current_min, suffix_min[:, index]).sum())
+            + evaluator.travel_weight * travel
+        )
+        if bound >= best_score:
+            continue
+
+        # Push "exclude" first so "include" is explored first (depth-first).
+        stack.append((index + 1, chosen, current_min, travel))
+        stack.append(
+            (
+                index + 1,
+                chosen + (index,),
+                np.minimum(current_min, ordered_costs[:, index]),
+                travel + float(ordered_travel[index]),
+            )
+        )
+
+    stores = sorted(int(order[k]) for k in best_stores)
+    return stores, not timed_out, explored
+
+
+def _local_search(
+    evaluator: _Evaluator,
+    incumbent: list[int],
+    deadline: float,
+) -> tuple[list[int], bool, int]:
+    """Best-improvement add/drop/swap search starting from ``incumbent``."""
+
+    n_stores = evaluator.costs.shape[1]
+    limit = evaluator.problem.store_limit
+    current = list(incumbent) or [int(np.argmin(evaluator.costs.sum(axis=0)))]
+    current_score = evaluator.evaluate(current)
+    explored = 0
+
+    while time.perf_counter() < deadline:
+        best_move: list[int] | None = None
+        best_score = current_score
+        outside = [s for s in range(n_stores) if s not in current]
+
+        neighbours: list[list[int]] = []
+        if len(current) < limit:
+            neighbours.extend(current + [s] for s in outside)
+        if len(current) > 1:
+            neighbours.extend([s for s in current if s != drop] for drop in current)
+        neighbours.extend(
+            [s for s in current if s != drop] + [add] for drop in current for add in outside
+        )
+
+        for candidate in neighbours:
+            explored += 1
+            score = evaluator.evaluate(candidate)
+            if score < best_score - 1e-12:
+                best_score = score
+                best_move = candidate
+            if explored % 64 == 0 and time.perf_counter() >= deadline:
+                break
+
+        if best_move is None:
+            # Local optimum reached before the deadline.
+            return sorted(current), False, explored
+        current, current_score = best_move, best_score
+
+    return sorted(current), False, explored
+
+
+def _finalize(
+    problem: AssignmentProblem,
+    evaluator: _Evaluator,
+    stores: list[int],
+    *,
+    optimal: bool,
+    method: str,
+) -> AssignmentPlan:
+    if stores:
+        sub = problem.costs[:, stores]
+        picks = np.argmin(np.where(np.isfinite(sub), sub, np.inf), axis=1)
+        item_store = np.asarray(stores)[picks]
+        chosen = sub[np.arange(problem.n_items), picks]
+        available = np.isfinite(chosen)
+    else:
+        item_store = np.full(problem.n_items, -1)
+        chosen = np.zeros(problem.n_items)
+        available = np.zeros(problem.n_items, dtype=bool)
+
+    item_store = np.where(available, item_store, -1)
+    item_cost = float(chosen[available].sum())
+    travel_cost = float(evaluator.travel[stores].sum()) if stores else 0.0
+
+    # Only keep stores that actually received an item.
+    used = sorted({int(s) for s in item_store if s >= 0})
+    return AssignmentPlan(
+        stores=used,
+        item_store=item_store,
+        objective=evaluator.evaluate(used),
+        item_cost=item_cost,
+        travel_cost=float(evaluator.travel[used].sum()) if used else travel_cost,
+        optimal=optimal,
+        method=method,
+        missing_items=[int(i) for i in np.flatnonzero(~available)],
+    )
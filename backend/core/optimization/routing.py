@@ -0,0 +1,166 @@
+"""Stop-ordering solver for the stores selected by the assignment stage.
+
+Node ``0`` of the distance matrix is the trip origin (the user's location); the
+remaining nodes are stops. Tours start at the origin and, when
+``return_to_origin`` is set, end there as well. Up to ``exact_stop_limit`` stops
+are ordered exactly with Held-Karp dynamic programming; longer tours start from a
+nearest-neighbour construction improved by 2-opt and Or-opt moves until no move
+helps or the deadline expires.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class RoutePlan:
+    """Visit order over stop nodes (``1..n``) plus per-leg distances."""
+
+    order: list[int]
+    legs: list[float]
+    return_leg: float
+    total_distance: float
+    optimal: bool = False
+    method: str = "exact"
+
+
+def order_stops(
+    distances: np.ndarray,
+    *,
+    return_to_origin: bool = True,
+    exact_stop_limit: int = 12,
+    deadline_seconds: float = 0.2,
+) -> RoutePlan:
+    """Return the visit order minimizing travel over ``distances``."""
+
+    deadline = time.perf_counter() + max(deadline_seconds, 0.0)
+    n_stops = distances.shape[0] - 1
+    dist = np.asarray(distances, dtype=float)
+    if not return_to_origin:
+        # Returning "home" for free turns the closed tour into an open path.
+        dist = dist.copy()
+        dist[1:, 0] = 0.0
+
+    if n_stops <= 1:
+        order, optimal, method = list(range(1, n_stops + 1)), True, "trivial"
+    elif n_stops <= exact_stop_limit:
+        order = _held_karp(dist)
+        optimal, method = True, "exact"
+    else:
+        order = _improve(dist, _nearest_neighbour(dist), deadline)
+        optimal, method = False, "2-opt"
+
+    tour = [0, *order]
+    legs = [float(dist[a, b]) for a, b in zip(tour, tour[1:])]
+    return_leg = float(dist[tour[-1], 0]) if order else 0.0
+    return RoutePlan(
+        order=order,
+        legs=legs,
+        return_leg=return_leg,
+        total_distance=float(sum(legs) + return_leg),
+        optimal=optimal,
+        method=method,
+    )
+
+
+def _held_karp(dist: np.ndarray) -> list[int]:
+    """Exact O(2^n * n^2) dynamic program; rows vectorize the inner minimum."""
+
+    n = dist.shape[0] - 1
+    stop_dist = dist[1:, 1:]
+    full = 1 << n
+    cost = np.full((full, n), np.inf)
+    parent = np.full((full, n), -1, dtype=np.int64)
+    for j in range(n):
+        cost[1 << j, j] = dist[0, j + 1]
+
+    bits = 1 << np.arange(n)
+    for mask in range(1, full):
+        if mask & (mask - 1) == 0:
+            continue
+        members = np.flatnonzero(mask & bits)
+        # candidates[m, k]: reach stop ``members[m]`` last, coming from stop ``k``.
+        candidates = cost[mask ^ bits[members]] + stop_dist[:, members].T
+        best = np.argmin(candidates, axis=1)
+        cost[mask, members] = candidates[np.arange(members.size), best]
+        parent[mask, members] = best
+
+    last = int(np.argmin(cost[full - 1] + dist[1:, 0]))
+    order: list[int] = []
+    mask = full - 1
+    while last >= 0:
+        order.append(last + 1)
+        last, mask = int(parent[mask, last]), mask ^ (1 << last)
+    order.reverse()
+    return order
+
+
+def _nearest_neighbour(dist: np.ndarray) -> list[int]:
+    n = dist.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    current, order = 0, []
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+        visited[current] = True
+        order.append(current)
+    return order
+
+
+def _improve(dist: np.ndarray, order: list[int], deadline: float) -> list[int]:
+    """Alternate 2-opt and Or-opt passes on the closed tour ``0 -> order -> 0``."""
+
+    tour = [0, *order, 0]
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = _two_opt_pass(dist, tour, deadline) or _or_opt_pass(dist, tour, deadline)
+    return tour[1:-1]
+
+
+def _two_opt_pass(dist: np.ndarray, tour: list[int], deadline: float) -> bool:
+    size = len(tour)
+    nodes = np.asarray(tour)
+    for i in range(1, size - 2):
+        if time.perf_counter() >= deadline:
+            return False
+        a, b = nodes[i - 1], nodes[i]
+        # Gain for reversing tour[i..j] for every j at once.
+        c = nodes[i + 1 : size - 1]
+        d = nodes[i + 2 : size]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        best = int(np.argmin(delta))
+        if delta[best] < -1e-9:
+            j = i + 1 + best
+            tour[i : j + 1] = reversed(tour[i : j + 1])
+            return True
+    return False
+
+
+def _or_opt_pass(dist: np.ndarray, tour: list[int], deadline: float) -> bool:
+    """Relocate a segment of 1-3 stops (optionally reversed) to its best slot."""
+
+    for length in (1, 2, 3):
+        for i in range(1, len(tour) - length):
+            if time.perf_counter() >= deadline:
+                return False
+            segment = tour[i : i + length]
+            before, after = tour[i - 1], tour[i + length]
+            removal_gain = dist[before, segment[0]] + dist[segment[-1], after] - dist[before, after]
+
+            rest = np.asarray(tour[:i] + tour[i + length :])
+            u, v = rest[:-1], rest[1:]
+            for piece in (segment, segment[::-1]):
+                insert_cost = dist[u, piece[0]] + dist[piece[-1], v] - dist[u, v]
+                # Re-inserting at the original gap is a no-op, never a gain.
+                insert_cost[i - 1] = np.inf
+                j = int(np.argmin(insert_cost))
+                if insert_cost[j] < removal_gain - 1e-9:
+                    rest_list = rest.tolist()
+                    tour[:] = rest_list[: j + 1] + list(piece) + rest_list[j + 1 :]
+                    return True
+    return False
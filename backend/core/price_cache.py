@@ -0,0 +1,309 @@
+"""Two-tier price cache shared by the pricing stage.
+
+Tier one is an in-process LRU bounded by entry count. Tier two is the latest
+``Price`` observation per (product, store) in Postgres, read through the
+``latest_prices`` view (``core.latest_prices``), so a price scraped by any
+worker is reusable by every other worker. Entries carry the provider that
+produced them and are considered fresh for that provider's TTL
+(``SAVERY_PRICE_CACHE_PROVIDER_TTL_SECONDS``, falling back to
+``SAVERY_PRICE_CACHE_DEFAULT_TTL_SECONDS``).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Iterable
+
+from backend.core.config import settings
+from backend.core.db import session_scope
+from backend.core.latest_prices import fetch_latest
+
+logger = logging.getLogger(__name__)
+
+PriceKey = tuple[str, str]
+"""``(product, store_id)`` where ``product`` is a product ID or ``q:<query>``."""
+
+
+def persisted(key: PriceKey) -> bool:
+    """Whether ``key``'s prices are written to (and so readable from) the ``prices`` table."""
+
+    return key[0].isdigit()
+
+
+def provider_for_store(store_id: str) -> str:
+    """Infer the provider slug from a store external ID such as ``kroger-01400943``."""
+
+    return store_id.split("-", 1)[0].lower() if store_id else "unknown"
+
+
+def _window_latest(product_keys: list[tuple[int, str]]) -> Any:
+    """Latest-price query over the full ``prices`` history (no ``latest_prices`` view)."""
+
+    from sqlalchemy import func, select, tuple_
+
+    from backend.core.schema import Price, Product, Store
+
+    recency = (
+        func.row_number()
+        .over(
+            partition_by=(Price.product_id, Price.store_id),
+            order_by=Price.observed_at.desc(),
+        )
+        .label("recency")
+    )
+    ranked = (
+        select(
+            Price.product_id,
+            Store.external_id,
+            Price.list_price,
+            Price.promo_price,
+            Price.currency,
+            Price.unit,
+            Price.observed_at,
+            Price.raw_payload,
+            Product.name,
+            recency,
+        )
+        .join(Store, Store.id == Price.store_id)
+        .join(Product, Product.id == Price.product_id)
+        .where(tuple_(Price.product_id, Store.external_id).in_(product_keys))
+        .subquery()
+    )
+    return select(*[c for c in ranked.c if c.name != "recency"]).where(ranked.c.recency == 1)
+
+
+@dataclass(frozen=True)
+class CachedPrice:
+    """Single price observation held by the cache."""
+
+    product: str
+    store_id: str
+    price: float | None
+    list_price: float | None
+    promo_price: float | None
+    currency: str
+    unit: str | None
+    provider: str
+    observed_at: datetime
+    product_name: str | None = None
+
+    def as_offer(self, tier: str) -> dict[str, Any]:
+        """Render the entry in the offer shape emitted by ``fetch_prices``."""
+
+        offer = asdict(self)
+        offer["source"] = offer.pop("provider")
+        offer["last_fetched"] = self.observed_at.isoformat()
+        offer.pop("observed_at")
+        product = offer.pop("product")
+        offer["product_id"] = None if product.startswith("q:") else product
+        offer["cache"] = tier
+        return offer
+
+
+class PriceCache:
+    """Thread-safe LRU in front of the latest ``Price`` rows in Postgres."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        default_ttl: float,
+        provider_ttls: dict[str, float] | None = None,
+        use_database: bool = True,
+        use_latest_view: bool = True,
+    ) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.provider_ttls = dict(provider_ttls or {})
+        self.use_database = use_database
+        self.use_latest_view = use_latest_view
+        self._entries: OrderedDict[PriceKey, CachedPrice] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "evictions": 0,
+            "writes": 0,
+        }
+
+    def ttl_for(self, provider: str) -> timedelta:
+        return timedelta(seconds=self.provider_ttls.get(provider, self.default_ttl))
+
+    def is_fresh(self, entry: CachedPrice, now: datetime | None = None) -> bool:
+        now = now or datetime.utcnow()
+        return now - entry.observed_at <= self.ttl_for(entry.provider)
+
+    def get_many(
+        self, keys: Iterable[PriceKey]
+    ) -> tuple[dict[PriceKey, dict[str, Any]], dict[PriceKey, CachedPrice]]:
+        """Return ``(fresh_offers, stale_entries)`` for ``keys``.
+
+        Fresh offers are ready to use. Stale entries are returned separately so
+        callers can refresh them but still fall back to them if the provider fails.
+        Keys absent from both are misses.
+        """
+
+        now = datetime.utcnow()
+        wanted = list(dict.fromkeys(keys))
+        fresh: dict[PriceKey, dict[str, Any]] = {}
+        stale: dict[PriceKey, CachedPrice] = {}
+        pending: list[PriceKey] = []
+
+        with self._lock:
+            for key in wanted:
+                entry = self._entries.get(key)
+                if entry is not None and self.is_fresh(entry, now):
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    fresh[key] = entry.as_offer("memory")
+                else:
+                    if entry is not None:
+                        stale[key] = entry
+                    pending.append(key)
+
+        if pending and self.use_database:
+            for key, entry in self._load_latest(pending).items():
+                if self.is_fresh(entry, now):
+                    fresh[key] = entry.as_offer("database")
+                    stale.pop(key, None)
+                    self._remember(entry)
+                elif key not in stale or entry.observed_at > stale[key].observed_at:
+                    stale[key] = entry
+
+        with self._lock:
+            db_hits = sum(1 for key in pending if key in fresh)
+            self._counters["db_hits"] += db_hits
+            self._counters["stale"] += len(stale)
+            self._counters["misses"] += len(pending) - db_hits - len(stale)
+
+        return fresh, stale
+
+    def put_many(self, entries: Iterable[CachedPrice], *, persist: bool = True) -> None:
+        """Insert fresh observations into memory and, optionally, Postgres."""
+
+        entries = list(entries)
+        for entry in entries:
+            self._remember(entry)
+        with self._lock:
+            self._counters["writes"] += len(entries)
+        if persist and self.use_database:
+            self._persist(entries)
+
+    def invalidate(self, keys: Iterable[PriceKey] | None = None) -> None:
+        with self._lock:
+            if keys is None:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters plus the current size, suitable for logging or metrics."""
+
+        with self._lock:
+            counters = dict(self._counters)
+            counters["size"] = len(self._entries)
+            counters["max_entries"] = self.max_entries
+        lookups = counters["hits"] + counters["db_hits"] + counters["misses"] + counters["stale"]
+        counters["hit_ratio"] = (
+            (counters["hits"] + counters["db_hits"]) / lookups if lookups else 0.0
+        )
+        return counters
+
+    def _remember(self, entry: CachedPrice) -> None:
+        key = (entry.product, entry.store_id)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _load_latest(self, keys: list[PriceKey]) -> dict[PriceKey, CachedPrice]:
+        """Fetch the newest observation for each product-backed key in one query."""
+
+        product_keys = [(int(p), s) for p, s in keys if p.isdigit()]
+        if not product_keys:
+            return {}
+
+        try:
+            with session_scope() as session:
+                if self.use_latest_view:
+                    rows = fetch_latest(session, product_keys)
+                else:
+                    rows = session.execute(_window_latest(product_keys)).all()
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Price cache database tier unavailable: %s", exc)
+            return {}
+
+        loaded: dict[PriceKey, CachedPrice] = {}
+        for product_id, store_id, list_price, promo_price, currency, unit, observed_at, raw, name in rows:
+            source = (raw or {}).get("source") if isinstance(raw, dict) else None
+            list_value = float(list_price) if list_price is not None else None
+            promo_value = float(promo_price) if promo_price is not None else None
+            loaded[(str(product_id), store_id)] = CachedPrice(
+                product=str(product_id),
+                store_id=store_id,
+                price=promo_value if promo_value is not None else list_value,
+                list_price=list_value,
+                promo_price=promo_value,
+                currency=currency,
+                unit=unit,
+                provider=source or provider_for_store(store_id),
+                observed_at=observed_at,
+                product_name=name,
+            )
+        return loaded
+
+    def _persist(self, entries: list[CachedPrice]) -> None:
+        """Append observations for product-backed entries to the ``prices`` table."""
+
+        rows = [e for e in entries if persisted((e.product, e.store_id)) and e.list_price is not None]
+        if not rows:
+            return
+
+        try:
+            from backend.core.schema import Price, Store
+
+            with session_scope() as session:
+                store_ids = dict(
+                    session.query(Store.external_id, Store.id)
+                    .filter(Store.external_id.in_({entry.store_id for entry in rows}))
+                    .all()
+                )
+                session.add_all(
+                    Price(
+                        store_id=store_ids[entry.store_id],
+                        product_id=int(entry.product),
+                        list_price=entry.list_price,
+                        promo_price=entry.promo_price,
+                        unit=entry.unit,
+                        currency=entry.currency,
+                        observed_at=entry.observed_at,
+                        raw_payload={"source": entry.provider},
+                    )
+                    for entry in rows
+                    if entry.store_id in store_ids
+                )
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Unable to persist %d price observations: %s", len(rows), exc)
+
+
+@lru_cache
+def get_price_cache() -> PriceCache:
+    """Return the process-wide price cache configured from settings."""
+
+    return PriceCache(
+        max_entries=settings.price_cache_max_entries,
+        default_ttl=settings.price_cache_default_ttl_seconds,
+        provider_ttls=settings.price_cache_provider_ttl_seconds,
+        use_database=settings.price_cache_use_database,
+        use_latest_view=settings.latest_prices_view_enabled,
+    )
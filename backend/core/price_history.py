@@ -0,0 +1,240 @@
+"""Monthly partitions of ``prices``, daily rollups and retention.
+
+``prices`` is range-partitioned on ``observed_at`` with one partition per
+calendar month (``prices_y2026m10``) plus ``prices_default`` for rows outside
+every range. Recent writes and reads therefore touch one small partition, and
+old history leaves by dropping a partition instead of a bulk ``DELETE`` that
+vacuum has to clean up.
+
+:func:`maintain_partitions` (run daily by beat) keeps
+``SAVERY_PRICE_PARTITION_MONTHS_AHEAD`` future months created, rolls recent days
+up into ``price_daily_rollups`` (min/avg/max effective price per product, store
+and day), and retires months older than ``SAVERY_PRICE_RAW_RETENTION_MONTHS``:
+each is rolled up once more, detached, then dropped or kept as a standalone
+``prices_archive_*`` table (``SAVERY_PRICE_RETENTION_ACTION``). Expired rows that
+landed in ``prices_default`` are merged into the rollups and deleted.
+
+``DETACH PARTITION ... CONCURRENTLY`` is not allowed while ``prices`` has a
+default partition, so detaching takes ACCESS EXCLUSIVE on ``prices``. The lock
+is held only for the catalog changes at the end of each partition's own short
+transaction (no data is scanned), and it is requested under
+``SAVERY_PRICE_DETACH_LOCK_TIMEOUT_MS`` so a long-running reader makes the
+detach give up, and retry on the next run, instead of queueing every other
+query on ``prices`` behind it.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_RE = re.compile(r"^prices_y(\d{4})m(\d{2})$")
+
+_LIST_PARTITIONS = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = 'prices'
+"""
+
+# Effective price is the promo price when there is one.
+_ROLLUP = """
+INSERT INTO price_daily_rollups (
+    product_id, store_id, day, currency, min_price, avg_price, max_price, observations
+)
+SELECT product_id, store_id, observed_at::date, min(currency),
+       min(coalesce(promo_price, list_price)),
+       round(avg(coalesce(promo_price, list_price)), 4),
+       max(coalesce(promo_price, list_price)),
+       count(*)
+FROM prices
+WHERE observed_at >= :start AND observed_at < :end
+GROUP BY product_id, store_id, observed_at::date
+ON CONFLICT (product_id, store_id, day) DO UPDATE SET
+    currency = excluded.currency,
+    min_price = excluded.min_price,
+    avg_price = excluded.avg_price,
+    max_price = excluded.max_price,
+    observations = excluded.observations
+"""
+
+# Rows reach ``prices_default`` only for months without a partition, including
+# months already retired, so merge them into existing rollups rather than
+# replacing the day.
+_ROLLUP_DEFAULT = """
+INSERT INTO price_daily_rollups (
+    product_id, store_id, day, currency, min_price, avg_price, max_price, observations
+)
+SELECT product_id, store_id, observed_at::date, min(currency),
+       min(coalesce(promo_price, list_price)),
+       round(avg(coalesce(promo_price, list_price)), 4),
+       max(coalesce(promo_price, list_price)),
+       count(*)
+FROM prices_default
+WHERE observed_at < :cutoff
+GROUP BY product_id, store_id, observed_at::date
+ON CONFLICT (product_id, store_id, day) DO UPDATE SET
+    min_price = least(price_daily_rollups.min_price, excluded.min_price),
+    avg_price = round(
+        (price_daily_rollups.avg_price * price_daily_rollups.observations
+         + excluded.avg_price * excluded.observations)
+        / (price_daily_rollups.observations + excluded.observations),
+        4
+    ),
+    max_price = greatest(price_daily_rollups.max_price, excluded.max_price),
+    observations = price_daily_rollups.observations + excluded.observations
+"""
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"prices_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    """Inverse of :func:`partition_name`; ``None`` for other partitions."""
+
+    match = _PARTITION_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+@dataclass
+class MaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    rolled_up_rows: int = 0
+    retired: list[str] = field(default_factory=list)
+    default_rows_retired: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def list_partitions(connection: Any) -> dict[str, date | None]:
+    from sqlalchemy import text
+
+    return {name: partition_month(name) for (name,) in connection.execute(text(_LIST_PARTITIONS))}
+
+
+def ensure_partitions(connection: Any, through: date, *, start: date | None = None) -> list[str]:
+    """Create monthly partitions from ``start`` (default: this month) through ``through``."""
+
+    from sqlalchemy import text
+
+    existing = list_partitions(connection)
+    month = month_start(start or datetime.utcnow())
+    created: list[str] = []
+    while month <= through:
+        name = partition_name(month)
+        if name not in existing:
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF prices "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def rollup_prices(connection: Any, start: datetime, end: datetime) -> int:
+    """Upsert daily rollups for observations in ``[start, end)``; returns rows written.
+
+    Recomputes whole days, so ``start``/``end`` should fall on midnight and
+    re-running a range is harmless.
+    """
+
+    from sqlalchemy import text
+
+    result = connection.execute(text(_ROLLUP), {"start": start, "end": end})
+    return result.rowcount or 0
+
+
+def retire_partition(connection: Any, name: str, *, action: str) -> None:
+    """Roll up, detach and drop (or archive) the monthly partition ``name``."""
+
+    from sqlalchemy import text
+
+    month = partition_month(name)
+    if month is None:
+        raise ValueError(f"{name!r} is not a monthly prices partition")
+    rollup_prices(
+        connection,
+        datetime.combine(month, datetime.min.time()),
+        datetime.combine(add_months(month, 1), datetime.min.time()),
+    )
+    connection.execute(text(f"SET LOCAL lock_timeout = {int(settings.price_detach_lock_timeout_ms)}"))
+    connection.execute(text(f"ALTER TABLE prices DETACH PARTITION {name}"))
+    if action == "archive":
+        connection.execute(text(f"ALTER TABLE {name} RENAME TO {name.replace('prices_', 'prices_archive_', 1)}"))
+    else:
+        connection.execute(text(f"DROP TABLE {name}"))
+
+
+def retire_default_rows(connection: Any, cutoff: datetime) -> int:
+    """Merge ``prices_default`` rows older than ``cutoff`` into rollups, then delete them."""
+
+    from sqlalchemy import text
+
+    connection.execute(text(_ROLLUP_DEFAULT), {"cutoff": cutoff})
+    result = connection.execute(
+        text("DELETE FROM prices_default WHERE observed_at < :cutoff"), {"cutoff": cutoff}
+    )
+    return result.rowcount or 0
+
+
+def maintain_partitions(now: datetime | None = None) -> MaintenanceReport:
+    """Create upcoming partitions, refresh recent rollups and retire expired months."""
+
+    now = now or datetime.utcnow()
+    report = MaintenanceReport()
+    this_month = month_start(now)
+    cutoff = add_months(this_month, -settings.price_raw_retention_months)
+
+    with get_engine().begin() as connection:
+        report.created = ensure_partitions(
+            connection, add_months(this_month, settings.price_partition_months_ahead), start=this_month
+        )
+        today = datetime.combine(now.date(), datetime.min.time())
+        report.rolled_up_rows = rollup_prices(connection, today - timedelta(days=2), today + timedelta(days=1))
+        expired = sorted(
+            name for name, month in list_partitions(connection).items() if month is not None and month < cutoff
+        )
+
+    from sqlalchemy.exc import OperationalError
+
+    for name in expired:
+        # One transaction per partition so a failure leaves the rest intact.
+        try:
+            with get_engine().begin() as connection:
+                retire_partition(connection, name, action=settings.price_retention_action)
+        except OperationalError as exc:
+            logger.warning("Could not retire %s, retrying next run: %s", name, exc)
+            continue
+        report.retired.append(name)
+
+    with get_engine().begin() as connection:
+        report.default_rows_retired = retire_default_rows(
+            connection, datetime.combine(cutoff, datetime.min.time())
+        )
+
+    logger.info("Price partition maintenance: %s", report.as_dict())
+    return report
+
@@ -0,0 +1,106 @@
+"""Celery configuration shared by workers and the lightweight API-side producer.
+
+The API only publishes tasks by name and reads results, so it does not need
+the worker's task registry. :func:`get_producer` returns a bare Celery app
+configured with the same broker, result backend, queues and routes, created on
+first use; importing this module costs nothing. Inside a worker process, where
+``backend.workers.celery_app`` is already loaded, that full app is returned
+instead (it also runs tasks eagerly when configured to).
+
+Each pipeline stage has two lanes: the interactive queue (``matching``, ...)
+for single ``/api/optimize`` requests and a ``.background`` queue for batches,
+ingestion and other bulk work, so the two can be consumed by separate worker
+pools. Messages also carry a broker priority (queues are declared with
+``x-max-priority``), which orders interactive work first wherever lanes share a
+queue, such as ``default``. :func:`lane_options` gives the publish options.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from functools import lru_cache
+from typing import Any
+
+from backend.core.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANE_PRIORITIES = {INTERACTIVE: 8, BACKGROUND: 2}
+
+# Task name prefix -> interactive queue of its stage.
+STAGE_QUEUES = {
+    "workers.matching.": "matching",
+    "workers.scraping.": "scraping",
+    "workers.optimize.": "optimization",
+}
+QUEUES = (
+    "default",
+    *STAGE_QUEUES.values(),
+    *(f"{queue}.{BACKGROUND}" for queue in STAGE_QUEUES.values()),
+)
+PUBLISHED_AT_HEADER = "savery_published_at"
+
+
+def _stamp_published_at(headers: dict[str, Any] | None = None, **_: Any) -> None:
+    # Read by workers.metrics to measure queue wait.
+    if settings.metrics_enabled and headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def lane_queue(task_name: str, lane: str = INTERACTIVE) -> str:
+    """Queue that runs ``task_name`` in ``lane``."""
+
+    queue = next((queue for prefix, queue in STAGE_QUEUES.items() if task_name.startswith(prefix)), "default")
+    if lane == BACKGROUND and queue != "default":
+        return f"{queue}.{BACKGROUND}"
+    return queue
+
+
+def lane_options(task_name: str, lane: str = INTERACTIVE) -> dict[str, Any]:
+    """``apply_async``/``signature`` options publishing ``task_name`` in ``lane``."""
+
+    return {"queue": lane_queue(task_name, lane), "priority": LANE_PRIORITIES[lane]}
+
+
+def configure_celery(app: Any) -> Any:
+    """Apply the broker, queue and routing configuration to ``app``."""
+
+    from celery.signals import before_task_publish
+    from kombu import Queue
+
+    background = {"priority": LANE_PRIORITIES[BACKGROUND]}
+    app.conf.update(
+        broker_url=settings.celery_broker_url,
+        result_backend=settings.celery_result_backend,
+        broker_connection_retry_on_startup=True,
+        task_default_queue="default",
+        task_queues=tuple(Queue(name) for name in QUEUES),
+        task_queue_max_priority=settings.celery_queue_max_priority,
+        task_default_priority=LANE_PRIORITIES[INTERACTIVE],
+        # Prefetched messages are invisible to broker priorities.
+        worker_prefetch_multiplier=settings.celery_prefetch_multiplier,
+        task_routes={
+            "workers.scraping.ingest_prices": {"queue": lane_queue("workers.scraping.", BACKGROUND), **background},
+            "workers.maintenance.*": {"queue": "default", **background},
+            **{f"{prefix}*": {"queue": queue} for prefix, queue in STAGE_QUEUES.items()},
+        },
+    )
+    before_task_publish.connect(_stamp_published_at, weak=False, dispatch_uid="savery-published-at")
+    return app
+
+
+@lru_cache
+def _light_producer() -> Any:
+    from celery import Celery
+
+    return configure_celery(Celery("savery"))
+
+
+def get_producer() -> Any:
+    """Return the Celery app used to publish tasks and read their results."""
+
+    worker = sys.modules.get("backend.workers.celery_app")
+    if worker is not None:
+        return worker.celery_app
+    return _light_producer()
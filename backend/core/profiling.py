@@ -0,0 +1,187 @@
+"""On-demand statistical profiler for individual requests.
+
+:class:`SamplingProfiler` runs one background thread while at least one
+:class:`ProfileSession` is open. Every ``interval`` seconds it captures the
+stacks of all other threads with :func:`sys._current_frames` and adds them to
+each open session as folded stacks (``outer;inner;leaf`` → sample count, the
+input format of flame-graph tools). Threads parked in the event loop's selector
+or a thread pool's idle wait are skipped, so samples reflect work, not waiting.
+
+Samples are not attributed per request: concurrent requests on the same event
+loop show up in each other's profiles. That is the price of profiling
+production traffic without instrumenting code, and why sessions are opened for
+a small fraction of requests only. Finished profiles are kept in a bounded
+:class:`ProfileStore` ring buffer for the admin endpoint.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from backend.core.config import settings
+
+# Leaf frames that mean "idle": (file suffix, function name).
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("concurrent/futures/thread.py", "_worker"),
+}
+_MAX_DEPTH = 128
+
+
+def _idle(frame: Any) -> bool:
+    code = frame.f_code
+    filename = code.co_filename.replace(os.sep, "/")
+    return any(filename.endswith(suffix) and code.co_name == name for suffix, name in _IDLE_FRAMES)
+
+
+def _fold(frame: Any) -> str:
+    names: list[str] = []
+    while frame is not None and len(names) < _MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+@dataclass
+class ProfileSession:
+    """Samples collected for one request."""
+
+    id: int
+    method: str
+    path: str
+    reason: str
+    interval: float
+    deadline: float
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    started: float = field(default_factory=time.perf_counter)
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    duration: float | None = None
+    status: int | None = None
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000.0, 2) if self.duration is not None else None,
+            "interval_ms": round(self.interval * 1000.0, 3),
+            "samples": self.samples,
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def as_dict(self, top: int | None = None) -> dict[str, Any]:
+        stacks = self.stacks.most_common(top)
+        return {**self.summary(), "stacks": [{"stack": stack, "samples": count} for stack, count in stacks]}
+
+
+class ProfileStore:
+    """Ring buffer of the most recent finished profiles."""
+
+    def __init__(self, capacity: int) -> None:
+        self._profiles: deque[ProfileSession] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._profiles.append(session)
+
+    def list(self) -> list[ProfileSession]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> ProfileSession | None:
+        with self._lock:
+            return next((session for session in self._profiles if session.id == profile_id), None)
+
+
+class SamplingProfiler:
+    """Shared sampler thread feeding every open :class:`ProfileSession`."""
+
+    def __init__(self, *, interval: float, max_seconds: float, max_sessions: int, store: ProfileStore) -> None:
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_sessions = max_sessions
+        self.store = store
+        self._sessions: dict[int, ProfileSession] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, method: str, path: str, reason: str) -> ProfileSession | None:
+        """Open a session, or return ``None`` when ``max_sessions`` are already open."""
+
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = ProfileSession(
+                id=next(self._ids),
+                method=method,
+                path=path,
+                reason=reason,
+                interval=self.interval,
+                deadline=time.perf_counter() + self.max_seconds,
+            )
+            self._sessions[session.id] = session
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="savery-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, session: ProfileSession, status: int | None = None) -> None:
+        with self._lock:
+            self._sessions.pop(session.id, None)
+        session.duration = time.perf_counter() - session.started
+        session.status = status
+        self.store.add(session)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+            stacks = [
+                _fold(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != me and not _idle(frame)
+            ]
+            now = time.perf_counter()
+            # Update under the lock so a stopped session is never written to again.
+            with self._lock:
+                for session in self._sessions.values():
+                    # Sessions past their deadline (e.g. long streams) stop sampling.
+                    if session.deadline > now:
+                        session.samples += 1
+                        session.stacks.update(stacks)
+            time.sleep(self.interval)
+
+
+@lru_cache
+def get_profiler() -> SamplingProfiler:
+    """Return the process-wide profiler configured from settings."""
+
+    return SamplingProfiler(
+        interval=settings.profile_interval_seconds,
+        max_seconds=settings.profile_max_seconds,
+        max_sessions=settings.profile_max_concurrent,
+        store=ProfileStore(settings.profile_buffer_size),
+    )
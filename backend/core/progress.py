@@ -0,0 +1,201 @@
+"""Per-stage progress events for optimization jobs.
+
+Every job pre-assigns its stage task ids (``<job>.matching``, ``<job>.pricing``
+and ``<job>`` for routing, see :func:`stage_task_ids`). Workers publish stage
+transitions from Celery signals with ``pg_notify`` on :data:`CHANNEL`; each API
+process holds one ``LISTEN`` connection (:class:`ProgressBroker`) and fans the
+events out to the streams subscribed to that job.
+
+Batches run matching, pricing and the fan-out once for all their lists, under
+ids derived from the batch id; those tasks carry the member job ids in the
+:data:`JOB_IDS_HEADER` message header so their events reach every member job.
+
+Notifications are fire-and-forget: a stream that connects late starts from the
+job's current status, and the final result is always read from the task status,
+never from the notification payload.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "savery_progress"
+STAGES = ("matching", "pricing", "routing")
+# Message header listing the jobs a shared batch stage works for.
+JOB_IDS_HEADER = "savery_job_ids"
+
+
+def stage_task_ids(job_id: str) -> dict[str, str]:
+    """Celery task id of each pipeline stage; the routing task carries the job id."""
+
+    return {"matching": f"{job_id}.matching", "pricing": f"{job_id}.pricing", "routing": job_id}
+
+
+def parse_stage_task_id(task_id: str) -> tuple[str, str]:
+    """Inverse of :func:`stage_task_ids`: return ``(job_id, stage)``."""
+
+    job_id, _, suffix = task_id.rpartition(".")
+    if job_id and suffix in ("matching", "pricing"):
+        return job_id, suffix
+    return task_id, "routing"
+
+
+@dataclass
+class ProgressEvent:
+    """A stage transition; ``state`` is ``started``, ``succeeded`` or ``failed``."""
+
+    job_id: str
+    stage: str
+    state: str
+    at: str
+    elapsed_seconds: float | None = None
+    error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ProgressEvent":
+        return cls(**json.loads(raw))
+
+    @property
+    def final(self) -> bool:
+        return self.state == "failed" or (self.stage == "routing" and self.state == "succeeded")
+
+
+def publish(event: ProgressEvent) -> None:
+    """Send ``event`` to listening API processes (worker side, best effort)."""
+
+    try:
+        from sqlalchemy import func, select
+
+        from backend.core.db import get_engine
+
+        with get_engine().begin() as connection:
+            connection.execute(select(func.pg_notify(CHANNEL, event.to_json())))
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.debug("Progress notification for %s dropped: %s", event.job_id, exc)
+
+
+class StageTimer:
+    """Tracks stage start times inside a worker process to report durations."""
+
+    def __init__(self) -> None:
+        self._started: dict[str, float] = {}
+
+    def started(self, task_id: str) -> ProgressEvent:
+        self._started[task_id] = time.perf_counter()
+        return self._event(task_id, "started")
+
+    def finished(self, task_id: str, *, error: str | None = None) -> ProgressEvent:
+        started = self._started.pop(task_id, None)
+        elapsed = round(time.perf_counter() - started, 4) if started is not None else None
+        return self._event(task_id, "failed" if error else "succeeded", elapsed, error)
+
+    @staticmethod
+    def _event(
+        task_id: str,
+        state: str,
+        elapsed: float | None = None,
+        error: str | None = None,
+    ) -> ProgressEvent:
+        job_id, stage = parse_stage_task_id(task_id)
+        return ProgressEvent(
+            job_id=job_id,
+            stage=stage,
+            state=state,
+            at=datetime.utcnow().isoformat(),
+            elapsed_seconds=elapsed,
+            error=error,
+        )
+
+
+class ProgressBroker:
+    """Single ``LISTEN`` connection per process fanned out to per-job queues."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue[ProgressEvent]]] = {}
+        self._listener: asyncio.Task[None] | None = None
+
+    def subscribe(self, job_id: str) -> asyncio.Queue[ProgressEvent]:
+        queue: asyncio.Queue[ProgressEvent] = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        self._ensure_listener()
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue[ProgressEvent]) -> None:
+        queues = self._subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[job_id]
+
+    def dispatch(self, event: ProgressEvent) -> None:
+        for queue in self._subscribers.get(event.job_id, ()):
+            queue.put_nowait(event)
+
+    async def close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.cancel()
+            try:
+                await listener
+            except asyncio.CancelledError:
+                pass
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        import psycopg
+        from sqlalchemy.engine import make_url
+
+        url = make_url(settings.database_url).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {CHANNEL}")
+                    delay = 1.0
+                    async for notification in connection.notifies():
+                        try:
+                            self.dispatch(ProgressEvent.from_json(notification.payload))
+                        except (TypeError, ValueError) as exc:
+                            logger.warning("Ignoring malformed progress event: %s", exc)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - depends on database availability
+                logger.warning("Progress listener disconnected: %s; retrying in %.0fs", exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+_broker: ProgressBroker | None = None
+
+
+def get_progress_broker() -> ProgressBroker:
+    """Return this process's broker (created on first use inside the event loop)."""
+
+    global _broker
+    if _broker is None:
+        _broker = ProgressBroker()
+    return _broker
+
+
+async def close_progress_broker() -> None:
+    global _broker
+    broker, _broker = _broker, None
+    if broker is not None:
+        await broker.close()
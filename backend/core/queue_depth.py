@@ -0,0 +1,90 @@
+"""Broker queue depth gauges for scaling each queue's worker pool.
+
+:class:`QueueDepthSampler` reads ready-message and consumer counts of the
+pipeline queues with passive declares and publishes them as
+``savery_queue_depth`` / ``savery_queue_consumers``. Workers sample on a
+background thread (``workers.metrics``); the API samples when ``/metrics`` is
+scraped, at most every ``SAVERY_METRICS_QUEUE_SAMPLE_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any
+
+from backend.core.metrics import get_metrics
+from backend.core.producer import QUEUES, get_producer
+
+logger = logging.getLogger(__name__)
+
+_registry = get_metrics()
+QUEUE_DEPTH = _registry.gauge("savery_queue_depth", "Ready messages waiting in the broker queue.")
+QUEUE_CONSUMERS = _registry.gauge("savery_queue_consumers", "Consumers attached to the broker queue.")
+QUEUE_SAMPLED_AT = _registry.gauge("savery_queue_sampled_timestamp_seconds", "When queue depth was last sampled.")
+
+
+class QueueDepthSampler:
+    """Reads message and consumer counts of the configured queues from the broker."""
+
+    def __init__(self, app: Any = None, queues: tuple[str, ...] = QUEUES) -> None:
+        self.app = app
+        self.queues = queues
+        self.sampled_at = 0.0
+        self.depths: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def sample(self) -> dict[str, tuple[int, int]]:
+        depths: dict[str, tuple[int, int]] = {}
+        app = self.app or get_producer()
+        try:
+            with app.connection_for_read() as connection:
+                for queue in self.queues:
+                    # A passive declare of a missing queue closes its channel, so use one per queue.
+                    channel = connection.channel()
+                    try:
+                        _, messages, consumers = channel.queue_declare(queue=queue, passive=True)
+                        depths[queue] = (messages, consumers)
+                    except Exception as exc:  # pragma: no cover - depends on broker state
+                        logger.debug("Queue %s could not be inspected: %s", queue, exc)
+                    finally:
+                        channel.close()
+        except Exception as exc:  # pragma: no cover - depends on broker availability
+            logger.warning("Queue depth sampling failed: %s", exc)
+        for queue, (messages, consumers) in depths.items():
+            QUEUE_DEPTH.set(messages, queue=queue)
+            QUEUE_CONSUMERS.set(consumers, queue=queue)
+        self.sampled_at = time.time()
+        self.depths = depths
+        if depths:
+            QUEUE_SAMPLED_AT.set(self.sampled_at)
+        return depths
+
+    def sample_if_due(self, interval: float, *, wait: bool = True) -> dict[str, tuple[int, int]]:
+        """Sample unless another caller did within ``interval`` seconds; return the latest depths.
+
+        With ``wait=False`` a caller arriving while another one samples gets the
+        previous depths instead of waiting for the broker.
+        """
+
+        if not self._lock.acquire(blocking=wait):
+            return self.depths
+        try:
+            if time.time() - self.sampled_at >= interval:
+                self.sample()
+        finally:
+            self._lock.release()
+        return self.depths
+
+    def run_forever(self, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(0 if not self.sampled_at else interval):
+            self.sample()
+
+
+@lru_cache
+def get_queue_sampler() -> QueueDepthSampler:
+    """Return the process-wide sampler for the pipeline queues."""
+
+    return QueueDepthSampler()
@@ -0,0 +1,101 @@
+"""Per-request phase timings reported in ``Server-Timing`` headers.
+
+The HTTP timing middleware opens a :class:`RequestTimings` for each request in
+a context variable. Code anywhere below it adds time to named phases with
+:func:`record` or :func:`timed`: statements through ``core.db_metrics`` land in
+``db`` and broker publishes in ``enqueue``. Context variables follow the request
+into ``run_in_threadpool`` and SQLAlchemy's async greenlets, so both the async
+and the sync database paths are attributed. Outside a request, recording is a
+no-op.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+# Phases in the order they are reported; unknown phases follow alphabetically.
+PHASE_ORDER = ("validate", "handler", "db", "cache", "enqueue", "serialize")
+
+
+class RequestTimings:
+    """Accumulated seconds (and event counts) per phase of one request."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.marks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def mark(self, name: str) -> None:
+        """Remember when ``name`` happened (e.g. the endpoint function started)."""
+
+        self.marks[name] = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self, total: float | None = None) -> str:
+        """``Server-Timing`` value: one metric per phase plus ``total`` (milliseconds)."""
+
+        with self._lock:
+            phases = dict(self.phases)
+            counts = dict(self.counts)
+        ordered = [phase for phase in PHASE_ORDER if phase in phases]
+        ordered += sorted(set(phases) - set(PHASE_ORDER))
+        parts = []
+        for phase in ordered:
+            part = f"{phase};dur={phases[phase] * 1000.0:.2f}"
+            if phase in ("db", "enqueue") and counts.get(phase, 0) > 1:
+                part += f';desc="{counts[phase]} calls"'
+            parts.append(part)
+        parts.append(f"total;dur={(self.elapsed() if total is None else total) * 1000.0:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("savery_request_timings", default=None)
+
+
+def begin() -> tuple[RequestTimings, Token]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> RequestTimings | None:
+    return _current.get()
+
+
+def record(phase: str, seconds: float) -> None:
+    """Add ``seconds`` to ``phase`` of the current request, if there is one."""
+
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Attribute the wall time of the block to ``phase`` of the current request."""
+
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
@@ -0,0 +1,155 @@
+"""Whole-request memoization of optimization results.
+
+Requests are reduced to a canonical form (items sorted with whitespace and case
+normalized, store set sorted, coordinates snapped to a grid, preference defaults
+filled in) and hashed. ``plan_route`` stores its output under that fingerprint;
+``enqueue_optimization_job`` looks it up before building a Celery chain.
+
+An entry is served while it is younger than its TTL and no price for any of its
+stores has been observed since it was computed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.db import session_scope
+
+logger = logging.getLogger(__name__)
+
+CACHED_TASK_PREFIX = "cached-"
+
+_PREFERENCE_DEFAULTS = {"cost_priority": 0.5, "max_stores": None, "allow_bulk": False}
+
+
+def _clean(text: Any) -> str | None:
+    if text is None:
+        return None
+    return " ".join(str(text).split()).lower() or None
+
+
+def _bucket(value: float | None) -> int | None:
+    if value is None:
+        return None
+    return math.floor(value / settings.result_cache_coordinate_bucket_degrees)
+
+
+def canonical_request(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return the cache-relevant content of an optimization request."""
+
+    items = sorted(
+        (
+            [
+                _clean(item.get("name")) or "",
+                item.get("quantity"),
+                _clean(item.get("unit")),
+                _clean(item.get("notes")),
+            ]
+            for item in payload.get("items", [])
+        ),
+        key=json.dumps,
+    )
+    preferences = {**_PREFERENCE_DEFAULTS, **(payload.get("preferences") or {})}
+    has_origin = payload.get("latitude") is not None and payload.get("longitude") is not None
+    return {
+        "items": items,
+        "store_ids": sorted(set(payload.get("store_ids", []))),
+        "origin": [_bucket(payload["latitude"]), _bucket(payload["longitude"])] if has_origin else None,
+        "preferences": {key: preferences[key] for key in sorted(_PREFERENCE_DEFAULTS)},
+    }
+
+
+def request_fingerprint(payload: dict[str, Any]) -> str:
+    """Stable SHA-256 hex digest of :func:`canonical_request`."""
+
+    canonical = json.dumps(canonical_request(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cached_task_id(fingerprint: str) -> str:
+    return f"{CACHED_TASK_PREFIX}{fingerprint}"
+
+
+def fingerprint_from_task_id(task_id: str) -> str | None:
+    if task_id.startswith(CACHED_TASK_PREFIX):
+        return task_id[len(CACHED_TASK_PREFIX) :]
+    return None
+
+
+def lookup(fingerprint: str) -> dict[str, Any] | None:
+    """Return the memoized result for ``fingerprint`` if it is still valid."""
+
+    if not settings.result_cache_enabled:
+        return None
+    try:
+        from sqlalchemy import exists, select
+
+        from backend.core.schema import OptimizationResultCache, Price, Store
+
+        with session_scope() as session:
+            entry = session.get(OptimizationResultCache, fingerprint)
+            if entry is None or entry.expires_at <= datetime.utcnow():
+                return None
+            repriced = session.execute(
+                select(
+                    exists().where(
+                        Price.store_id == Store.id,
+                        Store.external_id.in_(list(entry.store_ids)),
+                        Price.observed_at > entry.created_at,
+                    )
+                )
+            ).scalar()
+            return None if repriced else entry.result_payload
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Result cache lookup failed: %s", exc)
+        return None
+
+
+def load(fingerprint: str) -> dict[str, Any] | None:
+    """Return the stored result for ``fingerprint`` regardless of freshness.
+
+    Used to resolve task ids handed out on a hit, which must keep resolving even
+    if the entry is invalidated between the lookup and the client's poll.
+    """
+
+    try:
+        from backend.core.schema import OptimizationResultCache
+
+        with session_scope() as session:
+            entry = session.get(OptimizationResultCache, fingerprint)
+            return entry.result_payload if entry is not None else None
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Result cache load failed: %s", exc)
+        return None
+
+
+def store(request: dict[str, Any], result: dict[str, Any]) -> str | None:
+    """Memoize ``result`` for ``request``; return the fingerprint when stored."""
+
+    if not settings.result_cache_enabled:
+        return None
+    fingerprint = request_fingerprint(request)
+    now = datetime.utcnow()
+    try:
+        from backend.core.schema import OptimizationResultCache
+
+        with session_scope() as session:
+            session.merge(
+                OptimizationResultCache(
+                    fingerprint=fingerprint,
+                    store_ids=sorted(set(request.get("store_ids", []))),
+                    result_payload=result,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.result_cache_ttl_seconds),
+                )
+            )
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Result cache store failed: %s", exc)
+        return None
+    return fingerprint
@@ -8,11 +8,14 @@ from typing import Any
 try:
     from sqlalchemy import (
         Column,
+        Date,
         DateTime,
         Float,
         ForeignKey,
+        Index,
         Integer,
         JSON,
+        LargeBinary,
         Numeric,
         String,
         Text,
@@ -21,7 +24,7 @@ try:
     from sqlalchemy.orm import declarative_base, relationship
 except ModuleNotFoundError:  # pragma: no cover - optional during early scaffolding
     Column = lambda *args, **kwargs: None  # type: ignore
-    DateTime = Float = ForeignKey = Integer = JSON = Numeric = String = Text = JSONB = Any  # type: ignore # noqa: N816
+    Date = DateTime = Float = ForeignKey = Index = Integer = JSON = LargeBinary = Numeric = String = Text = JSONB = Any  # type: ignore # noqa: N816
     relationship = lambda *args, **kwargs: None  # type: ignore
 
     def declarative_base() -> Any:  # type: ignore
@@ -73,6 +76,7 @@ class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(String(128), unique=True, nullable=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     category = Column(String(128), nullable=True)
@@ -86,23 +90,50 @@ class Product(Base):
 
 
 class Price(Base):
-    """Price observation for a specific product at a specific store."""
+    """Price observation for a specific product at a specific store.
+
+    Range-partitioned by month on ``observed_at`` (see ``core.price_history``), so
+    the partition key is part of the primary key.
+    """
 
     __tablename__ = "prices"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     list_price = Column(Numeric(10, 2), nullable=False)
     promo_price = Column(Numeric(10, 2), nullable=True)
     unit = Column(String(32), nullable=True)
     currency = Column(String(8), default="USD", nullable=False)
-    observed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    observed_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
     raw_payload = Column(JSONType, nullable=True)
 
     store = relationship("Store", back_populates="prices")
     product = relationship("Product", back_populates="prices")
 
+    __table_args__ = (
+        # Serves latest-price lookups and the ingestion duplicate check.
+        Index("ix_prices_product_store_observed_at", product_id, store_id, observed_at.desc()),
+        # Serves the result cache's check for prices observed after an entry was stored.
+        Index("ix_prices_store_observed_at", store_id, observed_at),
+        {"postgresql_partition_by": "RANGE (observed_at)"},
+    )
+
+
+class PriceDailyRollup(Base):
+    """Daily min/avg/max effective price per product and store, kept after raw rows expire."""
+
+    __tablename__ = "price_daily_rollups"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    store_id = Column(Integer, ForeignKey("stores.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    currency = Column(String(8), nullable=False)
+    min_price = Column(Numeric(10, 2), nullable=False)
+    avg_price = Column(Numeric(12, 4), nullable=False)
+    max_price = Column(Numeric(10, 2), nullable=False)
+    observations = Column(Integer, nullable=False)
+
 
 class OptimizationJob(Base):
     """Track Celery tasks and optimization results."""
@@ -113,6 +144,43 @@ class OptimizationJob(Base):
     task_id = Column(String(64), unique=True, nullable=False, index=True)
     input_payload = Column(JSONType, nullable=False)
     result_payload = Column(JSONType, nullable=True)
+    result_compressed = Column(LargeBinary, nullable=True)
     status = Column(String(32), default="pending", nullable=False)
+    stage = Column(String(32), nullable=True)
+    lane = Column(String(16), default="interactive", server_default="interactive", nullable=False)
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+
+
+class OptimizationResultCache(Base):
+    """Memoized optimization results keyed by a canonical request fingerprint."""
+
+    __tablename__ = "optimization_result_cache"
+
+    fingerprint = Column(String(64), primary_key=True)
+    store_ids = Column(JSONType, nullable=False)
+    result_payload = Column(JSONType, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class PipelineBlob(Base):
+    """Content-addressed, compressed stage payload referenced by claim-check messages."""
+
+    __tablename__ = "pipeline_blobs"
+
+    digest = Column(String(64), primary_key=True)
+    payload = Column(LargeBinary, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class ProviderRequestCount(Base):
+    """Requests spent against a provider's daily quota, shared by every worker."""
+
+    __tablename__ = "provider_request_counts"
+
+    provider = Column(String(32), primary_key=True)
+    day = Column(Date, primary_key=True)
+    used = Column(Integer, default=0, nullable=False)
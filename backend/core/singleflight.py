@@ -0,0 +1,235 @@
+"""Coalesce identical in-flight lookups within and across worker processes.
+
+When several tasks ask for the same key at once only one of them (the leader)
+performs the expensive fetch; the others wait and share its result.
+
+* Within a process, followers wait on a ``threading.Event`` owned by the leader.
+* Across processes, leaders take a Postgres session-level advisory lock per key
+  with ``pg_try_advisory_lock``, all keys in one statement. A process that finds
+  a key locked first finishes the keys it owns and releases them (again in one
+  statement), then waits for the other locks and re-reads the shared store
+  (``recheck``) instead of calling the provider again. Leaders never wait and
+  followers only take shared locks, in lock id order, so the scheme is
+  deadlock-free; a follower waits at most ``wait_timeout`` for all its keys.
+  Only keys the shared store can serve (``shared``) take part: for the others a
+  follower would wait and then fetch anyway.
+
+If Postgres is unreachable the distributed layer is skipped and only in-process
+coalescing applies.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, TypeVar
+
+from backend.core.config import settings
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def advisory_key(namespace: str, key: Hashable) -> int:
+    """Map ``(namespace, key)`` to a stable signed 64-bit advisory lock ID."""
+
+    digest = hashlib.blake2b(f"{namespace}:{key!r}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class _Flight:
+    __slots__ = ("done", "results")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.results: dict[Any, Any] = {}
+
+
+class SingleFlight:
+    """Per-namespace coordinator for batched, coalesced fetches."""
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        wait_timeout: float = 30.0,
+        distributed: bool = True,
+    ) -> None:
+        self.namespace = namespace
+        self.wait_timeout = wait_timeout
+        self.distributed = distributed
+        self._lock = threading.Lock()
+        self._flights: dict[Any, _Flight] = {}
+        self._counters = {"led": 0, "joined_local": 0, "joined_remote": 0}
+
+    def do_many(
+        self,
+        keys: Iterable[K],
+        fetch: Callable[[list[K]], dict[K, V]],
+        *,
+        recheck: Callable[[list[K]], dict[K, V]] | None = None,
+        shared: Callable[[K], bool] | None = None,
+    ) -> dict[K, V]:
+        """Return results for ``keys``, calling ``fetch`` only for keys nobody else is fetching.
+
+        ``fetch`` receives the keys this caller leads and returns whatever results
+        it could obtain. ``recheck`` reads the shared store; it runs before any
+        distributed fetch so work finished by another process is reused.
+        ``shared`` tells which keys ``recheck`` can serve from another process's
+        work (default: all); the others are coalesced within this process only,
+        since waiting on another process would not spare their fetch.
+        """
+
+        wanted = list(dict.fromkeys(keys))
+        led: list[K] = []
+        joined: dict[K, _Flight] = {}
+
+        with self._lock:
+            for key in wanted:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    led.append(key)
+                else:
+                    joined[key] = flight
+            self._counters["led"] += len(led)
+            self._counters["joined_local"] += len(joined)
+
+        results: dict[K, V] = {}
+        if led:
+            try:
+                results.update(self._lead(led, fetch, recheck, shared))
+            finally:
+                with self._lock:
+                    for key in led:
+                        flight = self._flights.pop(key)
+                        if key in results:
+                            flight.results[key] = results[key]
+                        flight.done.set()
+
+        for key, flight in joined.items():
+            if flight.done.wait(self.wait_timeout) and key in flight.results:
+                results[key] = flight.results[key]
+
+        return results
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["in_flight"] = len(self._flights)
+        return counters
+
+    def _lead(
+        self,
+        keys: list[K],
+        fetch: Callable[[list[K]], dict[K, V]],
+        recheck: Callable[[list[K]], dict[K, V]] | None,
+        shared: Callable[[K], bool] | None = None,
+    ) -> dict[K, V]:
+        local = [key for key in keys if shared is not None and not shared(key)]
+        distributed = [key for key in keys if shared is None or shared(key)]
+        connection = self._connect() if self.distributed and distributed else None
+        if connection is None:
+            return fetch(keys)
+
+        try:
+            from sqlalchemy import text
+
+            lock_ids = {key: advisory_key(self.namespace, key) for key in distributed}
+            acquired = dict(
+                connection.execute(
+                    text("SELECT id, pg_try_advisory_lock(id) FROM unnest(CAST(:ids AS bigint[])) AS id"),
+                    {"ids": sorted(set(lock_ids.values()))},
+                ).all()
+            )
+            connection.commit()
+            owned = [key for key in distributed if acquired[lock_ids[key]]]
+            contended = [key for key in distributed if not acquired[lock_ids[key]]]
+
+            results: dict[K, V] = {}
+            try:
+                if owned:
+                    # Another process may have finished these keys since our caller
+                    # last read the shared store.
+                    results.update(self._refill(owned, fetch, recheck, also=local))
+                elif local:
+                    results.update(fetch(local))
+            finally:
+                if owned:
+                    connection.execute(
+                        text("SELECT pg_advisory_unlock(id) FROM unnest(CAST(:ids AS bigint[])) AS id"),
+                        {"ids": sorted({lock_ids[key] for key in owned})},
+                    )
+                    connection.commit()
+
+            if contended:
+                with self._lock:
+                    self._counters["joined_remote"] += len(contended)
+                self._await_release(connection, sorted({lock_ids[key] for key in contended}))
+                results.update(self._refill(contended, fetch, recheck))
+            return results
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _refill(
+        keys: list[K],
+        fetch: Callable[[list[K]], dict[K, V]],
+        recheck: Callable[[list[K]], dict[K, V]] | None,
+        *,
+        also: Iterable[K] = (),
+    ) -> dict[K, V]:
+        """Recheck ``keys`` and fetch what is still missing, together with ``also``."""
+
+        results = dict(recheck(keys)) if recheck is not None else {}
+        missing = [key for key in keys if key not in results] + list(also)
+        if missing:
+            results.update(fetch(missing))
+        return results
+
+    def _await_release(self, connection: Any, lock_ids: list[int]) -> None:
+        """Block until other processes release ``lock_ids``, for at most ``wait_timeout`` in total."""
+
+        from sqlalchemy import text
+
+        try:
+            # Transaction-local so the pooled connection keeps its defaults. The
+            # shared transaction locks are taken in ``lock_ids`` order and released
+            # by the commit (or the rollback after a timeout).
+            connection.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": f"{int(self.wait_timeout * 1000)}ms"},
+            )
+            connection.execute(
+                text("SELECT count(pg_advisory_xact_lock_shared(id)) FROM unnest(CAST(:ids AS bigint[])) AS id"),
+                {"ids": lock_ids},
+            )
+            connection.commit()
+        except Exception:  # pragma: no cover - lock wait timed out
+            logger.debug("Timed out waiting on %d %s leases", len(lock_ids), self.namespace)
+            connection.rollback()
+
+    @staticmethod
+    def _connect() -> Any | None:
+        try:
+            return get_engine().connect()
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.debug("Single-flight falling back to in-process only: %s", exc)
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_single_flight(namespace: str) -> SingleFlight:
+    """Return the process-wide coordinator for ``namespace`` (e.g. ``price``, ``product``)."""
+
+    return SingleFlight(
+        namespace,
+        wait_timeout=settings.singleflight_wait_timeout_seconds,
+        distributed=settings.singleflight_distributed,
+    )
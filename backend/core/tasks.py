@@ -3,55 +3,211 @@
 from __future__ import annotations
 
 from typing import Any
+from uuid import uuid4
 
-from celery import chain
-from celery.result import AsyncResult
-
+from backend.core import batch, claim_check, job_store, request_timing, result_cache
+from backend.core.admission import OverCapacity, get_admission_controller
 from backend.core.config import settings
-from backend.workers.celery_app import celery_app
+from backend.core.producer import BACKGROUND, INTERACTIVE, get_producer, lane_options
+from backend.core.progress import JOB_IDS_HEADER, STAGES, stage_task_ids
 
 MATCHING_TASK = settings.celery_matching_task
 PRICING_TASK = settings.celery_pricing_task
 OPTIMIZATION_TASK = settings.celery_route_task
-
-
-def _build_workflow(payload: dict[str, Any]):
-    """Return the Celery canvas representing the optimization pipeline."""
-
-    match_signature = celery_app.signature(MATCHING_TASK, kwargs={"payload": payload})
-    price_signature = celery_app.signature(PRICING_TASK)
-    route_signature = celery_app.signature(OPTIMIZATION_TASK)
+BATCH_FAN_OUT_TASK = "workers.optimize.fan_out_batch"
+
+
+def _build_workflow(payload: dict[str, Any], job_id: str | None = None, lane: str = INTERACTIVE):
+    """Return the Celery canvas representing the optimization pipeline.
+
+    Stage task ids are derived from ``job_id`` so progress events can be mapped
+    back to the job (see :func:`backend.core.progress.stage_task_ids`). Every
+    stage is published to ``lane``'s queue with its priority.
+    """
+
+    from celery import chain
+
+    celery_app = get_producer()
+    task_ids = stage_task_ids(job_id or str(uuid4()))
+    match_signature = celery_app.signature(
+        MATCHING_TASK,
+        kwargs={"payload": claim_check.put(payload)},
+        task_id=task_ids["matching"],
+        **lane_options(MATCHING_TASK, lane),
+    )
+    price_signature = celery_app.signature(
+        PRICING_TASK, task_id=task_ids["pricing"], **lane_options(PRICING_TASK, lane)
+    )
+    route_signature = celery_app.signature(
+        OPTIMIZATION_TASK, task_id=task_ids["routing"], **lane_options(OPTIMIZATION_TASK, lane)
+    )
 
     return chain(match_signature, price_signature, route_signature)
 
 
 def enqueue_optimization_job(payload: Any) -> str:
-    """Submit an optimization job to Celery and return the task identifier."""
+    """Submit an optimization job to Celery and return the task identifier.
+
+    Identical requests answered within the result-cache TTL get a ``cached-``
+    task id that resolves from the cache without touching the broker. Raises
+    :class:`~backend.core.admission.OverCapacity` when admission control refuses
+    the job; its ``stale_task_id`` is set when an outdated cached result exists.
+    """
 
     if hasattr(payload, "model_dump"):
         payload = payload.model_dump()
 
-    workflow = _build_workflow(payload)
-    async_result = workflow.apply_async()
+    fingerprint = result_cache.request_fingerprint(payload)
+    with request_timing.timed("cache"):
+        cached = result_cache.lookup(fingerprint)
+    if cached is not None:
+        return result_cache.cached_task_id(fingerprint)
+
+    if settings.admission_enabled:
+        decision = get_admission_controller().check(INTERACTIVE)
+        if not decision.admitted:
+            stale = settings.admission_serve_stale and result_cache.load(fingerprint) is not None
+            raise OverCapacity(decision, result_cache.cached_task_id(fingerprint) if stale else None)
+
+    job_id = str(uuid4())
+    if settings.job_store_enabled:
+        job_store.create_job(job_id, payload)
+    workflow = _build_workflow(payload, job_id)
+    with request_timing.timed("enqueue"):
+        async_result = workflow.apply_async()
     return async_result.id
 
 
-def get_task_status(task_id: str) -> dict[str, Any]:
-    """Return basic status information for a Celery task."""
+def enqueue_optimization_batch(payloads: list[Any]) -> tuple[str, list[str]]:
+    """Submit many optimization requests sharing one matching/pricing pass.
+
+    Returns ``(batch_id, task_ids)`` with one task id per request, in order.
+    Requests answered by the result cache get ``cached-`` ids and are left out
+    of the shared pass; the rest are matched and priced as one deduplicated
+    union, then routed individually (see ``workers.optimize.fan_out_batch``).
+    Batches run in the background lane; :class:`~backend.core.admission.OverCapacity`
+    is raised when that lane is full.
+    """
+
+    requests = [payload.model_dump() if hasattr(payload, "model_dump") else payload for payload in payloads]
+    batch_id = str(uuid4())
+    task_ids: list[str] = []
+    pending: list[dict[str, Any]] = []
+    job_ids: list[str] = []
+    for request in requests:
+        fingerprint = result_cache.request_fingerprint(request)
+        with request_timing.timed("cache"):
+            cached = result_cache.lookup(fingerprint)
+        if cached is not None:
+            task_ids.append(result_cache.cached_task_id(fingerprint))
+            continue
+        job_id = str(uuid4())
+        task_ids.append(job_id)
+        pending.append(request)
+        job_ids.append(job_id)
+
+    if not pending:
+        return batch_id, task_ids
+
+    if settings.admission_enabled:
+        decision = get_admission_controller().check(BACKGROUND)
+        if not decision.admitted:
+            raise OverCapacity(decision)
+    if settings.job_store_enabled:
+        for job_id, request in zip(job_ids, pending):
+            job_store.create_job(job_id, request, lane=BACKGROUND)
+
+    from celery import chain
+
+    celery_app = get_producer()
+    union, positions = batch.build_union(pending)
+    stage_ids = stage_task_ids(batch_id)
+    batch_plan = {"requests": pending, "positions": positions, "job_ids": job_ids}
+    # The shared stages report their progress and failures to every member job.
+    headers = {JOB_IDS_HEADER: job_ids}
+    workflow = chain(
+        celery_app.signature(
+            MATCHING_TASK,
+            kwargs={"payload": claim_check.put(union)},
+            task_id=stage_ids["matching"],
+            headers=headers,
+            **lane_options(MATCHING_TASK, BACKGROUND),
+        ),
+        celery_app.signature(
+            PRICING_TASK,
+            task_id=stage_ids["pricing"],
+            headers=headers,
+            **lane_options(PRICING_TASK, BACKGROUND),
+        ),
+        celery_app.signature(
+            BATCH_FAN_OUT_TASK,
+            kwargs={"batch_plan": claim_check.put(batch_plan)},
+            task_id=batch_id,
+            headers=headers,
+            **lane_options(BATCH_FAN_OUT_TASK, BACKGROUND),
+        ),
+    )
+    with request_timing.timed("enqueue"):
+        workflow.apply_async()
+    return batch_id, task_ids
+
+
+def _pipeline(job_id: str) -> list[dict[str, str]]:
+    task_ids = stage_task_ids(job_id)
+    names = (MATCHING_TASK, PRICING_TASK, OPTIMIZATION_TASK)
+    return [
+        {"stage": stage, "name": name, "task_id": task_ids[stage]}
+        for stage, name in zip(STAGES, names)
+    ]
+
+
+def _cached_task_status(task_id: str, fingerprint: str) -> dict[str, Any]:
+    result = result_cache.load(fingerprint)
+    found = result is not None
+    return {
+        "id": task_id,
+        "status": "SUCCESS" if found else "FAILURE",
+        "ready": True,
+        "successful": found,
+        "result": result if found else {"error": "Cached result is no longer available."},
+        "pipeline": _pipeline(task_id),
+    }
 
-    async_result = AsyncResult(task_id, app=celery_app)
 
-    status_payload = {
+def get_task_status(task_id: str) -> dict[str, Any]:
+    """Return basic status information for a Celery task.
+
+    Jobs recorded in ``optimization_jobs`` are answered from there (through the
+    job store's in-process cache); other ids fall back to the result backend.
+    """
+
+    fingerprint = result_cache.fingerprint_from_task_id(task_id)
+    if fingerprint is not None:
+        return _cached_task_status(task_id, fingerprint)
+
+    if settings.job_store_enabled:
+        job = job_store.load_job(task_id)
+        if job is not None:
+            return {**job, "pipeline": _pipeline(task_id)}
+
+    from celery import states
+    from celery.result import AsyncResult
+
+    async_result = AsyncResult(task_id, app=get_producer())
+    # Read the state once; ready()/successful() would each query the backend again.
+    state = async_result.state
+    ready = state in states.READY_STATES
+    successful = state == states.SUCCESS
+    result = async_result.result if ready else None
+    if successful:
+        # Pipelines in claim-check mode return a reference to the stored output.
+        result = claim_check.resolve(result)
+
+    return {
         "id": task_id,
-        "status": async_result.status,
-        "ready": async_result.ready(),
-        "successful": async_result.successful(),
-        "result": async_result.result if async_result.ready() else None,
-        "pipeline": [
-            {"name": MATCHING_TASK},
-            {"name": PRICING_TASK},
-            {"name": OPTIMIZATION_TASK},
-        ],
+        "status": state,
+        "ready": ready,
+        "successful": successful,
+        "result": result,
+        "pipeline": _pipeline(task_id),
     }
-
-    return status_payload
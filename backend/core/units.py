@@ -0,0 +1,207 @@
+"""Unit normalization for list quantities and package sizes.
+
+Unit strings (``"16 oz"``, ``"2 x 500 ml"``, ``"1/2 gal"``, ``"12 ct"``, ``"lb"``)
+are parsed with one precompiled regular expression and a fixed alias table into a
+:class:`Measure`: a dimension (mass, volume or count) and an amount in that
+dimension's base unit (grams, millilitres, items). Parsing is memoized per
+distinct string, so a job only pays for the unit strings it has not seen yet.
+
+:func:`normalize_offers` converts every offer of a job to base amounts and unit
+prices in one vectorized pass, which is what the cost matrix uses to decide how
+many packages cover a requested quantity.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, NamedTuple
+
+import numpy as np
+
+MASS = 0
+VOLUME = 1
+COUNT = 2
+UNKNOWN = -1
+
+DIMENSIONS = ("mass", "volume", "count")
+BASE_UNITS = ("g", "ml", "each")
+
+_GRAMS_PER_OUNCE = 28.349523125
+_ML_PER_US_FLUID_OUNCE = 29.5735295625
+
+_ALIASES: dict[str, tuple[int, float]] = {}
+
+
+def _alias(dimension: int, factor: float, *names: str) -> None:
+    for name in names:
+        _ALIASES[name] = (dimension, factor)
+
+
+_alias(MASS, 1.0, "g", "gr", "gram", "grams", "gramme", "grammes")
+_alias(MASS, 1000.0, "kg", "kgs", "kilo", "kilos", "kilogram", "kilograms")
+_alias(MASS, 0.001, "mg", "milligram", "milligrams")
+_alias(MASS, _GRAMS_PER_OUNCE, "oz", "ozs", "ounce", "ounces", "wt oz", "net wt oz")
+_alias(MASS, 16 * _GRAMS_PER_OUNCE, "lb", "lbs", "pound", "pounds", "#")
+_alias(VOLUME, 1.0, "ml", "mls", "milliliter", "milliliters", "millilitre", "millilitres", "cc")
+_alias(VOLUME, 10.0, "cl", "centiliter", "centiliters")
+_alias(VOLUME, 1000.0, "l", "lt", "ltr", "liter", "liters", "litre", "litres")
+_alias(VOLUME, _ML_PER_US_FLUID_OUNCE, "fl oz", "floz", "fluid ounce", "fluid ounces", "fl ounce")
+_alias(VOLUME, 8 * _ML_PER_US_FLUID_OUNCE, "cup", "cups")
+_alias(VOLUME, 16 * _ML_PER_US_FLUID_OUNCE, "pt", "pint", "pints")
+_alias(VOLUME, 32 * _ML_PER_US_FLUID_OUNCE, "qt", "quart", "quarts")
+_alias(VOLUME, 128 * _ML_PER_US_FLUID_OUNCE, "gal", "gallon", "gallons")
+_alias(VOLUME, 14.78676478125, "tbsp", "tablespoon", "tablespoons")
+_alias(VOLUME, 4.92892159375, "tsp", "teaspoon", "teaspoons")
+_alias(
+    COUNT,
+    1.0,
+    "ct",
+    "cnt",
+    "count",
+    "ea",
+    "each",
+    "pc",
+    "pcs",
+    "piece",
+    "pieces",
+    "item",
+    "items",
+    "unit",
+    "units",
+    "pk",
+    "pack",
+    "packs",
+    "bunch",
+    "bunches",
+    "head",
+    "heads",
+)
+_alias(COUNT, 12.0, "dz", "doz", "dozen", "dozens")
+
+# Longest aliases first so "fl oz" wins over "oz".
+_UNIT_PATTERN = "|".join(re.escape(name) for name in sorted(_ALIASES, key=len, reverse=True))
+_MEASURE_RE = re.compile(
+    rf"(?:(?P<multiple>\d+)\s*[x×]\s*)?"
+    rf"(?P<amount>\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+)?\s*"
+    rf"(?<![a-z])(?P<unit>{_UNIT_PATTERN})(?![a-z])",
+    re.IGNORECASE,
+)
+# Separators collapse to one space; a dot survives only as a decimal point.
+_SPACE_RE = re.compile(r"(?:[\s\-_]|\.(?!\d))+")
+
+
+class Measure(NamedTuple):
+    """An amount in the base unit of ``dimension`` (grams, millilitres or items)."""
+
+    dimension: int
+    amount: float
+
+    @property
+    def base_unit(self) -> str:
+        return BASE_UNITS[self.dimension]
+
+
+def _number(text: str) -> float:
+    whole, _, fraction = text.strip().rpartition(" ")
+    if "/" in fraction:
+        numerator, denominator = fraction.split("/")
+        value = float(numerator) / float(denominator) if float(denominator) else 0.0
+    else:
+        value = float(fraction)
+    return value + (float(whole) if whole else 0.0)
+
+
+@lru_cache(maxsize=8192)
+def parse_unit(text: str | None) -> Measure | None:
+    """Parse a unit or package-size string; ``None`` when no known unit is present.
+
+    A bare unit (``"lb"``) means one of it; ``"2 x 500 ml"`` multiplies out. Mass
+    and volume win over counts, so ``"6 pack 12 fl oz"`` is 6 x 12 fl oz.
+    """
+
+    if not text:
+        return None
+    normalized = _SPACE_RE.sub(" ", text.lower()).strip()
+    count: Measure | None = None
+    for match in _MEASURE_RE.finditer(normalized):
+        dimension, factor = _ALIASES[match.group("unit")]
+        amount = _number(match.group("amount")) if match.group("amount") else 1.0
+        if match.group("multiple"):
+            amount *= int(match.group("multiple"))
+        if dimension != COUNT:
+            return Measure(dimension, amount * factor * (count.amount if count else 1.0))
+        if count is None:
+            count = Measure(COUNT, amount * factor)
+    return count
+
+
+def requested_measure(quantity: float | None, unit: str | None) -> Measure | None:
+    """Measure of a list item's ``quantity`` ``unit`` (``None`` if the unit is unknown)."""
+
+    measure = parse_unit(unit)
+    if measure is None:
+        return None
+    count = quantity if quantity is not None and quantity > 0 else 1.0
+    return Measure(measure.dimension, measure.amount * count)
+
+
+@dataclass
+class OfferUnits:
+    """Per-offer arrays produced by :func:`normalize_offers` (aligned with the input)."""
+
+    dimension: np.ndarray
+    amount: np.ndarray
+    price: np.ndarray
+    unit_price: np.ndarray
+
+    def basis(self, index: int) -> str | None:
+        dimension = int(self.dimension[index])
+        return BASE_UNITS[dimension] if dimension != UNKNOWN else None
+
+
+def normalize_offers(offers: Iterable[dict[str, Any]]) -> OfferUnits:
+    """Base amounts and per-base-unit prices for ``offers`` in one pass.
+
+    Each distinct ``unit`` string is parsed once; unparseable sizes get dimension
+    :data:`UNKNOWN` and a ``nan`` unit price.
+    """
+
+    units: list[str | None] = []
+    prices: list[float] = []
+    for offer in offers:
+        units.append(offer.get("unit"))
+        price = offer.get("price")
+        prices.append(float(price) if price is not None else np.nan)
+
+    distinct = list(dict.fromkeys(units))
+    measures = [parse_unit(unit) for unit in distinct]
+    lookup_dimension = np.array([m.dimension if m else UNKNOWN for m in measures], dtype=np.int8)
+    lookup_amount = np.array([m.amount if m else np.nan for m in measures], dtype=np.float64)
+    position = {unit: index for index, unit in enumerate(distinct)}
+    codes = np.fromiter((position[unit] for unit in units), dtype=np.int64, count=len(units))
+
+    dimension = lookup_dimension[codes] if len(units) else np.zeros(0, dtype=np.int8)
+    amount = lookup_amount[codes] if len(units) else np.zeros(0)
+    price = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_price = np.where(amount > 0, price / amount, np.nan)
+    return OfferUnits(dimension=dimension, amount=amount, price=price, unit_price=unit_price)
+
+
+def packages_needed(
+    requested_dimension: np.ndarray,
+    requested_amount: np.ndarray,
+    requested_count: np.ndarray,
+    offer_dimension: np.ndarray,
+    offer_amount: np.ndarray,
+) -> np.ndarray:
+    """Whole packages to buy per offer: enough to cover the requested amount when
+    the dimensions agree, otherwise the requested count rounded up."""
+
+    comparable = (requested_dimension == offer_dimension) & (requested_dimension != UNKNOWN) & (offer_amount > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Small tolerance so 16 oz against a 1 lb package is one package, not two.
+        covered = np.ceil(requested_amount / offer_amount - 1e-9)
+    return np.where(comparable, np.maximum(covered, 1.0), np.ceil(requested_count - 1e-9))
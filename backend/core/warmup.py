@@ -0,0 +1,163 @@
+"""Preloading of worker lookup structures and their background refresh.
+
+A Celery worker's parent process calls :func:`warm_up` before forking its pool,
+so the product text index, the store index, the embedding catalog and parsed
+package units are built once and inherited by every prefork child. The children
+only read the large base arrays, so those pages stay shared copy-on-write;
+:func:`prepare_fork` closes pooled database connections (which must not cross a
+fork) and freezes the heap so the children's garbage collector does not touch
+the inherited objects either.
+
+In each child a :class:`Refresher` thread applies database changes every
+``SAVERY_WORKER_REFRESH_TICK_SECONDS`` once a structure is due, off the task
+path. Refreshes build the next version next to the current one and swap it in
+with one assignment, so a task holding the previous version keeps a consistent
+view. Children forked later (autoscaling, ``--max-tasks-per-child``) start from
+the parent's snapshot and catch up with a delta refresh.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from backend.core.config import settings
+from backend.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+WARMUP_SECONDS = get_metrics().gauge("savery_worker_warmup_seconds", "Time to preload a lookup structure.")
+
+
+@dataclass(frozen=True)
+class Structure:
+    """A preloadable structure: ``load`` installs and returns it (``None`` if unavailable)."""
+
+    name: str
+    load: Callable[[], Any]
+    refresh: Callable[[Any], None] | None = None
+
+
+def _load_catalog() -> Any:
+    from backend.core.matching.catalog import get_catalog_index
+
+    return get_catalog_index()
+
+
+def _load_stores() -> Any:
+    from backend.core.store_index import get_store_catalog
+
+    return get_store_catalog()
+
+
+def _load_embeddings() -> Any:
+    from backend.core.matching.embeddings import get_embedding_catalog
+
+    return get_embedding_catalog()
+
+
+def _load_units() -> int:
+    """Parse the catalog's distinct package units into the ``parse_unit`` cache."""
+
+    from backend.core.db import session_scope
+    from backend.core.schema import Product
+    from backend.core.units import parse_unit
+
+    with session_scope() as session:
+        rows = session.query(Product.unit).filter(Product.unit.isnot(None)).distinct()
+        units = [unit for (unit,) in rows.limit(parse_unit.cache_info().maxsize)]
+    for unit in units:
+        parse_unit(unit)
+    return len(units)
+
+
+STRUCTURES = (
+    Structure("catalog", _load_catalog, lambda catalog: catalog.refresh_if_due(settings.matching_refresh_seconds)),
+    Structure("stores", _load_stores, lambda catalog: catalog.refresh_if_due()),
+    Structure("embeddings", _load_embeddings, lambda catalog: catalog.refresh_if_due(settings.matching_refresh_seconds)),
+    Structure("units", _load_units),
+)
+
+# Structures loaded by warm_up(), inherited by forked children.
+_warm: dict[str, tuple[Structure, Any]] = {}
+
+
+def warm_up(structures: tuple[Structure, ...] = STRUCTURES) -> dict[str, float]:
+    """Load ``structures`` now; return the seconds each one took.
+
+    Structures that fail or are unavailable are skipped and load on first use,
+    as they would without warm-up.
+    """
+
+    timings: dict[str, float] = {}
+    for structure in structures:
+        started = time.perf_counter()
+        try:
+            loaded = structure.load()
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Warm-up of %s failed: %s", structure.name, exc)
+            continue
+        if loaded is None:
+            continue
+        timings[structure.name] = time.perf_counter() - started
+        WARMUP_SECONDS.set(timings[structure.name], structure=structure.name)
+        _warm[structure.name] = (structure, loaded)
+    logger.info(
+        "Warmed up %s", ", ".join(f"{name} in {seconds:.2f} s" for name, seconds in timings.items()) or "nothing"
+    )
+    return timings
+
+
+def prepare_fork() -> None:
+    """Make the warmed heap safe and cheap to share with forked children."""
+
+    from backend.core.db import dispose_engine
+
+    dispose_engine()
+    if settings.worker_gc_freeze:
+        gc.collect()
+        gc.freeze()
+
+
+class Refresher:
+    """Background thread refreshing warmed structures instead of the tasks that use them."""
+
+    def __init__(self, tick_seconds: float) -> None:
+        self.tick_seconds = tick_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _refreshable(self) -> list[tuple[Structure, Any]]:
+        return [(structure, loaded) for structure, loaded in _warm.values() if structure.refresh is not None]
+
+    def start(self) -> bool:
+        """Take over refreshing from lookups; ``False`` when nothing was warmed."""
+
+        refreshable = self._refreshable()
+        if not refreshable:
+            return False
+        for _, loaded in refreshable:
+            loaded.background_refresh = True
+        self._thread = threading.Thread(target=self._run, name="savery-warmup-refresh", daemon=True)
+        self._thread.start()
+        return True
+
+    def tick(self) -> None:
+        for structure, loaded in self._refreshable():
+            try:
+                structure.refresh(loaded)
+            except Exception as exc:  # pragma: no cover - refreshes log their own failures
+                logger.warning("Refresh of %s failed: %s", structure.name, exc)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick_seconds):
+            self.tick()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for _, loaded in self._refreshable():
+            loaded.background_refresh = False
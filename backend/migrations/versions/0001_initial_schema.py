@@ -0,0 +1,123 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stores",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("external_id", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=True),
+        sa.Column("longitude", sa.Float(), nullable=True),
+        sa.Column("timezone", sa.String(length=64), nullable=True),
+        sa.Column("metadata_blob", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("external_id"),
+    )
+    op.create_index(op.f("ix_stores_id"), "stores", ["id"], unique=False)
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("external_id", sa.String(length=128), nullable=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(length=128), nullable=True),
+        sa.Column("brand", sa.String(length=128), nullable=True),
+        sa.Column("unit", sa.String(length=32), nullable=True),
+        sa.Column("vector_embedding", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("external_id"),
+    )
+    op.create_index(op.f("ix_products_id"), "products", ["id"], unique=False)
+    op.create_table(
+        "prices",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("list_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("promo_price", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("unit", sa.String(length=32), nullable=True),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+        sa.Column("raw_payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_prices_id"), "prices", ["id"], unique=False)
+    op.create_table(
+        "optimization_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.String(length=64), nullable=False),
+        sa.Column("input_payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("result_payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("result_compressed", sa.LargeBinary(), nullable=True),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("stage", sa.String(length=32), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_optimization_jobs_task_id"), "optimization_jobs", ["task_id"], unique=True)
+    op.create_index(op.f("ix_optimization_jobs_updated_at"), "optimization_jobs", ["updated_at"], unique=False)
+    op.create_table(
+        "optimization_result_cache",
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("store_ids", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("result_payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("fingerprint"),
+    )
+    op.create_index(
+        op.f("ix_optimization_result_cache_expires_at"), "optimization_result_cache", ["expires_at"], unique=False
+    )
+    op.create_table(
+        "pipeline_blobs",
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    op.create_index(op.f("ix_pipeline_blobs_created_at"), "pipeline_blobs", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_pipeline_blobs_created_at"), table_name="pipeline_blobs")
+    op.drop_table("pipeline_blobs")
+    op.drop_index(op.f("ix_optimization_result_cache_expires_at"), table_name="optimization_result_cache")
+    op.drop_table("optimization_result_cache")
+    op.drop_index(op.f("ix_optimization_jobs_updated_at"), table_name="optimization_jobs")
+    op.drop_index(op.f("ix_optimization_jobs_task_id"), table_name="optimization_jobs")
+    op.drop_table("optimization_jobs")
+    op.drop_index(op.f("ix_prices_id"), table_name="prices")
+    op.drop_table("prices")
+    op.drop_index(op.f("ix_products_id"), table_name="products")
+    op.drop_table("products")
+    op.drop_index(op.f("ix_stores_id"), table_name="stores")
+    op.drop_table("stores")
@@ -0,0 +1,60 @@
+"""latest prices view and composite price index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from alembic_utils.pg_materialized_view import PGMaterializedView
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of backend.core.latest_prices.VIEW_DEFINITION at this revision.
+public_latest_prices = PGMaterializedView(
+    schema="public",
+    signature="latest_prices",
+    definition="""SELECT DISTINCT ON (p.product_id, p.store_id)
+    p.product_id,
+    p.store_id,
+    p.id AS price_id,
+    p.list_price,
+    p.promo_price,
+    p.currency,
+    p.unit,
+    p.observed_at,
+    p.raw_payload
+FROM prices p
+ORDER BY p.product_id, p.store_id, p.observed_at DESC, p.id DESC""",
+    with_data=True,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_prices_product_store_observed_at",
+        "prices",
+        ["product_id", "store_id", sa.text("observed_at DESC")],
+        unique=False,
+    )
+    op.create_entity(public_latest_prices)
+    # REFRESH ... CONCURRENTLY requires a unique index on the view.
+    op.create_index(
+        "ux_latest_prices_product_store", "latest_prices", ["product_id", "store_id"], unique=True
+    )
+    # Bounds the "written since the last refresh" tail scan in latest-price lookups.
+    op.create_index("ix_latest_prices_observed_at", "latest_prices", ["observed_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_entity(public_latest_prices)
+    op.drop_index("ix_prices_product_store_observed_at", table_name="prices")
@@ -0,0 +1,158 @@
+"""partition prices by month and add daily rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from alembic_utils.pg_materialized_view import PGMaterializedView
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# latest_prices depends on prices, so it is dropped and recreated around the swap.
+public_latest_prices = PGMaterializedView(
+    schema="public",
+    signature="latest_prices",
+    definition="""SELECT DISTINCT ON (p.product_id, p.store_id)
+    p.product_id,
+    p.store_id,
+    p.id AS price_id,
+    p.list_price,
+    p.promo_price,
+    p.currency,
+    p.unit,
+    p.observed_at,
+    p.raw_payload
+FROM prices p
+ORDER BY p.product_id, p.store_id, p.observed_at DESC, p.id DESC""",
+    with_data=True,
+)
+
+# One partition per month from the oldest observation through three months ahead.
+_CREATE_MONTHLY_PARTITIONS = """
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce((SELECT min(observed_at) FROM prices_unpartitioned), now()));
+    last_month date := date_trunc('month', now()) + interval '3 months';
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF prices FOR VALUES FROM (%L) TO (%L)',
+            to_char(month, '"prices_y"YYYY"m"MM'), month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END
+$$
+"""
+
+
+def _create_view() -> None:
+    op.create_entity(public_latest_prices)
+    op.create_index("ux_latest_prices_product_store", "latest_prices", ["product_id", "store_id"], unique=True)
+    op.create_index("ix_latest_prices_observed_at", "latest_prices", ["observed_at"], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_entity(public_latest_prices)
+    op.rename_table("prices", "prices_unpartitioned")
+    op.execute("ALTER INDEX prices_pkey RENAME TO prices_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_prices_id RENAME TO ix_prices_unpartitioned_id")
+    op.execute(
+        "ALTER INDEX ix_prices_product_store_observed_at RENAME TO ix_prices_unpartitioned_product_store_observed_at"
+    )
+    # Keep the id sequence when the old table (which owns it) is dropped.
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY NONE")
+
+    op.create_table(
+        "prices",
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('prices_id_seq')"), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("list_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("promo_price", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("unit", sa.String(length=32), nullable=True),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+        sa.Column("raw_payload", sa.dialects.postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id", "observed_at"),
+        postgresql_partition_by="RANGE (observed_at)",
+    )
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+    op.create_index(op.f("ix_prices_id"), "prices", ["id"], unique=False)
+    op.create_index(
+        "ix_prices_product_store_observed_at",
+        "prices",
+        ["product_id", "store_id", sa.text("observed_at DESC")],
+        unique=False,
+    )
+    op.execute(_CREATE_MONTHLY_PARTITIONS)
+    op.execute("CREATE TABLE prices_default PARTITION OF prices DEFAULT")
+    op.execute("INSERT INTO prices SELECT * FROM prices_unpartitioned")
+    op.drop_table("prices_unpartitioned")
+
+    op.create_table(
+        "price_daily_rollups",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("min_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("avg_price", sa.Numeric(precision=12, scale=4), nullable=False),
+        sa.Column("max_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("observations", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("product_id", "store_id", "day"),
+    )
+    _create_view()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("price_daily_rollups")
+    op.drop_entity(public_latest_prices)
+    op.rename_table("prices", "prices_partitioned")
+    op.execute("ALTER INDEX prices_pkey RENAME TO prices_partitioned_pkey")
+    op.execute("ALTER INDEX ix_prices_id RENAME TO ix_prices_partitioned_id")
+    op.execute(
+        "ALTER INDEX ix_prices_product_store_observed_at RENAME TO ix_prices_partitioned_product_store_observed_at"
+    )
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY NONE")
+    op.create_table(
+        "prices",
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('prices_id_seq')"), nullable=False),
+        sa.Column("store_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("list_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("promo_price", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("unit", sa.String(length=32), nullable=True),
+        sa.Column("currency", sa.String(length=8), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+        sa.Column("raw_payload", sa.dialects.postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+    op.execute("INSERT INTO prices SELECT * FROM prices_partitioned")
+    op.drop_table("prices_partitioned")
+    op.create_index(op.f("ix_prices_id"), "prices", ["id"], unique=False)
+    op.create_index(
+        "ix_prices_product_store_observed_at",
+        "prices",
+        ["product_id", "store_id", sa.text("observed_at DESC")],
+        unique=False,
+    )
+    _create_view()
@@ -0,0 +1,28 @@
+"""record the queue lane of optimization jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "optimization_jobs",
+        sa.Column("lane", sa.String(length=16), server_default="interactive", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("optimization_jobs", "lane")
@@ -0,0 +1,26 @@
+"""index prices by store and observation time
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the result cache's "repriced since" check (one range scan per store).
+    # Created on the partitioned parent, so every month partition gets it too.
+    op.create_index("ix_prices_store_observed_at", "prices", ["store_id", "observed_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prices_store_observed_at", table_name="prices")
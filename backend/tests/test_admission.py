@@ -0,0 +1,70 @@
+"""Tests for queue lanes and admission control of optimization requests."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import create_app
+from backend.core import admission, job_store, result_cache, tasks
+from backend.core.config import settings
+from backend.core.producer import BACKGROUND, lane_options
+
+PAYLOAD = {"items": [{"name": "milk"}], "store_ids": ["kroger-1"]}
+
+
+class _Sampler:
+    def __init__(self, depths: dict[str, tuple[int, int]]) -> None:
+        self.depths = depths
+
+    def sample_if_due(self, interval: float, *, wait: bool = True) -> dict[str, tuple[int, int]]:
+        return self.depths
+
+
+class _Refusing:
+    def check(self, lane: str) -> admission.Decision:
+        return admission.Decision(False, "queue_depth", 7)
+
+
+def test_lane_options_route_stages_to_their_lane() -> None:
+    assert lane_options("workers.matching.match_items") == {"queue": "matching", "priority": 8}
+    assert lane_options("workers.optimize.plan_route", BACKGROUND) == {"queue": "optimization.background", "priority": 2}
+    assert lane_options("workers.health.ping", BACKGROUND)["queue"] == "default"
+
+
+def test_controller_refuses_deep_queues_and_slow_lanes(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "admission_max_backlog_per_consumer", 50.0)
+    monkeypatch.setattr(settings, "admission_max_latency_seconds", 30.0)
+    monkeypatch.setattr(settings, "job_store_enabled", False)
+    sampler = _Sampler({"matching": (90, 2), "scraping.background": (10_000, 1)})
+
+    assert admission.AdmissionController(sampler).check().admitted
+    assert admission.AdmissionController(sampler).check(BACKGROUND).reason == "queue_depth"
+
+    sampler.depths["matching"] = (120, 2)
+    refused = admission.AdmissionController(sampler).check()
+    assert (refused.admitted, refused.reason) == (False, "queue_depth")
+    assert refused.retry_after == settings.metrics_queue_sample_seconds
+
+    monkeypatch.setattr(settings, "job_store_enabled", True)
+    monkeypatch.setattr(job_store, "recent_latency", lambda window: 42.5)
+    slow = admission.AdmissionController(_Sampler({})).check()
+    assert (slow.reason, slow.retry_after) == ("latency", 43)
+
+
+def test_refused_job_serves_stale_result_or_429(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    monkeypatch.setattr(tasks, "get_admission_controller", _Refusing)
+    monkeypatch.setattr(result_cache, "lookup", lambda fingerprint: None)
+    monkeypatch.setattr(tasks, "_build_workflow", lambda *args: (_ for _ in ()).throw(AssertionError("enqueued")))
+    client = TestClient(create_app())
+
+    monkeypatch.setattr(result_cache, "load", lambda fingerprint: {"total_cost": 3.5})
+    degraded = client.post("/api/optimize", json=PAYLOAD)
+    assert degraded.status_code == 202
+    assert degraded.json()["degraded"] is True
+    assert degraded.json()["task_id"].startswith(result_cache.CACHED_TASK_PREFIX)
+
+    monkeypatch.setattr(result_cache, "load", lambda fingerprint: None)
+    refused = client.post("/api/optimize", json=PAYLOAD)
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "7"
@@ -0,0 +1,151 @@
+"""Tests for batch optimization: shared union, per-list split and submission."""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core import batch, claim_check, job_store, progress, result_cache, tasks
+from backend.core.config import settings
+from backend.core.schema import OptimizationJob
+
+REQUESTS = [
+    {"items": [{"name": "Whole Milk", "quantity": 2}, {"name": "eggs"}], "store_ids": ["kroger-1", "walmart-2"]},
+    {"items": [{"name": " whole  milk "}, {"name": "bread"}], "store_ids": ["kroger-1"]},
+]
+
+
+def test_union_deduplicates_items_and_limits_stores_per_item() -> None:
+    union, positions = batch.build_union(REQUESTS)
+
+    assert [item["name"] for item in union["items"]] == ["Whole Milk", "eggs", "bread"]
+    assert union["store_ids"] == ["kroger-1", "walmart-2"]
+    assert union["item_store_ids"] == [["kroger-1", "walmart-2"], ["kroger-1", "walmart-2"], ["kroger-1"]]
+    assert positions == [[0, 1], [0, 2]]
+
+
+def test_split_restores_list_items_and_filters_offers_by_store() -> None:
+    union, positions = batch.build_union(REQUESTS)
+    matched = [
+        {
+            "list_item": item,
+            "candidates": [{"store_id": store, "product_id": str(index)} for store in stores],
+        }
+        for index, (item, stores) in enumerate(zip(union["items"], union["item_store_ids"]))
+    ]
+    priced = [
+        {**entry, "offers": [{"store_id": c["store_id"], "price": 1.0} for c in entry["candidates"]]}
+        for entry in matched
+    ]
+
+    first, second = batch.split_priced({"matched_items": matched, "priced_items": priced}, REQUESTS, positions)
+
+    assert first["priced_items"][0]["list_item"] == {"name": "Whole Milk", "quantity": 2}
+    assert len(first["priced_items"][0]["offers"]) == 2
+    assert second["request"] is REQUESTS[1]
+    assert second["priced_items"][0]["list_item"] == {"name": " whole  milk "}
+    assert [offer["store_id"] for offer in second["priced_items"][0]["offers"]] == ["kroger-1"]
+    assert second["priced_items"][1]["candidates"] == [{"store_id": "kroger-1", "product_id": "2"}]
+
+
+def test_batch_submits_one_shared_chain_and_skips_cached_lists(monkeypatch) -> None:
+    cached = result_cache.request_fingerprint(REQUESTS[1])
+    monkeypatch.setattr(result_cache, "lookup", lambda fingerprint: {} if fingerprint == cached else None)
+    monkeypatch.setattr(settings, "job_store_enabled", False)
+    submitted = []
+
+    class _Chain:
+        def __init__(self, *signatures) -> None:
+            self.signatures = signatures
+
+        def apply_async(self) -> None:
+            submitted.append(self.signatures)
+
+    monkeypatch.setattr("celery.chain", _Chain)
+
+    batch_id, task_ids = tasks.enqueue_optimization_batch(REQUESTS)
+
+    assert task_ids[1] == result_cache.cached_task_id(cached)
+    assert len(submitted) == 1
+    matching, pricing, fan_out = submitted[0]
+    assert matching.options["task_id"] == f"{batch_id}.matching"
+    assert (matching.options["queue"], matching.options["priority"]) == ("matching.background", 2)
+    assert fan_out.options["queue"] == "optimization.background"
+    assert claim_check.resolve(matching.kwargs["payload"])["items"] == [{"name": "Whole Milk"}, {"name": "eggs"}]
+    assert fan_out.options["task_id"] == batch_id
+    for signature in (matching, pricing, fan_out):
+        assert signature.options["headers"] == {progress.JOB_IDS_HEADER: [task_ids[0]]}
+    assert claim_check.resolve(fan_out.kwargs["batch_plan"])["job_ids"] == [task_ids[0]]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    engine = create_engine("sqlite://")
+    OptimizationJob.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+
+    @contextmanager
+    def scope():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(job_store, "session_scope", scope)
+    monkeypatch.setattr(job_store, "_cache", job_store._StatusCache(max_entries=16))
+    monkeypatch.setattr(settings, "job_store_enabled", True)
+    return job_store
+
+
+def _batch_task(name: str, job_ids: list[str]) -> SimpleNamespace:
+    return SimpleNamespace(name=name, request=SimpleNamespace(**{progress.JOB_IDS_HEADER: job_ids}))
+
+
+def test_shared_stage_failure_fails_every_member_job(store, monkeypatch) -> None:
+    from backend.workers import signals
+
+    published = []
+    monkeypatch.setattr(settings, "progress_events_enabled", True)
+    monkeypatch.setattr(progress, "publish", published.append)
+    job_ids = ["job-a", "job-b"]
+    for job_id in job_ids:
+        store.create_job(job_id, {})
+    pricing = _batch_task(settings.celery_pricing_task, job_ids)
+
+    signals._stage_started("batch-1.pricing", pricing)
+    assert [store.load_job(job_id)["stage"] for job_id in job_ids] == ["pricing", "pricing"]
+    signals._stage_finished("batch-1.pricing", pricing, retval=RuntimeError("provider down"), state="FAILURE")
+
+    for job_id in job_ids:
+        failed = store.load_job(job_id)
+        assert failed["status"] == "FAILURE"
+        assert failed["result"] == {"error": "RuntimeError('provider down')", "stage": "pricing"}
+    assert [(event.job_id, event.state) for event in published] == [
+        ("job-a", "started"),
+        ("job-b", "started"),
+        ("job-a", "failed"),
+        ("job-b", "failed"),
+    ]
+
+
+def test_fan_out_reports_only_its_failure(store, monkeypatch) -> None:
+    from backend.workers import signals
+
+    published = []
+    monkeypatch.setattr(settings, "progress_events_enabled", True)
+    monkeypatch.setattr(progress, "publish", published.append)
+    store.create_job("job-a", {})
+    fan_out = _batch_task(tasks.BATCH_FAN_OUT_TASK, ["job-a"])
+
+    signals._stage_started("batch-1", fan_out)
+    signals._stage_finished("batch-1", fan_out, retval={"jobs": ["job-a"]}, state="SUCCESS")
+    assert published == [] and store.load_job("job-a")["status"] == "PENDING"
+
+    signals._stage_started("batch-2", fan_out)
+    signals._stage_finished("batch-2", fan_out, retval=KeyError("positions"), state="FAILURE")
+    assert store.load_job("job-a")["status"] == "FAILURE"
+    assert [(event.job_id, event.stage, event.state) for event in published] == [("job-a", "routing", "failed")]
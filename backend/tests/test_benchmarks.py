@@ -0,0 +1,25 @@
+"""Smoke tests for the synthetic pipeline benchmarks."""
+
+from __future__ import annotations
+
+import json
+
+from backend.benchmarks import run
+
+
+def test_benchmark_runs_every_stage_and_flags_regressions(monkeypatch, tmp_path) -> None:
+    monkeypatch.setitem(run.SCALES, "tiny", run.Scale(products=200, stores=3, items=5, list_stores=3))
+    output = tmp_path / "results.json"
+
+    assert run.main(["--scales", "tiny", "--repeat", "2", "--output", str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    tiny = results["scales"]["tiny"]
+    assert tiny["products"] == 200 and tiny["items"] == 5
+    assert set(tiny["stages"]) == set(run.STAGES)
+    assert all(metrics["median_ms"] > 0 for metrics in tiny["stages"].values())
+
+    assert run.compare(results, results, 0.2) == []
+    baseline = json.loads(output.read_text())
+    baseline["scales"]["tiny"]["stages"]["plan_route"]["median_ms"] /= 2
+    assert [line.split(" ")[0] for line in run.compare(results, baseline, 0.2)] == ["tiny/plan_route"]
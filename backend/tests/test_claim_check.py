@@ -0,0 +1,75 @@
+"""Tests for claim-check payload passing between pipeline stages."""
+
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from backend.core import claim_check
+from backend.core.config import settings
+
+
+class _FakeSession:
+    def __init__(self, rows: dict) -> None:
+        self.rows = rows
+
+    def execute(self, statement):
+        values = statement.compile().params
+        existing = self.rows.setdefault(values["digest"], values)
+        conflict = statement._post_values_clause
+        if existing is not values and conflict is not None and hasattr(conflict, "update_values_to_set"):
+            existing.update({column: bind.value for column, bind in conflict.update_values_to_set.items()})
+
+    def get(self, model, digest):
+        row = self.rows.get(digest)
+        return type("Blob", (), row) if row else None
+
+
+def _use_fake_store(monkeypatch) -> dict:
+    rows: dict = {}
+
+    @contextmanager
+    def scope():
+        yield _FakeSession(rows)
+
+    monkeypatch.setattr(claim_check, "session_scope", scope)
+    monkeypatch.setattr(settings, "celery_claim_check", True)
+    monkeypatch.setattr(settings, "claim_check_min_bytes", 64)
+    return rows
+
+
+def test_large_payloads_become_compact_content_addressed_references(monkeypatch) -> None:
+    rows = _use_fake_store(monkeypatch)
+    payload = {"priced_items": [{"name": f"item {i}", "offers": [1.5] * 20} for i in range(200)]}
+
+    reference = claim_check.put(payload)
+    assert claim_check.is_reference(reference)
+    assert claim_check.put(dict(payload)) == reference
+    assert len(rows) == 1
+
+    stored = rows[reference["$claim"]]
+    assert len(stored["payload"]) < stored["size_bytes"]
+    assert zlib.decompress(stored["payload"])
+
+    claim_check._recent.clear()
+    assert claim_check.resolve(reference) == payload
+
+
+def test_small_payloads_and_disabled_mode_stay_inline(monkeypatch) -> None:
+    _use_fake_store(monkeypatch)
+    assert claim_check.put({"items": []}) == {"items": []}
+
+    monkeypatch.setattr(settings, "celery_claim_check", False)
+    big = {"items": ["x" * 1000]}
+    assert claim_check.put(big) is big
+    assert claim_check.resolve(big) is big
+
+
+def test_storing_the_same_payload_again_restarts_its_retention(monkeypatch) -> None:
+    rows = _use_fake_store(monkeypatch)
+    payload = {"priced_items": [{"name": f"item {i}", "offers": [2.5] * 20} for i in range(50)]}
+
+    reference = claim_check.put(payload)
+    rows[reference["$claim"]]["created_at"] = datetime(2000, 1, 1)  # about to be purged
+    assert claim_check.put(payload) == reference
+
+    assert rows[reference["$claim"]]["created_at"] > datetime(2000, 1, 1)
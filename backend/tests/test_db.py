@@ -0,0 +1,74 @@
+"""Tests for the async database layer and lazy session dependency."""
+
+import asyncio
+
+import pytest
+
+from backend.app.dependencies import LazyAsyncSession, get_db
+from backend.core import db
+
+
+class _FakeSession:
+    def __init__(self, log: list[str]) -> None:
+        self.log = log
+
+    async def commit(self) -> None:
+        self.log.append("commit")
+
+    async def rollback(self) -> None:
+        self.log.append("rollback")
+
+    async def close(self) -> None:
+        self.log.append("close")
+
+
+def test_lazy_session_only_opens_when_used() -> None:
+    log: list[str] = []
+
+    def factory():
+        log.append("open")
+        return _FakeSession(log)
+
+    async def scenario() -> None:
+        untouched = LazyAsyncSession(factory)
+        await untouched.commit()
+        await untouched.close()
+        assert not untouched.opened
+
+        used = LazyAsyncSession(factory)
+        assert await used.get() is await used.get()
+        await used.commit()
+        await used.close()
+
+    asyncio.run(scenario())
+    assert log == ["open", "commit", "close"]
+
+
+def test_get_db_rolls_back_when_handler_fails(monkeypatch) -> None:
+    log: list[str] = []
+    monkeypatch.setattr(
+        "backend.app.dependencies.get_async_session_factory", lambda: lambda: _FakeSession(log)
+    )
+
+    async def scenario() -> None:
+        dependency = get_db()
+        session = await dependency.__anext__()
+        await session.get()
+        with pytest.raises(RuntimeError):
+            await dependency.athrow(RuntimeError("boom"))
+
+    asyncio.run(scenario())
+    assert log == ["rollback", "close"]
+
+
+def test_async_engine_uses_configured_pool(monkeypatch) -> None:
+    monkeypatch.setattr(db.settings, "database_pool_size", 3)
+    monkeypatch.setattr(db, "_async_engine", None)
+    monkeypatch.setattr(db, "_async_session_factory", None)
+
+    engine = db.get_async_engine()
+    try:
+        assert engine.dialect.is_async
+        assert engine.pool.size() == 3
+    finally:
+        asyncio.run(db.dispose_async_engine())
@@ -0,0 +1,68 @@
+"""Tests for database pool and statement instrumentation."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from backend.app.main import create_app
+from backend.core.config import settings
+from backend.core.db_metrics import DatabaseInstrumentation, fingerprint_sql
+
+
+def test_fingerprint_groups_statements_by_shape() -> None:
+    first = fingerprint_sql("SELECT * FROM prices WHERE store_id IN (1, 2, 3) AND unit = 'lb'")
+    second = fingerprint_sql("select *  from prices\nwhere store_id in (%(a)s) and unit = %(b)s")
+
+    assert first == second == "select * from prices where store_id in (?) and unit = ?"
+    assert fingerprint_sql("INSERT INTO t (a) VALUES ($1), ($2), ($3)") == "insert into t (a) values (?)"
+    assert fingerprint_sql("SELECT anon_1.id FROM t") == "select anon_1.id from t"
+
+
+def test_instrumentation_records_checkouts_and_statements() -> None:
+    instrumentation = DatabaseInstrumentation(slow_query_seconds=0.0)
+    engine = create_engine("sqlite://")
+    instrumentation.attach(engine, "test")
+
+    with engine.connect() as connection:
+        for value in range(3):
+            connection.execute(text(f"SELECT {value}"))
+
+    snapshot = instrumentation.snapshot()
+    pool = snapshot["pools"]["test"]
+    assert pool["checkouts"] == 1
+    assert pool["checkout_wait"]["count"] == 1
+    assert snapshot["statements"]["count"] == 3
+    assert snapshot["top_statements"][0] == {**snapshot["top_statements"][0], "fingerprint": "select ?", "count": 3}
+    assert len(snapshot["slow_queries"]) == 3
+
+    instrumentation.reset()
+    assert instrumentation.snapshot()["statements"]["count"] == 0
+
+
+def test_instrumentation_survives_engine_dispose(tmp_path) -> None:
+    instrumentation = DatabaseInstrumentation()
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    instrumentation.attach(engine, "test")
+
+    with engine.connect():
+        pass
+    engine.dispose()  # what prepare_fork() does in every worker parent
+    with engine.connect():
+        with engine.connect():
+            held = instrumentation.snapshot()["pools"]["test"]
+
+    pool = instrumentation.snapshot()["pools"]["test"]
+    assert pool["checkouts"] == 3
+    assert pool["checkout_wait"]["count"] == 3
+    assert held["checkedout"] == 2
+
+
+def test_diagnostics_endpoint_reports_this_process_to_admins(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    client = TestClient(create_app())
+
+    assert client.get("/api/diagnostics/db").status_code == 401
+    response = client.get("/api/diagnostics/db", headers={"Authorization": "Bearer s3cret"})
+
+    assert response.status_code == 200
+    process = response.json()["process"]
+    assert {"pid", "pools", "statements", "slow_queries"} <= process.keys()
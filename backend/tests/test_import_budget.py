@@ -0,0 +1,27 @@
+"""Cold-start budget for the API process."""
+
+from __future__ import annotations
+
+from backend.tools import import_report
+
+
+def test_api_import_stays_within_startup_budget() -> None:
+    report = import_report.measure("backend.app.main", breakdown=False)
+
+    assert report.loaded() == [], "the API must load these on first use only"
+    assert report.violations() == []
+
+
+def test_parse_importtime_reads_depth_and_timings() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   encodings.idna\n"
+        "import time:       300 |        420 | backend.core\n"
+    )
+
+    records = import_report.parse_importtime(stderr)
+
+    assert [(record.name, record.depth, record.self_us, record.cumulative_us) for record in records] == [
+        ("encodings.idna", 1, 120, 120),
+        ("backend.core", 0, 300, 420),
+    ]
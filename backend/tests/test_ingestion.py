@@ -0,0 +1,62 @@
+"""Tests for bulk price ingestion record handling."""
+
+import io
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from backend.core.ingestion import IngestionReport, InvalidPriceRecord, coerce_record, read_records
+
+
+def test_csv_records_coerce_to_staging_rows() -> None:
+    stream = io.StringIO(
+        "store_external_id,product_external_id,list_price,promo_price,observed_at\n"
+        "kroger-1,0001111041700,3.499,,2024-05-01T10:00:00\n"
+    )
+    (record,) = read_records(stream)
+
+    row = coerce_record(record)
+
+    assert row[:5] == ("kroger-1", "0001111041700", Decimal("3.50"), None, None)
+    assert row[5] == "USD"
+    assert row[6] == datetime(2024, 5, 1, 10)
+
+
+
+@pytest.mark.parametrize(
+    "observed_at",
+    [
+        "2024-05-01T06:00:00-04:00",
+        "2024-05-01T10:00:00Z",
+        datetime(2024, 5, 1, 12, tzinfo=timezone(timedelta(hours=2))),
+    ],
+)
+def test_observed_at_offsets_are_normalized_to_naive_utc(observed_at) -> None:
+    row = coerce_record(
+        {
+            "store_external_id": "kroger-1",
+            "product_external_id": "1",
+            "list_price": "1",
+            "observed_at": observed_at,
+        }
+    )
+
+    assert row[6] == datetime(2024, 5, 1, 10) and row[6].tzinfo is None
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"product_external_id": "1", "list_price": "1"},
+        {"store_external_id": "kroger-1", "product_external_id": "1"},
+        {"store_external_id": "kroger-1", "product_external_id": "1", "list_price": "abc"},
+    ],
+)
+def test_malformed_records_are_rejected(record) -> None:
+    with pytest.raises(InvalidPriceRecord):
+        coerce_record(record)
+
+
+def test_report_throughput() -> None:
+    report = IngestionReport(received=100_000, seconds=2.0)
+    assert report.as_dict()["rows_per_second"] == 50_000.0
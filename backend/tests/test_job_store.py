@@ -0,0 +1,102 @@
+"""Tests for the durable optimization job store."""
+
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core import job_store
+from backend.core.schema import OptimizationJob
+
+
+@pytest.fixture
+def store(monkeypatch):
+    engine = create_engine("sqlite://")
+    OptimizationJob.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+
+    @contextmanager
+    def scope():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(job_store, "session_scope", scope)
+    monkeypatch.setattr(job_store, "_cache", job_store._StatusCache(max_entries=16))
+    return job_store
+
+
+def test_status_transitions_and_compressed_result(store, monkeypatch) -> None:
+    monkeypatch.setattr(store.settings, "job_status_cache_seconds", 0.0)
+    store.create_job("job-1", {"items": [{"name": "milk"}]})
+    assert store.load_job("job-1")["status"] == "PENDING"
+
+    store.update_job("job-1", store.RUNNING, stage="pricing")
+    running = store.load_job("job-1")
+    assert (running["status"], running["stage"], running["ready"]) == ("STARTED", "pricing", False)
+
+    store.update_job("job-1", store.SUCCEEDED, stage="routing", result={"total_cost": 9.5})
+    # A late "running" transition must not reopen a finished job.
+    store.update_job("job-1", store.RUNNING, stage="routing")
+    done = store.load_job("job-1")
+    assert done["status"] == "SUCCESS" and done["successful"]
+    assert done["result"] == {"total_cost": 9.5}
+
+
+def test_finished_jobs_are_served_from_cache_and_purged(store) -> None:
+    store.create_job("job-2", {})
+    store.update_job("job-2", store.FAILED, stage="matching", error="boom")
+    first = store.load_job("job-2")
+    assert first["result"] == {"error": "boom", "stage": "matching"}
+    assert store.load_job("job-2") is first
+
+    assert store.purge_jobs(timedelta(seconds=-1)) == 1
+    assert store.load_job("missing") is None
+
+
+def test_recent_latency_reads_finished_jobs_of_one_lane(store) -> None:
+    from datetime import datetime
+
+    from backend.core.schema import OptimizationJob
+
+    now = datetime.utcnow()
+    with store.session_scope() as session:
+        for index, seconds in enumerate([1, 2, 3, 4, 40]):
+            session.add(
+                OptimizationJob(
+                    task_id=f"job-{index}",
+                    input_payload={},
+                    status=store.SUCCEEDED,
+                    created_at=now - timedelta(seconds=seconds),
+                    updated_at=now,
+                )
+            )
+        session.add(
+            OptimizationJob(
+                task_id="bulk",
+                input_payload={},
+                status=store.SUCCEEDED,
+                lane="background",
+                created_at=now - timedelta(hours=1),
+                updated_at=now,
+            )
+        )
+        session.add(
+            OptimizationJob(
+                task_id="old",
+                input_payload={},
+                status=store.FAILED,
+                created_at=now - timedelta(hours=2),
+                updated_at=now - timedelta(hours=1),
+            )
+        )
+
+    assert store.recent_latency(timedelta(minutes=5), quantile=0.5) == 3.0
+    assert store.recent_latency(timedelta(minutes=5)) == 40.0
+    assert store.recent_latency(timedelta(minutes=5), lane="background") == 3600.0
+    assert store.recent_latency(timedelta(minutes=5), lane="other") is None
@@ -0,0 +1,85 @@
+"""Tests for the latest-price view wiring and its lookup."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import sqlite3
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from backend.core.alembic_entities import iter_replaceable_entities
+from backend.core.latest_prices import CANDIDATES_SQL, VIEW_NAME, fetch_latest
+from backend.core.schema import Price
+
+
+class _RecordingSession:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def execute(self, statement: Any, params: dict[str, Any]) -> Any:
+        self.calls.append((str(statement), params))
+        return self
+
+    def all(self) -> list[Any]:
+        return []
+
+
+def test_view_is_registered_for_alembic() -> None:
+    entities = list(iter_replaceable_entities())
+
+    assert [entity.signature for entity in entities] == [VIEW_NAME]
+    assert "DISTINCT ON (p.product_id, p.store_id)" in entities[0].definition
+
+
+def test_prices_have_composite_recency_index() -> None:
+    index = next(index for index in Price.__table__.indexes if index.name == "ix_prices_product_store_observed_at")
+
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "(product_id, store_id, observed_at DESC)" in ddl
+
+
+def test_lookup_sends_all_keys_in_one_statement() -> None:
+    session = _RecordingSession()
+
+    fetch_latest(session, [(1, "kroger-a"), (2, "walmart-b")])
+    assert fetch_latest(session, []) == []
+
+    assert len(session.calls) == 1
+    sql, params = session.calls[0]
+    assert "FROM latest_prices" in sql
+    assert params == {"product_ids": [1, 2], "store_ids": ["kroger-a", "walmart-b"]}
+
+
+def test_tail_scan_finds_late_inserts_with_older_feed_timestamps() -> None:
+    # The candidate query is plain SQL; run it against tables standing in for the view.
+    db = sqlite3.connect(":memory:")
+    columns = "product_id, store_id, list_price, promo_price, currency, unit, observed_at, raw_payload"
+    db.execute(f"CREATE TABLE prices (id, {columns})")
+    db.execute(f"CREATE TABLE latest_prices (price_id, {columns})")
+    db.execute("CREATE TABLE keys (product_id, store_id)")
+    db.executemany("INSERT INTO keys VALUES (?, ?)", [(1, 10), (2, 10), (3, 10)])
+    rows = [
+        (1, 1, 10, 2.0, None, "USD", None, "2026-10-16 08:00", None),
+        (2, 2, 10, 3.0, None, "USD", None, "2026-10-16 12:00", None),
+    ]
+    db.executemany("INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    db.executemany("INSERT INTO latest_prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    # Inserted after the refresh, observed before the view's newest row (12:00).
+    db.executemany(
+        "INSERT INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (3, 1, 10, 1.5, None, "USD", None, "2026-10-16 09:00", None),
+            (4, 3, 10, 4.0, None, "USD", None, "2026-10-16 07:00", None),
+            (5, 2, 10, 9.0, None, "USD", None, "2026-10-15 12:00", None),
+        ],
+    )
+
+    candidates = db.execute(f"SELECT product_id, price_id FROM ({CANDIDATES_SQL})").fetchall()
+    by_product = {product_id: {price for pid, price in candidates if pid == product_id} for product_id in (1, 2, 3)}
+
+    # The late 09:00 row is newer than its pair's view row; the pair missing from
+    # the view gets its rows; an insert older than its pair's view row is skipped.
+    assert by_product == {1: {1, 3}, 2: {2}, 3: {4}}
@@ -0,0 +1,245 @@
+"""Tests for the inverted-index product matcher."""
+
+from datetime import datetime
+
+import numpy as np
+
+from backend.core.matching import CatalogIndex, EmbeddingIndex, ProductTextIndex, set_catalog_index
+from backend.core.matching.text_index import extract_features
+from backend.workers.tasks.matching import match_items
+
+_CATALOG = {
+    1: "Horizon Organic Whole Milk 1 gal",
+    2: "Great Value 2% Reduced Fat Milk",
+    3: "Eggland's Best Large Eggs 12 ct",
+    4: "Nature's Own Honey Wheat Bread",
+    5: "Tyson Boneless Skinless Chicken Breast",
+}
+
+
+def _index() -> ProductTextIndex:
+    return ProductTextIndex.build(list(_CATALOG), list(_CATALOG.values()))
+
+
+def test_search_ranks_best_product_first_and_tolerates_typos() -> None:
+    results = _index().search_many(["whole milk", "large egs", "chicken brest"], k=3)
+
+    assert [matches[0].product_id for matches in results] == [1, 3, 5]
+    assert all(0.0 < matches[0].score <= 1.0 for matches in results)
+
+
+def test_upsert_and_compaction_keep_results_consistent() -> None:
+    index = _index()
+    index.upsert([(2, "Great Value Chocolate Milk"), (6, "Chobani Greek Yogurt")])
+
+    assert index.search_many(["greek yogurt"])[0][0].product_id == 6
+    assert index.search_many(["chocolate milk"])[0][0].product_id == 2
+
+    compacted = index.compacted()
+    assert len(compacted) == len(index) == 6
+    assert compacted.search_many(["greek yogurt"])[0][0].product_id == 6
+
+
+def test_catalog_refresh_swaps_in_a_new_version(monkeypatch) -> None:
+    from backend.core.matching import catalog as catalog_module
+
+    base = _index()
+    catalog = CatalogIndex(base, datetime(2024, 1, 1))
+    monkeypatch.setattr(
+        catalog_module, "_load_products", lambda since: [(6, "Chobani Greek Yogurt", datetime(2024, 1, 2))]
+    )
+    monkeypatch.setattr(catalog_module, "_count_products", lambda: 6)
+
+    assert catalog.refresh() == 1
+
+    assert catalog.version == 2 and catalog.watermark == datetime(2024, 1, 2)
+    assert catalog.index is not base and catalog.index.postings is base.postings
+    assert catalog.index.search_many(["greek yogurt"])[0][0].product_id == 6
+    assert 6 not in {match.product_id for match in base.search_many(["greek yogurt"])[0]} and len(base) == 5
+
+
+
+def test_catalog_refresh_takes_late_rows_at_the_watermark_and_drops_deleted(monkeypatch) -> None:
+    from backend.core.matching import catalog as catalog_module
+
+    watermark = datetime(2024, 1, 2)
+    catalog = CatalogIndex(_index(), watermark, {5})
+    table = {pid: (name, datetime(2024, 1, 1)) for pid, name in _CATALOG.items()}
+    table[5] = (_CATALOG[5], watermark)
+    # Committed after the last refresh, but stamped with the watermark itself.
+    table[6] = ("Chobani Greek Yogurt", watermark)
+    del table[3]
+
+    def load(since):
+        return [(pid, name, at) for pid, (name, at) in table.items() if at >= since]
+
+    monkeypatch.setattr(catalog_module, "_load_products", load)
+    monkeypatch.setattr(catalog_module, "_count_products", lambda: len(table))
+    monkeypatch.setattr(catalog_module, "_load_product_ids", lambda: set(table))
+
+    assert catalog.refresh() == 2
+
+    assert sorted(catalog.index.live_product_ids().tolist()) == [1, 2, 4, 5, 6]
+    assert catalog.index.search_many(["greek yogurt"])[0][0].product_id == 6
+    assert 3 not in {match.product_id for match in catalog.index.search_many(["large eggs"])[0]}
+    assert catalog.refresh() == 0 and catalog.version == 2
+
+
+def test_delta_segment_is_indexed_and_scored_against_the_base() -> None:
+    index = _index()
+    index.upsert([(10 + n, f"Store Brand Item {n}") for n in range(50)])
+    index.upsert([(6, "Chobani Greek Yogurt")])
+
+    matches = index.search_many(["greek yogurt"], k=3)[0]
+
+    assert matches[0].product_id == 6
+    assert matches[0].score == index._exact_score(
+        extract_features("greek yogurt"),
+        sum(index._feature_weight(f) for f in extract_features("greek yogurt")),
+        "Chobani Greek Yogurt",
+    )
+    index.remove([6])
+    assert 6 not in {match.product_id for match in index.search_many(["greek yogurt"])[0]}
+
+def test_match_items_fills_candidates_above_threshold() -> None:
+    set_catalog_index(CatalogIndex(_index(), datetime.utcnow()))
+    try:
+        result = match_items.run(
+            {
+                "items": [{"name": "  Whole  Milk "}, {"name": "xyzzy"}],
+                "store_ids": ["kroger-1", "walmart-2"],
+            }
+        )
+    finally:
+        set_catalog_index(None)
+
+    milk, unknown = result["matched_items"]
+    assert milk["normalized_name"] == "whole milk"
+    assert {c["product_id"] for c in milk["candidates"]} == {"1"}
+    assert milk["candidates"][0]["confidence"] > 0.35
+    assert all(c["product_id"] is None for c in unknown["candidates"])
+
+
+def _clustered_vectors(n: int, dimension: int = 32, clusters: int = 20) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    centres = rng.normal(size=(clusters, dimension))
+    return (centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dimension))).astype(
+        np.float32
+    )
+
+
+def test_embedding_index_recall_matches_exhaustive_search(tmp_path) -> None:
+    vectors = _clustered_vectors(5_000)
+    ids = np.arange(100, 5_100)
+    EmbeddingIndex.build(ids, vectors, nprobe=8).save(tmp_path)
+    index = EmbeddingIndex.open(tmp_path, nprobe=8)
+
+    assert isinstance(index.vectors, np.memmap)
+    queries = vectors[:50] + 0.05
+    found, scores = index.search(queries, k=10)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = ids[np.argsort(-(unit @ (queries / np.linalg.norm(queries, axis=1, keepdims=True)).T), axis=0)[:10].T]
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, exact)])
+    assert recall >= 0.9
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)
+
+
+def test_embedding_index_add_replaces_and_rebuilds() -> None:
+    vectors = _clustered_vectors(500)
+    index = EmbeddingIndex.build(np.arange(500), vectors, rebuild_threshold=1)
+    target = -vectors[0]
+
+    index.add([0, 1000], np.stack([target, target]))
+    found, _ = index.search(target, k=2)
+    assert set(found[0]) == {0, 1000}
+    assert len(index) == 501 and index.needs_rebuild
+
+    rebuilt = index.rebuilt()
+    assert len(rebuilt) == 501
+    assert set(rebuilt.search(target, k=2)[0][0]) == {0, 1000}
+
+
+def test_embedding_catalogs_sharing_a_root_rebuild_once_and_swap(tmp_path, monkeypatch) -> None:
+    from backend.core.matching import embeddings
+
+    vectors = _clustered_vectors(300)
+    rows = {"base": (list(range(300)), vectors, datetime(2024, 1, 1)), "published": False}
+    new = (list(range(1000, 1020)), _clustered_vectors(320)[300:], datetime(2024, 1, 2))
+
+    def load(since=None, *, dimension=None):
+        if since is None:
+            return rows["base"]
+        if since < new[2] and rows["published"]:
+            return new
+        return [], np.zeros((0, vectors.shape[1]), dtype=np.float32), since
+
+    monkeypatch.setattr(embeddings, "load_embeddings", load)
+    first = embeddings.EmbeddingCatalog.load(tmp_path, nprobe=4, rebuild_threshold=10)
+    second = embeddings.EmbeddingCatalog.load(tmp_path, nprobe=4, rebuild_threshold=10)
+    before = first.index
+    rows["published"] = True
+    builds = []
+    real_build = embeddings.EmbeddingIndex.build
+    monkeypatch.setattr(
+        embeddings.EmbeddingIndex, "build", classmethod(lambda cls, *a, **k: builds.append(1) or real_build(*a, **k))
+    )
+
+    assert first.refresh() == 20 and second.refresh() == 20
+
+    assert len(builds) == 1
+    assert first.index.path == second.index.path and first.index.path.exists()
+    assert len(first.index) == len(second.index) == 320
+    assert len(before) == 300 and first.index is not before
+
+
+def test_embedding_export_streams_into_one_float32_array(monkeypatch) -> None:
+    from contextlib import contextmanager
+    from datetime import timedelta
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.core import db
+    from backend.core.matching import embeddings
+    from backend.core.schema import Product
+
+    engine = create_engine("sqlite://")
+    Product.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    started = datetime(2026, 10, 16)
+    vectors = _clustered_vectors(40)
+    with factory() as session:
+        session.add_all(
+            Product(id=index + 1, name=f"p{index}", vector_embedding=vector.tolist(), updated_at=started)
+            for index, vector in enumerate(vectors[:30])
+        )
+        session.add(Product(id=99, name="short", vector_embedding=[1.0], updated_at=started))
+        session.add_all(
+            Product(
+                id=index + 1,
+                name=f"p{index}",
+                vector_embedding=vector.tolist(),
+                updated_at=started + timedelta(hours=1),
+            )
+            for index, vector in enumerate(vectors[30:], start=30)
+        )
+        session.commit()
+
+    @contextmanager
+    def scope():
+        with factory() as session:
+            yield session
+
+    monkeypatch.setattr(db, "session_scope", scope)
+    monkeypatch.setattr(embeddings, "_EXPORT_CHUNK_ROWS", 7)
+    monkeypatch.setattr(embeddings, "_DELTA_ROWS", 3)  # the delta has to grow twice
+
+    ids, exported, watermark = embeddings.load_embeddings()
+    assert ids == list(range(1, 41))
+    assert exported.dtype == np.float32 and exported.flags.c_contiguous and exported.shape == (40, vectors.shape[1])
+    np.testing.assert_allclose(exported, vectors, rtol=1e-6)
+    assert watermark == started + timedelta(hours=1)
+
+    delta_ids, delta, _ = embeddings.load_embeddings(started, dimension=vectors.shape[1])
+    assert delta_ids == list(range(31, 41)) and delta.shape == (10, vectors.shape[1])
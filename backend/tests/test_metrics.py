@@ -0,0 +1,106 @@
+"""Tests for the metrics registry, Celery task metrics and the /metrics endpoint."""
+
+from __future__ import annotations
+
+import json
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.app.main import create_app
+from backend.core.metrics import MetricsRegistry, SnapshotCollector, get_metrics, write_snapshot
+from backend.core.queue_depth import QUEUE_DEPTH
+from backend.workers import metrics as worker_metrics
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs.").inc(2, queue='a"b')
+    registry.histogram("wait_seconds", "Wait.", (0.1, 1.0)).observe(0.5, queue="matching")
+
+    text = registry.render()
+
+    assert '# TYPE jobs_total counter\njobs_total{queue="a\\"b"} 2' in text
+    assert 'wait_seconds_bucket{queue="matching",le="0.1"} 0' in text
+    assert 'wait_seconds_bucket{queue="matching",le="1"} 1' in text
+    assert 'wait_seconds_bucket{queue="matching",le="+Inf"} 1' in text
+    assert 'wait_seconds_count{queue="matching"} 1' in text
+
+
+def test_collector_merges_children_and_retires_dead_ones(tmp_path) -> None:
+    child = MetricsRegistry()
+    child.counter("tasks_total", "Tasks.").inc(3, task="match")
+    child.gauge("in_progress", "Running.").set(1, task="match")
+    write_snapshot(tmp_path, child)  # this process: alive
+    (tmp_path / "999999999.json").write_text(json.dumps(child.snapshot()))  # exited child
+    parent = MetricsRegistry()
+    parent.counter("tasks_total", "Tasks.").inc(1, task="match")
+
+    collector = SnapshotCollector(tmp_path)
+    merged = collector.collect(parent)
+
+    assert merged.counter("tasks_total", "Tasks.").value(task="match") == 7
+    assert merged.gauge("in_progress", "Running.").value(task="match") == 1
+    assert not (tmp_path / "999999999.json").exists()
+    # Retired counters are kept on later scrapes.
+    assert collector.collect(parent).counter("tasks_total", "Tasks.").value(task="match") == 7
+
+
+def test_task_signals_record_wait_runtime_and_failures() -> None:
+    get_metrics().reset()
+    request = SimpleNamespace(
+        is_eager=False,
+        eta=None,
+        delivery_info={"routing_key": "matching"},
+        savery_published_at=time.time() - 2.0,
+    )
+    task = SimpleNamespace(name="workers.matching.match_items", request=request)
+
+    worker_metrics._task_started("job.matching", task)
+    assert worker_metrics.IN_PROGRESS.value(task=task.name, queue="matching") == 1
+    worker_metrics._task_failed(sender=task, exception=ValueError("boom"))
+    worker_metrics._task_finished("job.matching", task, state="FAILURE")
+
+    wait = worker_metrics.QUEUE_WAIT.value(task=task.name, queue="matching")
+    assert wait.count == 1 and wait.total >= 2.0
+    assert worker_metrics.RUNTIME.value(task=task.name, queue="matching", state="FAILURE").count == 1
+    assert worker_metrics.FAILURES.value(task=task.name, queue="matching", exception="ValueError") == 1
+    assert worker_metrics.IN_PROGRESS.value(task=task.name, queue="matching") == 0
+
+
+def test_metrics_endpoint_samples_queue_depth(monkeypatch) -> None:
+    get_metrics().reset()
+
+    class _Sampler:
+        def sample_if_due(self, interval: float) -> None:
+            QUEUE_DEPTH.set(12, queue="scraping")
+
+    monkeypatch.setattr("backend.app.api.routes.metrics.get_queue_sampler", lambda: _Sampler())
+
+    response = TestClient(create_app()).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'savery_queue_depth{queue="scraping"} 12' in response.text
+
+
+def test_child_snapshot_shows_running_tasks(tmp_path, monkeypatch) -> None:
+    get_metrics().reset()
+    monkeypatch.setattr(worker_metrics.settings, "metrics_flush_seconds", 0.05)
+    monkeypatch.setattr(worker_metrics, "_snapshot_dir", tmp_path)
+    monkeypatch.setattr(worker_metrics, "_last_flush", time.monotonic())  # a flush just happened
+    monkeypatch.setattr(worker_metrics, "_in_child", True)
+    request = SimpleNamespace(is_eager=False, eta=None, delivery_info={"routing_key": "pricing"})
+    task = SimpleNamespace(name="workers.scraping.fetch_prices", request=request)
+
+    worker_metrics._start_flusher()
+    try:
+        worker_metrics._task_started("job.pricing", task)
+        time.sleep(0.2)
+        running = MetricsRegistry()
+        running.merge(json.loads(next(tmp_path.glob("*.json")).read_text()))
+        assert running.gauge("savery_tasks_in_progress", "").value(task=task.name, queue="pricing") == 1
+        worker_metrics._task_finished("job.pricing", task, state="SUCCESS")
+    finally:
+        worker_metrics._child_stopping()
@@ -0,0 +1,154 @@
+"""Tests for the store-assignment solver and the plan_route task."""
+
+import itertools
+import time
+
+import numpy as np
+
+from backend.core.geo import haversine_matrix
+from backend.core.optimization import AssignmentProblem, order_stops, solve_assignment
+from backend.workers.tasks import optimize
+from backend.workers.tasks.optimize import plan_route
+
+
+def _brute_force(problem: AssignmentProblem) -> float:
+    best = float("inf")
+    w = problem.cost_priority
+    for size in range(1, problem.store_limit + 1):
+        for stores in itertools.combinations(range(problem.n_stores), size):
+            item_cost = problem.costs[:, stores].min(axis=1)
+            if not np.isfinite(item_cost).all():
+                continue
+            best = min(best, w * item_cost.sum() + (1 - w) * problem.travel[list(stores)].sum())
+    return best
+
+
+def test_branch_and_bound_matches_brute_force() -> None:
+    rng = np.random.default_rng(7)
+    for _ in range(20):
+        costs = rng.uniform(1, 10, size=(15, 7))
+        problem = AssignmentProblem(
+            costs=costs,
+            travel=rng.uniform(0, 8, size=7),
+            cost_priority=float(rng.uniform(0.2, 0.9)),
+            max_stores=int(rng.integers(1, 4)),
+        )
+
+        plan = solve_assignment(problem, deadline_seconds=5.0)
+
+        assert plan.optimal
+        assert len(plan.stores) <= problem.max_stores
+        assert np.isclose(plan.objective, _brute_force(problem))
+
+
+def test_unavailable_items_are_penalized_at_either_extreme_priority() -> None:
+    costs = np.array([[1.0, np.inf], [np.inf, 1.0], [np.inf, 1.0]])
+    for cost_priority in (0.0, 1.0):
+        problem = AssignmentProblem(costs=costs, travel=np.array([1.0, 1.0]), cost_priority=cost_priority)
+
+        plan = solve_assignment(problem)
+
+        assert plan.stores == [0, 1], cost_priority
+        assert plan.missing_items == []
+        assert plan.item_store.tolist() == [0, 1, 1]
+
+
+def test_local_search_meets_deadline_for_large_inputs() -> None:
+    rng = np.random.default_rng(3)
+    costs = rng.uniform(1, 10, size=(200, 30))
+    problem = AssignmentProblem(costs=costs, travel=np.full(30, 5.0), max_stores=4)
+
+    started = time.perf_counter()
+    plan = solve_assignment(problem, deadline_seconds=0.3)
+
+    assert time.perf_counter() - started < 0.6
+    assert 1 <= len(plan.stores) <= 4
+    assert (plan.item_store >= 0).all()
+
+
+def test_held_karp_matches_brute_force_tour() -> None:
+    rng = np.random.default_rng(11)
+    distances = haversine_matrix(rng.uniform(42, 43, 8), rng.uniform(-74, -73, 8))
+
+    route = order_stops(distances)
+
+    best = min(
+        sum(distances[a, b] for a, b in zip((0, *perm), (*perm, 0)))
+        for perm in itertools.permutations(range(1, 8))
+    )
+    assert route.optimal
+    assert np.isclose(route.total_distance, best)
+    assert np.isclose(sum(route.legs) + route.return_leg, route.total_distance)
+
+
+def test_two_opt_visits_every_stop_within_deadline() -> None:
+    rng = np.random.default_rng(5)
+    distances = haversine_matrix(rng.uniform(42, 43, 41), rng.uniform(-74, -73, 41))
+
+    started = time.perf_counter()
+    route = order_stops(distances, deadline_seconds=0.1)
+
+    assert time.perf_counter() - started < 0.3
+    assert sorted(route.order) == list(range(1, 41))
+
+
+def test_plan_route_orders_stores_and_reports_distances(monkeypatch) -> None:
+    locations = {
+        "far": {"name": "Far Mart", "latitude": 42.80, "longitude": -73.75},
+        "near": {"name": "Near Mart", "latitude": 42.66, "longitude": -73.75},
+    }
+    monkeypatch.setattr(optimize, "_load_store_locations", lambda store_ids: locations)
+    payload = {
+        "request": {
+            "store_ids": ["far", "near"],
+            "latitude": 42.65,
+            "longitude": -73.75,
+            "preferences": {"cost_priority": 1.0},
+        },
+        "priced_items": [
+            {"list_item": {"name": "milk"}, "offers": [{"store_id": "far", "price": 1.0}]},
+            {"list_item": {"name": "eggs"}, "offers": [{"store_id": "near", "price": 1.0}]},
+        ],
+    }
+
+    result = plan_route(payload)["result"]
+
+    assert [store["store_id"] for store in result["stores"]] in (["near", "far"], ["far", "near"])
+    assert all(store["distance_km"] > 0 for store in result["stores"])
+    assert result["stores"][0]["store_name"] in ("Near Mart", "Far Mart")
+    assert result["total_distance_km"] > 2 * 15
+
+
+def test_plan_route_assigns_items_to_cheapest_store(monkeypatch) -> None:
+    monkeypatch.setattr(optimize, "_load_store_locations", lambda store_ids: {})
+    payload = {
+        "request": {
+            "store_ids": ["kroger-1", "walmart-1"],
+            "preferences": {"cost_priority": 1.0},
+        },
+        "priced_items": [
+            {
+                "list_item": {"name": "milk", "quantity": 2},
+                "offers": [
+                    {"store_id": "kroger-1", "price": 3.0},
+                    {"store_id": "walmart-1", "price": 2.5},
+                ],
+            },
+            {
+                "list_item": {"name": "eggs"},
+                "offers": [
+                    {"store_id": "kroger-1", "price": 1.0},
+                    {"store_id": "walmart-1", "price": None},
+                ],
+            },
+            {"list_item": {"name": "saffron"}, "offers": []},
+        ],
+    }
+
+    result = plan_route(payload)["result"]
+
+    by_store = {store["store_id"]: store for store in result["stores"]}
+    assert [i["list_item"]["name"] for i in by_store["walmart-1"]["items"]] == ["milk"]
+    assert [i["list_item"]["name"] for i in by_store["kroger-1"]["items"]] == ["eggs"]
+    assert result["total_cost"] == 6.0
+    assert result["unmatched_items"] == [{"name": "saffron"}]
@@ -0,0 +1,53 @@
+"""Tests for the in-process tier of the shared price cache."""
+
+from datetime import datetime, timedelta
+
+from backend.core.price_cache import CachedPrice, PriceCache
+
+
+def _entry(product: str, store_id: str, *, age: timedelta = timedelta(0)) -> CachedPrice:
+    return CachedPrice(
+        product=product,
+        store_id=store_id,
+        price=2.5,
+        list_price=2.5,
+        promo_price=None,
+        currency="USD",
+        unit="gal",
+        provider=store_id.split("-")[0],
+        observed_at=datetime.utcnow() - age,
+    )
+
+
+def test_lru_evicts_least_recently_used_entries() -> None:
+    cache = PriceCache(max_entries=2, default_ttl=60, use_database=False)
+    cache.put_many([_entry("1", "kroger-a"), _entry("2", "kroger-a")])
+
+    cache.get_many([("1", "kroger-a")])
+    cache.put_many([_entry("3", "kroger-a")])
+    fresh, _ = cache.get_many([("1", "kroger-a"), ("2", "kroger-a"), ("3", "kroger-a")])
+
+    assert set(fresh) == {("1", "kroger-a"), ("3", "kroger-a")}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_provider_ttl_marks_entries_stale() -> None:
+    cache = PriceCache(
+        max_entries=10,
+        default_ttl=3600,
+        provider_ttls={"walmart": 60},
+        use_database=False,
+    )
+    cache.put_many(
+        [
+            _entry("1", "kroger-a", age=timedelta(minutes=5)),
+            _entry("1", "walmart-b", age=timedelta(minutes=5)),
+        ]
+    )
+
+    fresh, stale = cache.get_many([("1", "kroger-a"), ("1", "walmart-b"), ("9", "kroger-a")])
+
+    assert fresh[("1", "kroger-a")]["cache"] == "memory"
+    assert set(stale) == {("1", "walmart-b")}
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale"], stats["misses"]) == (1, 1, 1)
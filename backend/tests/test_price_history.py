@@ -0,0 +1,92 @@
+"""Tests for monthly price partition maintenance."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from sqlalchemy.exc import OperationalError
+
+from backend.core import price_history
+from backend.core.config import settings
+
+
+class _FakeResult(list):
+    rowcount = 7
+
+
+class _FakeConnection:
+    def __init__(self, partitions: list[str]) -> None:
+        self.partitions = partitions
+        self.statements: list[str] = []
+        self.failing: set[str] = set()
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_inherits" in sql:
+            return _FakeResult((name,) for name in self.partitions)
+        self.statements.append(" ".join(sql.split()))
+        if sql in self.failing:
+            raise OperationalError(sql, params, Exception("canceling statement due to lock timeout"))
+        return _FakeResult()
+
+
+class _FakeEngine:
+    def __init__(self, connection: _FakeConnection) -> None:
+        self.connection = connection
+
+    @contextmanager
+    def begin(self):
+        yield self.connection
+
+
+def test_month_arithmetic_and_names_round_trip() -> None:
+    assert price_history.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert price_history.add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+    assert price_history.partition_name(date(2026, 3, 1)) == "prices_y2026m03"
+    assert price_history.partition_month("prices_y2026m03") == date(2026, 3, 1)
+    assert price_history.partition_month("prices_default") is None
+
+
+def test_maintenance_creates_future_months_and_retires_expired(monkeypatch) -> None:
+    connection = _FakeConnection(
+        ["prices_default", "prices_y2025m08", "prices_y2025m09", "prices_y2025m10", "prices_y2026m10"]
+    )
+    monkeypatch.setattr(price_history, "get_engine", lambda: _FakeEngine(connection))
+    monkeypatch.setattr(settings, "price_partition_months_ahead", 2)
+    monkeypatch.setattr(settings, "price_raw_retention_months", 12)
+    monkeypatch.setattr(settings, "price_retention_action", "archive")
+
+    report = price_history.maintain_partitions(datetime(2026, 10, 16, 9, 30))
+
+    assert report.created == ["prices_y2026m11", "prices_y2026m12"]
+    assert report.retired == ["prices_y2025m08", "prices_y2025m09"]
+    assert report.rolled_up_rows == 7
+    assert (
+        "CREATE TABLE prices_y2026m12 PARTITION OF prices FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        in connection.statements
+    )
+    retire = connection.statements[-6:-2]
+    assert retire[0].startswith("INSERT INTO price_daily_rollups")
+    assert retire[1:] == [
+        "SET LOCAL lock_timeout = 5000",
+        "ALTER TABLE prices DETACH PARTITION prices_y2025m09",
+        "ALTER TABLE prices_y2025m09 RENAME TO prices_archive_y2025m09",
+    ]
+    assert "FROM prices_default WHERE observed_at < :cutoff" in connection.statements[-2]
+    assert connection.statements[-1] == "DELETE FROM prices_default WHERE observed_at < :cutoff"
+    assert report.default_rows_retired == 7
+
+
+def test_partition_that_cannot_be_locked_is_retried_next_run(monkeypatch) -> None:
+    connection = _FakeConnection(["prices_default", "prices_y2025m08", "prices_y2025m09"])
+    connection.failing.add("ALTER TABLE prices DETACH PARTITION prices_y2025m08")
+    monkeypatch.setattr(price_history, "get_engine", lambda: _FakeEngine(connection))
+    monkeypatch.setattr(settings, "price_raw_retention_months", 12)
+    monkeypatch.setattr(settings, "price_retention_action", "drop")
+
+    report = price_history.maintain_partitions(datetime(2026, 10, 16, 9, 30))
+
+    assert report.retired == ["prices_y2025m09"]
+    assert "DROP TABLE prices_y2025m08" not in connection.statements
+    assert "DROP TABLE prices_y2025m09" in connection.statements
@@ -0,0 +1,65 @@
+"""Tests for pipeline progress events and the SSE stream."""
+
+import asyncio
+
+from backend.app.api.routes import tasks as task_routes
+from backend.core import progress
+from backend.core.progress import ProgressEvent, StageTimer, parse_stage_task_id, stage_task_ids
+
+
+class _Request:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_stage_task_ids_round_trip() -> None:
+    ids = stage_task_ids("job-1")
+
+    assert [parse_stage_task_id(ids[stage]) for stage in progress.STAGES] == [
+        ("job-1", "matching"),
+        ("job-1", "pricing"),
+        ("job-1", "routing"),
+    ]
+
+    timer = StageTimer()
+    timer.started(ids["pricing"])
+    finished = timer.finished(ids["pricing"])
+    assert (finished.stage, finished.state, finished.final) == ("pricing", "succeeded", False)
+    assert finished.elapsed_seconds is not None
+
+
+def test_stream_pushes_stages_then_result_once(monkeypatch) -> None:
+    statuses = iter(
+        [
+            {"id": "job-1", "status": "PENDING", "ready": False, "successful": False, "result": None},
+            {"id": "job-1", "status": "SUCCESS", "ready": True, "successful": True, "result": {"total": 1}},
+        ]
+    )
+    monkeypatch.setattr(task_routes, "get_task_status", lambda task_id: next(statuses))
+    monkeypatch.setattr(progress.ProgressBroker, "_ensure_listener", lambda self: None)
+    monkeypatch.setattr(progress, "_broker", None)
+
+    async def scenario() -> list[str]:
+        chunks: list[str] = []
+        broker = progress.get_progress_broker()
+
+        async def produce() -> None:
+            while "job-1" not in broker._subscribers:
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.01)
+            for stage in progress.STAGES:
+                broker.dispatch(ProgressEvent("job-1", stage, "succeeded", "now", 0.1))
+            broker.dispatch(ProgressEvent("other-job", "routing", "succeeded", "now"))
+
+        producer = asyncio.create_task(produce())
+        async for chunk in task_routes._task_events(_Request(), "job-1"):
+            chunks.append(chunk)
+        await producer
+        assert not broker._subscribers
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    events = [chunk.split("\n", 1)[0] for chunk in chunks]
+    assert events == ["event: status", "event: stage", "event: stage", "event: stage", "event: result"]
+    assert '"total": 1' in chunks[-1]
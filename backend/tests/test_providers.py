@@ -0,0 +1,148 @@
+"""Tests for the concurrent provider pool against a local stub HTTP server."""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backend.workers.providers import DailyBudget, OfferRequest, ProviderPool, WalmartProvider, ratelimit
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures: dict[str, int] = {}
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        query = parse_qs(urlparse(self.path).query)["query"][0]
+        time.sleep(0.2)
+        if query.startswith("flaky") and self.failures.get(query, 0) < 1:
+            self.failures[query] = self.failures.get(query, 0) + 1
+            self._send(503, {})
+            return
+        self._send(200, {"items": [{"name": query.title(), "salePrice": 1.5, "msrp": 2.0}]})
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 64
+
+
+@pytest.fixture()
+def stub_url():
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_lookups_run_concurrently_and_retry(stub_url: str) -> None:
+    pool = ProviderPool([WalmartProvider(stub_url)], max_concurrency=25, backoff=0.01)
+    requests = [
+        OfferRequest(key=(f"q:item{i}", f"walmart-{i % 5}"), query=f"item{i}", store_id=f"walmart-{i % 5}")
+        for i in range(24)
+    ]
+    requests.append(OfferRequest(key=("q:flaky", "walmart-1"), query="flaky", store_id="walmart-1"))
+
+    started = time.perf_counter()
+    offers = pool.fetch_many({"walmart": requests})
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    assert len(offers) == 25
+    # 25 lookups of 200ms each, one of them retried: far below the 5s serial time.
+    assert elapsed < 1.0
+    flaky = next(offer for offer in offers if offer.product == "q:flaky")
+    assert (flaky.price, flaky.list_price, flaky.provider) == (1.5, 2.0, "walmart")
+
+
+def test_batch_timeout_returns_resolved_offers(stub_url: str) -> None:
+    pool = ProviderPool([WalmartProvider(stub_url)], max_concurrency=2, backoff=0.01)
+    requests = [
+        OfferRequest(key=(f"q:item{i}", "walmart-1"), query=f"item{i}", store_id="walmart-1") for i in range(10)
+    ]
+
+    started = time.perf_counter()
+    offers = pool.fetch_many({"walmart": requests}, timeout=0.5)
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    # Two at a time at 200ms each: about four lookups fit before the deadline.
+    assert 0 < len(offers) < 10
+    assert elapsed < 1.0
+
+
+class _SharedCounts:
+    """Stands in for ``provider_request_counts``: one counter per (provider, day)."""
+
+    def __init__(self) -> None:
+        self.used: dict[tuple, int] = {}
+
+    def __call__(self, provider: str, day, requests: int, budget: int) -> bool:
+        used = self.used.get((provider, day), 0)
+        if used + requests > budget:
+            return False
+        self.used[(provider, day)] = used + requests
+        return True
+
+
+def test_daily_budget_caps_lookups_without_pacing_them(stub_url: str) -> None:
+    provider = WalmartProvider(stub_url, daily_budget=3)
+    provider.budget.store = _SharedCounts()
+    pool = ProviderPool([provider], max_concurrency=10, backoff=0.01)
+    requests = [
+        OfferRequest(key=(f"q:item{i}", "walmart-1"), query=f"item{i}", store_id="walmart-1") for i in range(5)
+    ]
+
+    started = time.perf_counter()
+    offers = pool.fetch_many({"walmart": requests}, timeout=5)
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    assert len(offers) == 3
+    assert elapsed < 1.0
+
+
+def test_daily_budget_is_shared_between_processes() -> None:
+    counts = _SharedCounts()
+    # Two workers reserving 5 requests at a time from one 10-request quota.
+    first, second = (DailyBudget("kroger", 10, reserve=5, store=counts) for _ in range(2))
+
+    async def spend(budget: DailyBudget, attempts: int) -> int:
+        return sum([await budget.acquire() for _ in range(attempts)])
+
+    spent = asyncio.run(spend(first, 5)) + asyncio.run(spend(second, 8))
+
+    assert spent == 10
+    assert sum(counts.used.values()) == 10
+
+
+def test_daily_budget_starts_over_on_a_new_utc_day(monkeypatch: pytest.MonkeyPatch) -> None:
+    today = [date(2026, 10, 16)]
+    monkeypatch.setattr(ratelimit, "_utc_today", lambda: today[0])
+    counts = _SharedCounts()
+    budget = DailyBudget("kroger", 2, store=counts)
+
+    async def spend() -> list[bool]:
+        return [await budget.acquire() for _ in range(3)]
+
+    assert asyncio.run(spend()) == [True, True, False]
+    today[0] = date(2026, 10, 17)
+    assert asyncio.run(spend()) == [True, True, False]
+    assert sorted(counts.used.values()) == [2, 2]
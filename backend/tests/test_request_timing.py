@@ -0,0 +1,79 @@
+"""Tests for Server-Timing headers, per-route latency metrics and request profiling."""
+
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.app.api.routes import optimization
+from backend.app.main import create_app
+from backend.core import request_timing
+from backend.core.config import settings
+from backend.core.metrics import get_metrics
+
+PAYLOAD = {"items": [{"name": "milk"}], "store_ids": ["kroger-1"]}
+
+
+def _slow_enqueue(payload) -> str:
+    with request_timing.timed("enqueue"):
+        time.sleep(0.02)
+    request_timing.record("db", 0.001)
+    request_timing.record("db", 0.002)
+    return "job-1"
+
+
+def _phases(header: str) -> dict[str, str]:
+    return {part.split(";")[0]: part for part in header.split(", ")}
+
+
+def test_server_timing_breaks_down_request_phases(monkeypatch) -> None:
+    monkeypatch.setattr(optimization, "enqueue_optimization_job", _slow_enqueue)
+    client = TestClient(create_app())
+
+    phases = _phases(client.post("/api/optimize", json=PAYLOAD).headers["server-timing"])
+
+    assert list(phases) == ["validate", "handler", "db", "enqueue", "serialize", "total"]
+    assert float(phases["enqueue"].split("dur=")[1]) >= 20
+    assert phases["db"].endswith('desc="2 calls"')
+    # Requests rejected by validation never reach the handler.
+    assert list(_phases(client.post("/api/optimize", json={"items": "x"}).headers["server-timing"])) == [
+        "validate",
+        "total",
+    ]
+
+
+def test_latency_histogram_uses_prefixed_route_templates(monkeypatch) -> None:
+    get_metrics().reset()
+    monkeypatch.setattr(settings, "job_store_enabled", False)
+    client = TestClient(create_app())
+
+    client.get("/api/tasks/cached-abc")
+
+    histogram = get_metrics().histogram("savery_http_request_duration_seconds", "")
+    assert histogram.value(method="GET", route="/api/tasks/{task_id}", status="200").count == 1
+
+
+def test_profile_header_captures_stacks_for_admins(monkeypatch) -> None:
+    monkeypatch.setattr(optimization, "enqueue_optimization_job", _slow_enqueue)
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    client = TestClient(create_app())
+    admin = {"Authorization": "Bearer s3cret"}
+
+    assert "x-savery-profile-id" not in client.post("/api/optimize", json=PAYLOAD).headers
+    response = client.post("/api/optimize", json=PAYLOAD, headers={"X-Savery-Profile": "s3cret"})
+    profile_id = response.headers["x-savery-profile-id"]
+
+    assert client.get("/api/diagnostics/profiles").status_code == 401
+    listed = client.get("/api/diagnostics/profiles", headers=admin).json()["profiles"]
+    assert listed[0]["id"] == int(profile_id) and listed[0]["reason"] == "header"
+    folded = client.get(f"/api/diagnostics/profiles/{profile_id}?format=folded", headers=admin).text
+    assert "_slow_enqueue (test_request_timing.py" in folded
+
+
+def test_admin_endpoints_are_hidden_without_a_token(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "admin_token", None)
+
+    response = TestClient(create_app()).get("/api/diagnostics/profiles", headers={"Authorization": "Bearer x"})
+
+    assert response.status_code == 404
@@ -0,0 +1,46 @@
+"""Tests for whole-request result memoization."""
+
+from backend.core import result_cache, tasks
+
+
+def _request(**overrides):
+    payload = {
+        "items": [{"name": "Whole Milk", "quantity": 1}, {"name": "eggs"}],
+        "store_ids": ["kroger-1", "walmart-2"],
+        "latitude": 42.65261,
+        "longitude": -73.75621,
+        "preferences": None,
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_fingerprint_ignores_order_whitespace_and_nearby_coordinates() -> None:
+    base = result_cache.request_fingerprint(_request())
+    variant = _request(
+        items=[{"name": " eggs "}, {"name": "whole   milk", "quantity": 1}],
+        store_ids=["walmart-2", "kroger-1"],
+        latitude=42.65299,
+        preferences={"cost_priority": 0.5},
+    )
+
+    assert result_cache.request_fingerprint(variant) == base
+    assert result_cache.request_fingerprint(_request(store_ids=["kroger-1"])) != base
+    assert result_cache.request_fingerprint(_request(latitude=42.75)) != base
+    assert result_cache.request_fingerprint(_request(preferences={"max_stores": 1})) != base
+
+
+def test_cache_hit_skips_the_broker_and_resolves_immediately(monkeypatch) -> None:
+    stored = {"result": {"total_cost": 4.2}}
+    monkeypatch.setattr(result_cache, "lookup", lambda fingerprint: stored)
+    monkeypatch.setattr(result_cache, "load", lambda fingerprint: stored)
+    monkeypatch.setattr(
+        tasks, "_build_workflow", lambda payload: (_ for _ in ()).throw(AssertionError("enqueued"))
+    )
+
+    task_id = tasks.enqueue_optimization_job(_request())
+    status = tasks.get_task_status(task_id)
+
+    assert task_id == result_cache.cached_task_id(result_cache.request_fingerprint(_request()))
+    assert status["ready"] and status["successful"]
+    assert status["result"] == stored
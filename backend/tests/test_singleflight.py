@@ -0,0 +1,109 @@
+"""Tests for in-process request coalescing."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from backend.core.singleflight import SingleFlight, advisory_key
+
+
+def test_concurrent_callers_share_one_fetch() -> None:
+    flight = SingleFlight("test", distributed=False)
+    calls: list[list[str]] = []
+    started = threading.Barrier(5)
+
+    def fetch(keys: list[str]) -> dict[str, str]:
+        calls.append(keys)
+        time.sleep(0.05)
+        return {key: key.upper() for key in keys}
+
+    results: list[dict[str, str]] = []
+
+    def worker() -> None:
+        started.wait()
+        results.append(flight.do_many(["milk", "eggs"], fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(len(keys) for keys in calls) == 2
+    assert all(result == {"milk": "MILK", "eggs": "EGGS"} for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+class _LockConnection:
+    """Fake connection where ``taken`` lock ids belong to another process."""
+
+    def __init__(self, taken: set[int]) -> None:
+        self.taken = taken
+        self.statements: list[tuple[str, list[int]]] = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, (params or {}).get("ids")))
+        ids = (params or {}).get("ids") or []
+        return SimpleNamespace(all=lambda: [(lock_id, lock_id not in self.taken) for lock_id in ids])
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def test_distributed_leader_locks_and_unlocks_all_keys_in_one_statement(monkeypatch) -> None:
+    flight = SingleFlight("test", wait_timeout=2.0)
+    keys = ["milk", "eggs", "bread", "rice"]
+    contended = advisory_key("test", "bread")
+    connection = _LockConnection({contended})
+    monkeypatch.setattr(SingleFlight, "_connect", staticmethod(lambda: connection))
+    fetched: list[list[str]] = []
+
+    def fetch(batch: list[str]) -> dict[str, str]:
+        fetched.append(batch)
+        return {key: key.upper() for key in batch}
+
+    results = flight.do_many(keys, fetch, recheck=lambda batch: {"bread": "BREAD"} if "bread" in batch else {})
+
+    assert results == {key: key.upper() for key in keys}
+    assert fetched == [["milk", "eggs", "rice"]]
+    statements = [sql for sql, _ in connection.statements]
+    assert sum("pg_try_advisory_lock" in sql for sql in statements) == 1
+    assert sum("pg_advisory_unlock" in sql for sql in statements) == 1
+    waits = [ids for sql, ids in connection.statements if "pg_advisory_xact_lock_shared" in sql]
+    assert waits == [[contended]]
+    assert any("statement_timeout" in sql for sql in statements)
+
+
+def test_keys_the_shared_store_cannot_serve_are_not_locked_across_processes(monkeypatch) -> None:
+    flight = SingleFlight("test", wait_timeout=2.0)
+    connection = _LockConnection({advisory_key("test", "q:milk")})
+    connections = []
+
+    def connect():
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(SingleFlight, "_connect", staticmethod(connect))
+    fetched: list[list[str]] = []
+
+    def fetch(batch: list[str]) -> dict[str, str]:
+        fetched.append(batch)
+        return {key: key.upper() for key in batch}
+
+    def product_key(key: str) -> bool:
+        return not key.startswith("q:")
+
+    assert flight.do_many(["q:milk", "q:eggs"], fetch, shared=product_key) == {"q:milk": "Q:MILK", "q:eggs": "Q:EGGS"}
+    assert connections == []
+
+    flight.do_many(["42", "q:milk"], fetch, recheck=lambda batch: {}, shared=product_key)
+    assert fetched[-1] == ["42", "q:milk"]
+    locked = [ids for sql, ids in connection.statements if "pg_try_advisory_lock" in sql]
+    assert locked == [[advisory_key("test", "42")]]
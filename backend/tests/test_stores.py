@@ -0,0 +1,128 @@
+"""Tests for the store spatial index and the ``/api/stores`` endpoint."""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import create_app
+from backend.core.geo import haversine_matrix
+from backend.core.store_index import StoreCatalog, StoreRecord, StoreSpatialIndex, set_store_catalog
+
+
+def _random_stores(count: int, seed: int = 7) -> list[StoreRecord]:
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(40.0, 44.0, count)
+    lons = rng.uniform(-76.0, -71.0, count)
+    return [
+        StoreRecord(f"store-{i}", f"Store {i:04d}", None, float(lat), float(lon))
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+
+
+def _brute_force(stores: list[StoreRecord], latitude: float, longitude: float) -> np.ndarray:
+    lats = np.array([store.latitude for store in stores])
+    lons = np.array([store.longitude for store in stores])
+    return haversine_matrix(np.array([latitude]), np.array([longitude]), lats, lons)[0]
+
+
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_nearest_matches_brute_force(k: int) -> None:
+    stores = _random_stores(2000)
+    index = StoreSpatialIndex(stores, cell_degrees=0.1)
+
+    for latitude, longitude in [(42.65, -73.75), (40.01, -75.99), (45.5, -70.0)]:
+        hits = index.nearest(latitude, longitude, k)
+        expected = np.sort(_brute_force(stores, latitude, longitude))[:k]
+        assert [hit.distance_km for hit in hits] == pytest.approx(expected, abs=1e-3)
+
+
+def test_nearest_from_remote_origins_matches_brute_force() -> None:
+    stores = _random_stores(2000)
+    index = StoreSpatialIndex(stores, cell_degrees=0.1)
+
+    # Honolulu, Sydney and the North Pole: thousands of kilometres from every store.
+    for latitude, longitude in [(21.3, -157.8), (-33.9, 151.2), (89.9, 0.0)]:
+        hits = index.nearest(latitude, longitude, 5)
+        expected = np.sort(_brute_force(stores, latitude, longitude))[:5]
+        assert [hit.distance_km for hit in hits] == pytest.approx(expected, abs=1e-3)
+
+
+def test_within_matches_brute_force_and_skips_unlocated_stores() -> None:
+    stores = _random_stores(1500) + [StoreRecord("nowhere", "Nowhere", None, None, None)]
+    index = StoreSpatialIndex(stores, cell_degrees=0.25)
+
+    hits = index.within(42.0, -73.5, 30.0)
+    distances = _brute_force(stores[:-1], 42.0, -73.5)
+
+    assert len(hits) == int((distances <= 30.0).sum())
+    assert all(a.distance_km <= b.distance_km for a, b in zip(hits, hits[1:]))
+    assert len(index.listing()) == len(stores)
+
+
+@pytest.fixture
+def client():
+    stores = [
+        StoreRecord("albany", "Albany Market", "1 State St", 42.6526, -73.7562),
+        StoreRecord("troy", "Troy Grocer", None, 42.7284, -73.6918),
+        StoreRecord("nyc", "NYC Foods", None, 40.7128, -74.0060),
+    ]
+    catalog = StoreCatalog()
+    catalog.index = StoreSpatialIndex(stores, version="v1")
+    catalog.loaded = True
+    catalog.refreshed_at = time.monotonic()
+    set_store_catalog(catalog)
+    yield TestClient(create_app())
+    set_store_catalog(None)
+
+
+def test_store_search_orders_by_distance_and_paginates(client: TestClient) -> None:
+    response = client.get("/api/stores", params={"latitude": 42.65, "longitude": -73.75, "k": 3, "limit": 2})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [store["id"] for store in payload["stores"]] == ["albany", "troy"]
+    assert payload["total"] == 3
+    assert payload["next_offset"] == 2
+
+    radius = client.get("/api/stores", params={"latitude": 42.65, "longitude": -73.75, "radius_km": 20}).json()
+    assert [store["id"] for store in radius["stores"]] == ["albany", "troy"]
+    assert radius["next_offset"] is None
+
+
+def test_nearest_search_without_k_pages_through_every_located_store() -> None:
+    stores = _random_stores(10) + [StoreRecord("nowhere", "Nowhere", None, None, None)]
+    catalog = StoreCatalog()
+    catalog.index = StoreSpatialIndex(stores, version="v1")
+    catalog.loaded = True
+    catalog.refreshed_at = time.monotonic()
+    set_store_catalog(catalog)
+    try:
+        client = TestClient(create_app())
+        params = {"latitude": 42.0, "longitude": -73.5, "limit": 3}
+        first = client.get("/api/stores", params=params).json()
+        last = client.get("/api/stores", params={**params, "offset": 9}).json()
+    finally:
+        set_store_catalog(None)
+
+    assert (first["total"], first["next_offset"], len(first["stores"])) == (10, 3, 3)
+    assert (last["total"], last["next_offset"], len(last["stores"])) == (10, None, 1)
+
+
+def test_store_listing_supports_conditional_requests(client: TestClient) -> None:
+    first = client.get("/api/stores")
+    etag = first.headers["etag"]
+
+    assert [store["id"] for store in first.json()["stores"]] == ["albany", "nyc", "troy"]
+    assert "max-age" in first.headers["cache-control"]
+
+    revalidated = client.get("/api/stores", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+def test_store_search_requires_both_coordinates(client: TestClient) -> None:
+    assert client.get("/api/stores", params={"latitude": 42.0}).status_code == 422
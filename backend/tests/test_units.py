@@ -0,0 +1,89 @@
+"""Tests for unit normalization and unit-aware cost matrices."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backend.core import units
+from backend.workers.tasks.optimize import _build_cost_matrix
+
+
+@pytest.mark.parametrize(
+    ("text", "dimension", "amount"),
+    [
+        ("16 oz", units.MASS, 453.59237),
+        ("1.5 LB bag", units.MASS, 680.388555),
+        ("1 1/2 lb", units.MASS, 680.388555),
+        ("2 x 500 ml", units.VOLUME, 1000.0),
+        ("1/2 gal", units.VOLUME, 1892.705892),
+        ("6 pack 12 fl. oz.", units.VOLUME, 6 * 12 * 29.5735295625),
+        ("dozen", units.COUNT, 12.0),
+        ("12 ct", units.COUNT, 12.0),
+    ],
+)
+def test_parse_unit_converts_to_base_units(text: str, dimension: int, amount: float) -> None:
+    measure = units.parse_unit(text)
+
+    assert measure is not None
+    assert measure.dimension == dimension
+    assert measure.amount == pytest.approx(amount)
+
+
+def test_parse_unit_rejects_unknown_and_embedded_words() -> None:
+    assert units.parse_unit("family size") is None
+    assert units.parse_unit("bulb") is None
+    assert units.parse_unit(None) is None
+
+
+def test_normalize_offers_computes_unit_prices() -> None:
+    normalized = units.normalize_offers(
+        [{"price": 4.0, "unit": "2 lb"}, {"price": 3.0, "unit": "1 l"}, {"price": 1.0, "unit": "jumbo"}]
+    )
+
+    assert list(normalized.dimension) == [units.MASS, units.VOLUME, units.UNKNOWN]
+    assert normalized.unit_price[0] == pytest.approx(4.0 / 907.18474)
+    assert normalized.unit_price[1] == pytest.approx(0.003)
+    assert np.isnan(normalized.unit_price[2])
+    assert normalized.basis(1) == "ml"
+
+
+def test_cost_matrix_buys_enough_packages_to_cover_the_request() -> None:
+    priced_items = [
+        {
+            "list_item": {"name": "chicken", "quantity": 2, "unit": "lb"},
+            "offers": [
+                {"store_id": "a", "price": 3.0, "unit": "16 oz"},
+                {"store_id": "b", "price": 5.0, "unit": "3 lb"},
+                {"store_id": "b", "price": 9.0, "unit": "5 lb"},
+            ],
+        },
+        {
+            "list_item": {"name": "eggs", "quantity": 2},
+            "offers": [{"store_id": "a", "price": 2.5, "unit": "12 ct"}],
+        },
+    ]
+
+    costs, chosen = _build_cost_matrix(priced_items, ["a", "b"])
+
+    assert costs[0].tolist() == [6.0, 5.0]
+    assert chosen[0][0]["packages"] == 2
+    assert chosen[0][1]["unit"] == "3 lb"
+    assert chosen[0][1]["unit_basis"] == "g"
+    # No unit on the list item: the quantity counts packages.
+    assert costs[1, 0] == 5.0
+    assert np.isinf(costs[1, 1])
+
+
+def test_cost_matrix_charges_the_whole_packages_it_reports() -> None:
+    priced_items = [
+        {
+            "list_item": {"name": "avocado", "quantity": 1.5},
+            "offers": [{"store_id": "a", "price": 2.0, "unit": "1 ct"}],
+        }
+    ]
+
+    costs, chosen = _build_cost_matrix(priced_items, ["a"])
+
+    assert chosen[0][0]["packages"] == 2
+    assert costs[0, 0] == 4.0
@@ -0,0 +1,49 @@
+"""Tests for worker warm-up and the background refresher."""
+
+from __future__ import annotations
+
+import gc
+from types import SimpleNamespace
+
+from backend.core import warmup
+from backend.core.config import settings
+
+
+def test_warm_up_loads_available_structures_and_refresher_takes_over(monkeypatch) -> None:
+    monkeypatch.setattr(warmup, "_warm", {})
+    holder = SimpleNamespace(background_refresh=False, refreshes=0)
+
+    def refresh(loaded: SimpleNamespace) -> None:
+        loaded.refreshes += 1
+
+    timings = warmup.warm_up(
+        (
+            warmup.Structure("index", lambda: holder, refresh),
+            warmup.Structure("disabled", lambda: None, refresh),
+            warmup.Structure("units", lambda: 12),
+        )
+    )
+    assert set(timings) == {"index", "units"}
+
+    refresher = warmup.Refresher(tick_seconds=3600)
+    assert refresher.start()
+    assert holder.background_refresh is True
+    refresher.tick()
+    assert holder.refreshes == 1
+    refresher.stop()
+    assert holder.background_refresh is False
+
+
+def test_refresher_does_nothing_without_warm_up(monkeypatch) -> None:
+    monkeypatch.setattr(warmup, "_warm", {})
+
+    assert warmup.Refresher(tick_seconds=3600).start() is False
+
+
+def test_prepare_fork_freezes_the_heap(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "worker_gc_freeze", True)
+    try:
+        warmup.prepare_fork()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,140 @@
+"""Report what importing a module costs, from a fresh interpreter.
+
+Usage::
+
+    python -m backend.tools.import_report [backend.app.main] [--top 25] [--json] [--check]
+
+The wall time and module count come from a clean ``python -c "import ..."``;
+the per-module breakdown comes from a second run under ``-X importtime``
+(cumulative and self microseconds, indented by import depth). ``--check``
+exits 1 when the import exceeds the startup budget or loads a package the API
+must only load on first use (see ``DEFERRED``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+# Packages the API defers until a request needs them; workers import them eagerly.
+DEFERRED = ("alembic", "celery", "kombu", "sqlalchemy", "backend.workers")
+BUDGET_SECONDS = 2.5
+BUDGET_MODULES = 700
+
+_ROOT = Path(__file__).resolve().parents[2]
+_PROBE = (
+    "import json, sys, time\n"
+    "before = set(sys.modules)\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(json.dumps({{'seconds': elapsed, 'modules': sorted(set(sys.modules) - before)}}))\n"
+)
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class ImportReport:
+    module: str
+    seconds: float
+    modules: list[str]
+    records: list[ImportRecord] = field(default_factory=list)
+
+    def loaded(self, packages: tuple[str, ...] = DEFERRED) -> list[str]:
+        """Which of ``packages`` (or their submodules) the import pulled in."""
+
+        return [
+            package
+            for package in packages
+            if any(name == package or name.startswith(package + ".") for name in self.modules)
+        ]
+
+    def violations(self, *, seconds: float = BUDGET_SECONDS, modules: int = BUDGET_MODULES) -> list[str]:
+        problems = []
+        if self.seconds > seconds:
+            problems.append(f"import took {self.seconds:.2f} s (budget {seconds:.2f} s)")
+        if len(self.modules) > modules:
+            problems.append(f"import loaded {len(self.modules)} modules (budget {modules})")
+        problems.extend(f"import loaded deferred package {package}" for package in self.loaded())
+        return problems
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=_ROOT, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header row
+        stripped = name.lstrip(" ")
+        records.append(
+            ImportRecord(
+                name=stripped.strip(),
+                depth=(len(name) - len(stripped) - 1) // 2,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return records
+
+
+def measure(module: str = "backend.app.main", *, breakdown: bool = True) -> ImportReport:
+    """Import ``module`` in fresh interpreters and describe the cost."""
+
+    probe = json.loads(_run(["-c", _PROBE.format(module=module)]).stdout.strip().splitlines()[-1])
+    report = ImportReport(module=module, seconds=probe["seconds"], modules=probe["modules"])
+    if breakdown:
+        report.records = parse_importtime(_run(["-X", "importtime", "-c", f"import {module}"]).stderr)
+    return report
+
+
+def format_report(report: ImportReport, top: int) -> str:
+    lines = [
+        f"{report.module}: {report.seconds * 1000:.0f} ms, {len(report.modules)} modules",
+        f"deferred packages loaded: {', '.join(report.loaded()) or 'none'}",
+        "",
+        f"{'cumulative ms':>13} {'self ms':>8}  module",
+    ]
+    for record in sorted(report.records, key=lambda record: record.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"{record.cumulative_us / 1000:>13.1f} {record.self_us / 1000:>8.1f}  {'  ' * record.depth}{record.name}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="backend.app.main")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list, by cumulative time")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when the startup budget is exceeded")
+    args = parser.parse_args(argv)
+
+    report = measure(args.module)
+    print(json.dumps(asdict(report), indent=2) if args.json else format_report(report, args.top))
+    if args.check:
+        problems = report.violations()
+        for problem in problems:
+            print(f"BUDGET {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Bulk-load price observations from CSV or JSON-lines files.
+
+Usage::
+
+    python -m backend.tools.ingest_prices prices.csv [more.jsonl ...] [--batch-size N] [--no-refresh]
+
+CSV files need a header with ``store_external_id``, ``product_external_id`` and
+``list_price``; ``promo_price``, ``unit``, ``currency`` and ``observed_at`` are
+optional. ``-`` reads CSV from stdin. The ``latest_prices`` view is refreshed
+afterwards unless ``--no-refresh`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+from backend.core.config import settings
+from backend.core.ingestion import ingest_prices, read_records
+from backend.core.latest_prices import refresh_latest_prices
+
+
+def _records(paths: list[str]) -> Iterator[dict[str, Any]]:
+    for path in paths:
+        if path == "-":
+            yield from read_records(sys.stdin)
+            continue
+        fmt = "jsonl" if Path(path).suffix in {".jsonl", ".ndjson"} else "csv"
+        with open(path, newline="", encoding="utf-8") as stream:
+            yield from read_records(stream, fmt=fmt)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="CSV/JSONL files, or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=settings.ingestion_batch_size)
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many records")
+    parser.add_argument("--no-refresh", action="store_true", help="Skip refreshing latest_prices")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    records = _records(args.paths)
+    if args.limit is not None:
+        records = itertools.islice(records, args.limit)
+    report = ingest_prices(records, batch_size=args.batch_size)
+    if report.inserted and not args.no_refresh and settings.latest_prices_view_enabled:
+        refresh_latest_prices()
+    print(json.dumps(report.as_dict(), indent=2))
+    return 1 if report.received and report.rejected == report.received else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
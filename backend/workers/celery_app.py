@@ -1,34 +1,55 @@
 """Celery application factory configured for RabbitMQ."""
 
 from celery import Celery
-from kombu import Queue
+from celery.worker.control import inspect_command
 
 from backend.core.config import settings
+from backend.core.producer import configure_celery
 
 
-celery_app = Celery("savery")
+celery_app = configure_celery(Celery("savery"))
 celery_app.conf.update(
-    broker_url=settings.celery_broker_url,
-    result_backend=settings.celery_result_backend,
-    broker_connection_retry_on_startup=True,
-    task_default_queue="default",
-    task_queues=(
-        Queue("default"),
-        Queue("matching"),
-        Queue("scraping"),
-        Queue("optimization"),
-    ),
-    task_routes={
-        "workers.matching.*": {"queue": "matching"},
-        "workers.scraping.*": {"queue": "scraping"},
-        "workers.optimize.*": {"queue": "optimization"},
+    beat_schedule={
+        "purge-pipeline-blobs": {
+            "task": "workers.maintenance.purge_pipeline_blobs",
+            "schedule": 60 * 60,
+        },
+        "purge-jobs": {
+            "task": "workers.maintenance.purge_jobs",
+            "schedule": 60 * 60,
+        },
+        "maintain-price-partitions": {
+            "task": "workers.maintenance.maintain_price_partitions",
+            "schedule": 24 * 60 * 60,
+        },
+        "refresh-latest-prices": {
+            "task": "workers.maintenance.refresh_latest_prices",
+            "schedule": settings.latest_prices_refresh_seconds,
+        },
     },
 )
 celery_app.autodiscover_tasks(["backend.workers"])
 
+from backend.workers import signals  # noqa: E402,F401  (registers progress signal handlers)
+from backend.workers import metrics  # noqa: E402,F401  (registers task metric handlers and the exporter)
+from backend.workers import warmup  # noqa: E402,F401  (preloads lookup structures before the pool forks)
+
 
 @celery_app.task(name="workers.health.ping")
 def ping() -> str:
     """Simple task to verify the worker is alive."""
 
     return "pong"
+
+
+@inspect_command()
+def db_stats(state) -> dict:
+    """Remote-control command returning this worker's database instrumentation.
+
+    ``celery_app.control.broadcast("db_stats", reply=True)`` collects it from
+    every worker, which is how ``/api/diagnostics/db?workers=true`` works.
+    """
+
+    from backend.core.db_metrics import get_db_instrumentation
+
+    return get_db_instrumentation().snapshot()
@@ -0,0 +1,295 @@
+"""Celery task and queue metrics exported in the Prometheus text format.
+
+Signal handlers record, per task name and queue:
+
+* ``savery_task_queue_wait_seconds`` – publish (or ETA) to start, from a
+  timestamp header stamped by ``before_task_publish``,
+* ``savery_task_runtime_seconds`` – prerun to postrun, labelled by final state,
+* ``savery_task_payload_bytes`` – size of the serialized message body,
+* started/retried/failed counters and an in-progress gauge.
+
+The publish timestamp is stamped by ``core.producer`` on every publisher. In a
+worker, the parent process samples queue depth in the background
+(``core.queue_depth``) and serves ``/metrics`` on ``SAVERY_WORKER_METRICS_PORT``,
+merging the snapshots prefork children write to ``SAVERY_METRICS_DIR`` (see
+``core.metrics``). Each child rewrites its snapshot every
+``SAVERY_METRICS_FLUSH_SECONDS`` from a background thread, so running tasks
+(the in-progress gauge) and samples of an idle child are exported too.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from celery.signals import (
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_received,
+    task_retry,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
+
+from backend.core.config import settings
+from backend.core.metrics import CONTENT_TYPE, SnapshotCollector, get_metrics, write_snapshot
+from backend.core.producer import PUBLISHED_AT_HEADER
+from backend.core.queue_depth import QueueDepthSampler
+
+logger = logging.getLogger(__name__)
+
+_WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+_RUNTIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+_PAYLOAD_BUCKETS = tuple(float(1024 * 4**power) for power in range(9))  # 1 KiB .. 64 MiB
+
+_registry = get_metrics()
+QUEUE_WAIT = _registry.histogram(
+    "savery_task_queue_wait_seconds", "Time from publish (or ETA) until a worker started the task.", _WAIT_BUCKETS
+)
+RUNTIME = _registry.histogram("savery_task_runtime_seconds", "Task execution time by final state.", _RUNTIME_BUCKETS)
+PAYLOAD = _registry.histogram("savery_task_payload_bytes", "Serialized task message body size.", _PAYLOAD_BUCKETS)
+STARTED = _registry.counter("savery_tasks_started_total", "Tasks started by workers.")
+RETRIES = _registry.counter("savery_task_retries_total", "Task retries requested.")
+FAILURES = _registry.counter("savery_task_failures_total", "Tasks that raised, by exception type.")
+IN_PROGRESS = _registry.gauge("savery_tasks_in_progress", "Tasks currently executing.")
+
+_started: dict[str, tuple[float, str, str]] = {}
+_snapshot_dir: Path | None = None
+_in_child = False
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+_flusher_stop: threading.Event | None = None
+
+
+def _queue_of(request: Any) -> str:
+    delivery_info = getattr(request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or delivery_info.get("queue") or "unknown"
+
+
+def _eta_timestamp(eta: Any) -> float | None:
+    if not eta:
+        return None
+    if isinstance(eta, datetime):
+        return eta.timestamp()
+    try:
+        return datetime.fromisoformat(str(eta)).timestamp()
+    except ValueError:
+        return None
+
+
+@task_received.connect
+def _record_payload(request: Any = None, **_: Any) -> None:
+    if not settings.metrics_enabled or request is None:
+        return
+    body = getattr(request, "body", None)
+    if isinstance(body, (bytes, bytearray, str)):
+        PAYLOAD.observe(len(body), task=request.name, queue=_queue_of(request))
+
+
+@task_prerun.connect
+def _task_started(task_id: str, task: Any, **_: Any) -> None:
+    if not settings.metrics_enabled or task.request.is_eager:
+        return
+    queue = _queue_of(task.request)
+    now = time.time()
+    published = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published is not None:
+        ready_at = max(float(published), _eta_timestamp(task.request.eta) or 0.0)
+        # Clocks of the publishing host may be slightly ahead.
+        QUEUE_WAIT.observe(max(now - ready_at, 0.0), task=task.name, queue=queue)
+    STARTED.inc(task=task.name, queue=queue)
+    IN_PROGRESS.inc(task=task.name, queue=queue)
+    _started[task_id] = (time.perf_counter(), task.name, queue)
+    flush_snapshot()
+
+
+@task_postrun.connect
+def _task_finished(task_id: str, task: Any = None, state: str | None = None, **_: Any) -> None:
+    started = _started.pop(task_id, None)
+    if started is None:
+        return
+    began, name, queue = started
+    RUNTIME.observe(time.perf_counter() - began, task=name, queue=queue, state=state or "UNKNOWN")
+    IN_PROGRESS.dec(task=name, queue=queue)
+    flush_snapshot()
+
+
+@task_retry.connect
+def _task_retried(request: Any = None, sender: Any = None, **_: Any) -> None:
+    if settings.metrics_enabled and request is not None and not request.is_eager:
+        RETRIES.inc(task=getattr(sender, "name", request.task), queue=_queue_of(request))
+
+
+@task_failure.connect
+def _task_failed(sender: Any = None, exception: BaseException | None = None, **_: Any) -> None:
+    if not settings.metrics_enabled or sender is None or sender.request.is_eager:
+        return
+    FAILURES.inc(
+        task=sender.name,
+        queue=_queue_of(sender.request),
+        exception=type(exception).__name__ if exception is not None else "unknown",
+    )
+
+
+def flush_snapshot(force: bool = False) -> None:
+    """Write this worker child's metrics for the parent's exporter (rate-limited)."""
+
+    global _last_flush
+
+    if _snapshot_dir is None or not _in_child:
+        return
+    now = time.monotonic()
+    with _flush_lock:
+        if not force and now - _last_flush < settings.metrics_flush_seconds:
+            return
+        _last_flush = now
+    try:
+        write_snapshot(_snapshot_dir)
+    except OSError as exc:  # pragma: no cover - depends on the filesystem
+        logger.warning("Could not write metrics snapshot: %s", exc)
+
+
+def _flush_periodically(stop: threading.Event) -> None:
+    while not stop.wait(settings.metrics_flush_seconds):
+        flush_snapshot(force=True)
+
+
+def render_worker_metrics(collector: SnapshotCollector | None) -> str:
+    if collector is None:
+        return get_metrics().render()
+    return collector.collect(get_metrics()).render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    collector: SnapshotCollector | None = None
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_worker_metrics(self.collector).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server signature
+        logger.debug("metrics exporter: " + format, *args)
+
+
+class _WorkerExporter:
+    def __init__(self) -> None:
+        self.stop = threading.Event()
+        self.server: ThreadingHTTPServer | None = None
+
+    def start(self, app: Any) -> None:
+        threading.Thread(
+            target=QueueDepthSampler(app).run_forever,
+            args=(settings.metrics_queue_sample_seconds, self.stop),
+            name="savery-queue-depth",
+            daemon=True,
+        ).start()
+        if settings.worker_metrics_port is None:
+            return
+        handler = type(
+            "MetricsHandler",
+            (_MetricsHandler,),
+            {"collector": SnapshotCollector(_snapshot_dir) if _snapshot_dir else None},
+        )
+        try:
+            self.server = ThreadingHTTPServer(("0.0.0.0", settings.worker_metrics_port), handler)
+        except OSError as exc:
+            logger.warning("Metrics exporter not started on port %s: %s", settings.worker_metrics_port, exc)
+            return
+        threading.Thread(target=self.server.serve_forever, name="savery-metrics", daemon=True).start()
+        logger.info("Serving worker metrics on :%s/metrics", settings.worker_metrics_port)
+
+    def shutdown(self) -> None:
+        self.stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+_exporter: _WorkerExporter | None = None
+
+
+@worker_init.connect
+def _prepare_snapshot_dir(**_: Any) -> None:
+    """Give prefork children (which inherit this global) a fresh directory to write to."""
+
+    global _snapshot_dir
+
+    if not settings.metrics_enabled:
+        return
+    directory = Path(settings.metrics_dir or tempfile.gettempdir()) / f"savery-metrics-{os.getpid()}"
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True, exist_ok=True)
+    _snapshot_dir = directory
+
+
+@worker_process_init.connect
+def _child_started(**_: Any) -> None:
+    global _in_child
+
+    # Samples copied from the parent at fork would be double counted.
+    get_metrics().reset()
+    _in_child = True
+    _started.clear()
+    _start_flusher()
+
+
+def _start_flusher() -> None:
+    global _flusher_stop
+
+    if _snapshot_dir is None:
+        return
+    _flusher_stop = threading.Event()
+    threading.Thread(
+        target=_flush_periodically, args=(_flusher_stop,), name="savery-metrics-flush", daemon=True
+    ).start()
+
+
+@worker_process_shutdown.connect
+def _child_stopping(**_: Any) -> None:
+    global _flusher_stop
+
+    if _flusher_stop is not None:
+        _flusher_stop.set()
+        _flusher_stop = None
+    flush_snapshot(force=True)
+
+
+@worker_ready.connect
+def _start_exporter(sender: Any = None, **_: Any) -> None:
+    global _exporter
+
+    if not settings.metrics_enabled or _exporter is not None:
+        return
+    _exporter = _WorkerExporter()
+    _exporter.start(sender.app)
+
+
+@worker_shutdown.connect
+def _stop_exporter(**_: Any) -> None:
+    global _exporter, _snapshot_dir
+
+    if _exporter is not None:
+        _exporter.shutdown()
+        _exporter = None
+    if _snapshot_dir is not None:
+        shutil.rmtree(_snapshot_dir, ignore_errors=True)
+        _snapshot_dir = None
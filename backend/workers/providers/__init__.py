@@ -0,0 +1,63 @@
+"""External store providers used by the pricing stage."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from backend.core.config import settings
+
+from .base import OfferRequest, ProviderClient, ProviderError, RetryableProviderError
+from .kroger import KrogerProvider
+from .pool import ProviderPool
+from .ratelimit import DailyBudget, TokenBucket
+from .walmart import WalmartProvider
+
+
+def build_providers() -> list[ProviderClient]:
+    """Instantiate every provider whose credentials/endpoints are configured."""
+
+    providers: list[ProviderClient] = []
+    if settings.kroger_client_id and settings.kroger_client_secret:
+        providers.append(
+            KrogerProvider(
+                settings.kroger_api_base_url,
+                client_id=settings.kroger_client_id,
+                client_secret=settings.kroger_client_secret,
+                daily_budget=settings.kroger_daily_request_budget,
+            )
+        )
+    if settings.walmart_api_base_url:
+        providers.append(
+            WalmartProvider(settings.walmart_api_base_url, api_key=settings.walmart_api_key)
+        )
+    return providers
+
+
+@lru_cache
+def get_provider_pool() -> ProviderPool:
+    """Return the process-wide provider pool configured from settings."""
+
+    return ProviderPool(
+        build_providers(),
+        max_concurrency=settings.provider_max_concurrency,
+        max_connections=settings.provider_max_connections,
+        timeout=settings.provider_timeout_seconds,
+        max_retries=settings.provider_max_retries,
+        backoff=settings.provider_backoff_seconds,
+        rate_limits=settings.provider_rate_limits,
+    )
+
+
+__all__ = [
+    "DailyBudget",
+    "KrogerProvider",
+    "OfferRequest",
+    "ProviderClient",
+    "ProviderError",
+    "ProviderPool",
+    "RetryableProviderError",
+    "TokenBucket",
+    "WalmartProvider",
+    "build_providers",
+    "get_provider_pool",
+]
@@ -0,0 +1,106 @@
+"""Provider abstraction shared by the Kroger, Walmart, and future chain clients."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+from backend.core.price_cache import CachedPrice, PriceKey
+
+from .ratelimit import DailyBudget
+
+
+class ProviderError(RuntimeError):
+    """Raised when a provider response cannot be used."""
+
+
+class RetryableProviderError(ProviderError):
+    """Raised for transient failures (429/5xx) that are worth retrying."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class OfferRequest:
+    """Look up the price of ``query`` at ``store_id`` and store it under ``key``."""
+
+    key: PriceKey
+    query: str
+    store_id: str
+
+    @property
+    def location_id(self) -> str:
+        """Provider-side store identifier (the part after ``<provider>-``)."""
+
+        return self.store_id.split("-", 1)[1] if "-" in self.store_id else self.store_id
+
+
+class ProviderClient(ABC):
+    """HTTP-backed price source for one retail chain.
+
+    Subclasses describe how to build the request and parse the response; the
+    pool takes care of connection reuse, rate limiting, concurrency, and retries.
+    """
+
+    name: str = "provider"
+
+    def __init__(self, base_url: str, *, daily_budget: int | None = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.daily_budget = daily_budget
+        # Every request to the provider, token requests included, spends from it.
+        self.budget = DailyBudget(self.name, daily_budget) if daily_budget else None
+
+    async def prepare(self, client: httpx.AsyncClient) -> None:
+        """Hook for one-off setup such as fetching an OAuth token."""
+
+    @abstractmethod
+    def build_request(self, client: httpx.AsyncClient, request: OfferRequest) -> httpx.Request:
+        """Return the HTTP request that searches for ``request.query``."""
+
+    @abstractmethod
+    def parse_offer(self, request: OfferRequest, payload: Any) -> CachedPrice | None:
+        """Turn the decoded response into a cache entry, or ``None`` when nothing matched."""
+
+    async def fetch(self, client: httpx.AsyncClient, request: OfferRequest) -> CachedPrice | None:
+        await self.prepare(client)
+        response = await client.send(self.build_request(client, request))
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            raise RetryableProviderError(
+                f"{self.name} returned {response.status_code}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        if response.status_code >= 400:
+            raise ProviderError(f"{self.name} returned {response.status_code}")
+        return self.parse_offer(request, response.json())
+
+    def entry(
+        self,
+        request: OfferRequest,
+        *,
+        list_price: float | None,
+        promo_price: float | None = None,
+        unit: str | None = None,
+        product_name: str | None = None,
+        currency: str = "USD",
+    ) -> CachedPrice:
+        """Build a cache entry stamped with this provider and the current time."""
+
+        return CachedPrice(
+            product=request.key[0],
+            store_id=request.store_id,
+            price=promo_price if promo_price is not None else list_price,
+            list_price=list_price,
+            promo_price=promo_price,
+            currency=currency,
+            unit=unit,
+            provider=self.name,
+            observed_at=datetime.utcnow(),
+            product_name=product_name,
+        )
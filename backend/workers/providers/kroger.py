@@ -0,0 +1,88 @@
+"""Kroger public Products API client."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import httpx
+
+from backend.core.price_cache import CachedPrice
+
+from .base import OfferRequest, ProviderClient, ProviderError
+
+
+class KrogerProvider(ProviderClient):
+    """Search Kroger products at a location and price the first result.
+
+    Authentication uses the OAuth2 client-credentials flow; the token is cached
+    until shortly before it expires.
+    """
+
+    name = "kroger"
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        client_id: str,
+        client_secret: str,
+        daily_budget: int | None = None,
+    ) -> None:
+        super().__init__(base_url, daily_budget=daily_budget)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._token: str | None = None
+        self._token_expires = 0.0
+        self._token_lock: asyncio.Lock | None = None
+
+    async def prepare(self, client: httpx.AsyncClient) -> None:
+        if self._token and time.monotonic() < self._token_expires:
+            return
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires:
+                return
+            if self.budget is not None and not await self.budget.acquire():
+                raise ProviderError("kroger daily request budget spent")
+            response = await client.post(
+                f"{self.base_url}/connect/oauth2/token",
+                data={"grant_type": "client_credentials", "scope": "product.compact"},
+                auth=(self.client_id, self.client_secret),
+            )
+            if response.status_code != 200:
+                raise ProviderError(f"kroger token request failed with {response.status_code}")
+            payload = response.json()
+            self._token = payload["access_token"]
+            self._token_expires = time.monotonic() + float(payload.get("expires_in", 1800)) - 60
+
+    def build_request(self, client: httpx.AsyncClient, request: OfferRequest) -> httpx.Request:
+        return client.build_request(
+            "GET",
+            f"{self.base_url}/products",
+            params={
+                "filter.term": request.query,
+                "filter.locationId": request.location_id,
+                "filter.limit": 1,
+            },
+            headers={"Authorization": f"Bearer {self._token}", "Accept": "application/json"},
+        )
+
+    def parse_offer(self, request: OfferRequest, payload: Any) -> CachedPrice | None:
+        for product in payload.get("data", []):
+            for item in product.get("items", []):
+                price = item.get("price") or {}
+                regular = price.get("regular")
+                if regular is None:
+                    continue
+                promo = price.get("promo") or None
+                return self.entry(
+                    request,
+                    list_price=float(regular),
+                    promo_price=float(promo) if promo else None,
+                    unit=item.get("size"),
+                    product_name=product.get("description"),
+                )
+        return None
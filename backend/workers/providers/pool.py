@@ -0,0 +1,193 @@
+"""Concurrent provider client pool used by the pricing stage.
+
+Each provider gets its own keep-alive ``httpx.AsyncClient``, a token-bucket rate
+limiter and/or a daily quota counter, and a semaphore bounding in-flight requests. All clients live on one
+event loop running in a daemon thread, so connections are reused across Celery
+tasks in the same worker process. Synchronous callers submit work with
+:meth:`ProviderPool.fetch_many`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import random
+import threading
+from typing import Iterable
+
+import httpx
+
+from backend.core.price_cache import CachedPrice
+
+from .base import OfferRequest, ProviderClient, ProviderError, RetryableProviderError
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class _ProviderSlot:
+    """Per-provider resources bound to the pool's event loop."""
+
+    def __init__(
+        self,
+        provider: ProviderClient,
+        *,
+        max_concurrency: int,
+        max_connections: int,
+        timeout: float,
+        rate_per_second: float | None,
+    ) -> None:
+        self.provider = provider
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = (
+            TokenBucket(rate_per_second, max(1.0, rate_per_second)) if rate_per_second is not None else None
+        )
+
+
+class ProviderPool:
+    """Fan offer lookups out to providers concurrently with bounded resources."""
+
+    def __init__(
+        self,
+        providers: Iterable[ProviderClient],
+        *,
+        max_concurrency: int = 8,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        rate_limits: dict[str, float] | None = None,
+    ) -> None:
+        self.providers = {provider.name: provider for provider in providers}
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limits = dict(rate_limits or {})
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: dict[str, _ProviderSlot] = {}
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def supports(self, provider_name: str) -> bool:
+        return provider_name in self.providers
+
+    def fetch_many(
+        self,
+        requests: dict[str, list[OfferRequest]],
+        *,
+        timeout: float | None = None,
+    ) -> list[CachedPrice]:
+        """Run every lookup concurrently and return the offers that resolved.
+
+        ``requests`` maps provider name to its lookups. Wall time is roughly that of
+        the slowest request rather than the sum of all of them. Lookups still
+        running after ``timeout`` seconds are cancelled and the offers resolved
+        by then are returned.
+        """
+
+        if not any(requests.values()):
+            return []
+        loop = self._ensure_loop()
+        resolved: list[CachedPrice] = []
+        future = asyncio.run_coroutine_threadsafe(self._gather(requests, resolved), loop)
+        try:
+            future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            total = sum(len(batch) for batch in requests.values())
+            logger.warning(
+                "Provider batch timed out after %.1f s; %d of %d lookups resolved", timeout, len(resolved), total
+            )
+        # The loop thread may still append while cancelling; hand back a snapshot.
+        return list(resolved)
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+            slots, self._slots = self._slots, {}
+        if loop is None:
+            return
+
+        async def _close() -> None:
+            for slot in slots.values():
+                await slot.client.aclose()
+
+        asyncio.run_coroutine_threadsafe(_close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked worker child inherits the object but not the loop thread.
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="provider-pool", daemon=True
+            )
+            thread.start()
+            self._loop, self._pid, self._slots = loop, os.getpid(), {}
+            return loop
+
+    def _slot(self, name: str) -> _ProviderSlot:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = _ProviderSlot(
+                self.providers[name],
+                max_concurrency=self.max_concurrency,
+                max_connections=self.max_connections,
+                timeout=self.timeout,
+                rate_per_second=self.rate_limits.get(name),
+            )
+            self._slots[name] = slot
+        return slot
+
+    async def _gather(self, requests: dict[str, list[OfferRequest]], resolved: list[CachedPrice]) -> None:
+        """Run the lookups, appending each offer to ``resolved`` as soon as it arrives."""
+
+        async def _collect(slot: _ProviderSlot, request: OfferRequest) -> None:
+            entry = await self._fetch_one(slot, request)
+            if entry is not None:
+                resolved.append(entry)
+
+        await asyncio.gather(
+            *(
+                _collect(self._slot(name), request)
+                for name, batch in requests.items()
+                if name in self.providers
+                for request in batch
+            )
+        )
+
+    async def _fetch_one(self, slot: _ProviderSlot, request: OfferRequest) -> CachedPrice | None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with slot.semaphore:
+                    if slot.provider.budget is not None and not await slot.provider.budget.acquire():
+                        logger.warning("%s daily request budget spent; skipping %r", slot.provider.name, request.query)
+                        return None
+                    if slot.bucket is not None:
+                        await slot.bucket.acquire()
+                    return await slot.provider.fetch(slot.client, request)
+            except (RetryableProviderError, httpx.TransportError) as exc:
+                if attempt >= self.max_retries:
+                    logger.warning("%s lookup for %r failed: %s", slot.provider.name, request.query, exc)
+                    return None
+                retry_after = getattr(exc, "retry_after", None)
+                # Exponential backoff with full jitter, unless the server told us when.
+                delay = retry_after or random.uniform(0, self.backoff * 2**attempt)
+                await asyncio.sleep(delay)
+            except (ProviderError, ValueError) as exc:
+                logger.warning("%s lookup for %r failed: %s", slot.provider.name, request.query, exc)
+                return None
+        return None
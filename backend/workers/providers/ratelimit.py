@@ -0,0 +1,136 @@
+"""Per-provider request limits: an asyncio token bucket and a daily quota counter."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timezone
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second up to ``capacity``.
+
+    ``acquire`` waits until a token is available, so callers are smoothed to the
+    configured rate while still allowing short bursts up to ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def reserve_requests(provider: str, day: date, requests: int, budget: int) -> bool:
+    """Atomically add ``requests`` to ``provider``'s count for ``day`` unless that exceeds ``budget``."""
+
+    from sqlalchemy.dialects.postgresql import insert
+
+    from backend.core.db import session_scope
+    from backend.core.schema import ProviderRequestCount
+
+    if requests > budget:
+        return False
+    table = ProviderRequestCount.__table__
+    statement = insert(table).values(provider=provider, day=day, used=requests)
+    statement = statement.on_conflict_do_update(
+        index_elements=["provider", "day"],
+        set_={"used": table.c.used + requests},
+        where=table.c.used + requests <= budget,
+    ).returning(table.c.used)
+    with session_scope() as session:
+        return session.execute(statement).first() is not None
+
+
+class DailyBudget:
+    """A provider's daily request quota (such as Kroger's 10k calls/day), shared by
+    every worker process and host.
+
+    Spent requests are counted in ``provider_request_counts`` per provider and UTC
+    day, incremented atomically. To keep a database round trip off each request, a
+    process reserves ``reserve`` requests at a time and spends them locally;
+    requests reserved but not sent by the end of the day (or by exit) are lost,
+    which errs on the side of the quota. Requests are not paced within the day.
+    Without a database the quota is counted per process.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        budget: int,
+        *,
+        reserve: int = 20,
+        store: Callable[[str, date, int, int], bool] = reserve_requests,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError("budget must be positive")
+        self.provider = provider
+        self.budget = budget
+        self.reserve = max(1, min(reserve, budget))
+        self.store = store
+        self._pid: int | None = None
+
+    def _reset(self) -> None:
+        # A forked child must not spend the reservation it inherited from its parent.
+        self._pid = os.getpid()
+        self._lock = asyncio.Lock()
+        self._day: date | None = None
+        self._reserved = 0
+        self._local_used = 0
+
+    def _reserve(self, day: date, requests: int) -> int:
+        """Reserve up to ``self.reserve`` (at least ``requests``) requests; return how many."""
+
+        try:
+            for size in dict.fromkeys((max(self.reserve, requests), requests)):
+                if self.store(self.provider, day, size, self.budget):
+                    return size
+            return 0
+        except Exception as exc:  # pragma: no cover - depends on database availability
+            logger.warning("Shared %s request budget unavailable, counting per process: %s", self.provider, exc)
+            if self._local_used + requests > self.budget:
+                return 0
+            self._local_used += requests
+            return requests
+
+    async def acquire(self, requests: int = 1) -> bool:
+        """Spend ``requests`` from today's quota; ``False`` (spending nothing) when it is used up."""
+
+        if self._pid != os.getpid():
+            self._reset()
+        async with self._lock:
+            today = _utc_today()
+            if self._day != today:
+                self._day, self._reserved, self._local_used = today, 0, 0
+            if self._reserved < requests:
+                self._reserved += await asyncio.to_thread(self._reserve, today, requests - self._reserved)
+                if self._reserved < requests:
+                    return False
+            self._reserved -= requests
+            return True
@@ -0,0 +1,55 @@
+"""Walmart search client."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+from backend.core.price_cache import CachedPrice
+
+from .base import OfferRequest, ProviderClient
+
+
+class WalmartProvider(ProviderClient):
+    """Query a Walmart search endpoint and price the first in-stock item.
+
+    Walmart has no public price API, so ``base_url`` points at whichever search
+    service we use (affiliate API or an internal scraper). Both expose
+    ``GET /search?query=&storeId=`` returning ``{"items": [{"name", "salePrice",
+    "msrp", "size"}]}``.
+    """
+
+    name = "walmart"
+
+    def __init__(self, base_url: str, *, api_key: str | None = None, daily_budget: int | None = None) -> None:
+        super().__init__(base_url, daily_budget=daily_budget)
+        self.api_key = api_key
+
+    def build_request(self, client: httpx.AsyncClient, request: OfferRequest) -> httpx.Request:
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["X-Api-Key"] = self.api_key
+        return client.build_request(
+            "GET",
+            f"{self.base_url}/search",
+            params={"query": request.query, "storeId": request.location_id},
+            headers=headers,
+        )
+
+    def parse_offer(self, request: OfferRequest, payload: Any) -> CachedPrice | None:
+        for item in payload.get("items", []):
+            sale = item.get("salePrice")
+            msrp = item.get("msrp")
+            if sale is None and msrp is None:
+                continue
+            list_price = float(msrp if msrp is not None else sale)
+            promo_price = float(sale) if sale is not None and msrp is not None and sale < msrp else None
+            return self.entry(
+                request,
+                list_price=list_price,
+                promo_price=promo_price,
+                unit=item.get("size"),
+                product_name=item.get("name"),
+            )
+        return None
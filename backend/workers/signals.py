@@ -0,0 +1,78 @@
+"""Celery signal handlers that publish pipeline progress and persist job state."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+from celery import states
+from celery.signals import task_postrun, task_prerun
+
+from backend.core import claim_check, job_store, progress
+from backend.core.config import settings
+from backend.core.tasks import BATCH_FAN_OUT_TASK
+
+_PIPELINE_TASKS = {
+    settings.celery_matching_task,
+    settings.celery_pricing_task,
+    settings.celery_route_task,
+    BATCH_FAN_OUT_TASK,
+}
+_timer = progress.StageTimer()
+
+
+def _tracked(task: Any) -> bool:
+    return getattr(task, "name", None) in _PIPELINE_TASKS
+
+
+def _fan_out(task: Any) -> bool:
+    return task.name == BATCH_FAN_OUT_TASK
+
+
+def _job_ids(task: Any, event: progress.ProgressEvent) -> list[str]:
+    """Jobs ``event`` belongs to: a shared batch stage works for all of its member jobs."""
+
+    members = getattr(task.request, progress.JOB_IDS_HEADER, None)
+    return list(members) if members else [event.job_id]
+
+
+def _publish(events: list[progress.ProgressEvent]) -> None:
+    if settings.progress_events_enabled:
+        for event in events:
+            progress.publish(event)
+
+
+@task_prerun.connect
+def _stage_started(task_id: str, task: Any, **_: Any) -> None:
+    if not _tracked(task):
+        return
+    event = _timer.started(task_id)
+    if _fan_out(task):
+        return  # Member jobs report routing from their own plan_route tasks.
+    job_ids = _job_ids(task, event)
+    if settings.job_store_enabled:
+        job_store.update_jobs(job_ids, job_store.RUNNING, stage=event.stage)
+    _publish([replace(event, job_id=job_id) for job_id in job_ids])
+
+
+@task_postrun.connect
+def _stage_finished(task_id: str, task: Any, retval: Any = None, state: str | None = None, **_: Any) -> None:
+    if not _tracked(task) or state == states.RETRY:
+        return
+    error = repr(retval) if state == states.FAILURE else None
+    event = _timer.finished(task_id, error=error)
+    if _fan_out(task) and not error:
+        return
+    job_ids = _job_ids(task, event)
+    # Persist before notifying so a stream reacting to the event finds the result.
+    if settings.job_store_enabled and event.final:
+        if error:
+            job_store.update_jobs(job_ids, job_store.FAILED, stage=event.stage, error=error)
+        else:
+            job_store.update_job(
+                event.job_id,
+                job_store.SUCCEEDED,
+                stage=event.stage,
+                result=claim_check.resolve(retval),
+            )
+    _publish([replace(event, job_id=job_id) for job_id in job_ids])
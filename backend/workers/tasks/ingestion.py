@@ -0,0 +1,29 @@
+"""Bulk price ingestion tasks."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from celery import shared_task
+
+from backend.core import claim_check
+from backend.core.config import settings
+from backend.core.ingestion import ingest_prices as ingest_price_records
+from backend.workers.tasks.maintenance import refresh_latest_prices
+
+
+@shared_task(name="workers.scraping.ingest_prices")
+def ingest_prices(records: list[dict[str, Any]] | dict[str, Any]) -> dict[str, Any]:
+    """COPY a batch of scraped offers into ``prices`` and return the ingestion report.
+
+    ``records`` may be a claim-check reference, so schedulers can hand over large
+    batches without pushing them through the broker. When rows were inserted, a
+    ``latest_prices`` refresh is queued.
+    """
+
+    report = ingest_price_records(
+        claim_check.resolve(records), batch_size=settings.ingestion_batch_size
+    )
+    if report.inserted and settings.latest_prices_view_enabled:
+        refresh_latest_prices.delay()
+    return report.as_dict()
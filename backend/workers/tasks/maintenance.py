@@ -0,0 +1,57 @@
+"""Periodic housekeeping tasks."""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+
+from backend.core import claim_check, job_store, price_history
+from backend.core.config import settings
+from backend.core.latest_prices import refresh_latest_prices as refresh_view
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="workers.maintenance.purge_pipeline_blobs")
+def purge_pipeline_blobs() -> int:
+    """Delete claim-check payloads older than the retention window."""
+
+    removed = claim_check.purge(timedelta(seconds=settings.claim_check_retention_seconds))
+    logger.info("Purged %d pipeline blobs", removed)
+    return removed
+
+
+@shared_task(name="workers.maintenance.purge_jobs")
+def purge_jobs() -> int:
+    """Delete optimization job records older than the retention window."""
+
+    removed = job_store.purge_jobs(timedelta(seconds=settings.job_retention_seconds))
+    logger.info("Purged %d optimization jobs", removed)
+    return removed
+
+
+@shared_task(name="workers.maintenance.maintain_price_partitions")
+def maintain_price_partitions() -> dict:
+    """Create upcoming ``prices`` partitions, roll up recent days and retire expired months."""
+
+    return price_history.maintain_partitions().as_dict()
+
+
+@shared_task(
+    bind=True,
+    name="workers.maintenance.refresh_latest_prices",
+    max_retries=5,
+    ignore_result=True,
+)
+def refresh_latest_prices(self) -> bool:
+    """Refresh the ``latest_prices`` view, retrying later if a refresh is already running.
+
+    Retrying (rather than skipping) guarantees rows committed during the running
+    refresh are picked up by the next one.
+    """
+
+    if not refresh_view():
+        raise self.retry(countdown=30)
+    return True
@@ -4,37 +4,108 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 from celery import shared_task
 
+from backend.core import claim_check
+from backend.core.config import settings
+from backend.core.matching import ProductMatch, get_catalog_index, get_embedding_catalog
+
+
+def _candidate(store_id: str, match: ProductMatch | None) -> dict[str, Any]:
+    if match is None:
+        return {
+            "store_id": store_id,
+            "confidence": 0.0,
+            "product_id": None,
+            "product_name": None,
+            "notes": "No catalog product matched this item.",
+        }
+    return {
+        "store_id": store_id,
+        "confidence": round(match.score, 4),
+        "product_id": str(match.product_id),
+        "product_name": match.name,
+        "notes": None,
+    }
+
+
+def _similar_products(best_ids: list[int | None]) -> list[list[dict[str, Any]]]:
+    """Embedding neighbours of each item's best product, searched in one batch."""
+
+    similar: list[list[dict[str, Any]]] = [[] for _ in best_ids]
+    catalog = get_embedding_catalog()
+    if catalog is None:
+        return similar
+    vectors = catalog.index.vectors_for(pid for pid in best_ids if pid is not None)
+    positions = [i for i, pid in enumerate(best_ids) if pid in vectors]
+    if not positions:
+        return similar
+
+    queries = np.stack([vectors[best_ids[i]] for i in positions])
+    ids, scores = catalog.index.search(queries, k=settings.matching_similar_k + 1)
+    for position, row_ids, row_scores in zip(positions, ids, scores):
+        similar[position] = [
+            {"product_id": str(pid), "similarity": round(float(score), 4)}
+            for pid, score in zip(row_ids, row_scores)
+            if pid >= 0 and pid != best_ids[position]
+        ][: settings.matching_similar_k]
+    return similar
+
 
 @shared_task(name="workers.matching.match_items")
 def match_items(payload: dict[str, Any]) -> dict[str, Any]:
-    """Map free-form shopping list items to canonical product candidates."""
+    """Map free-form shopping list items to canonical product candidates.
 
+    All items are scored against the in-memory catalog index in one batch; the
+    best match above ``matching_min_confidence`` becomes each store's candidate.
+    When an embedding index is configured, semantically similar products of the
+    best match are listed under ``similar`` as substitution options.
+    """
+
+    payload = claim_check.resolve(payload)
     items: list[dict[str, Any]] = payload.get("items", [])
     store_ids: list[str] = payload.get("store_ids", [])
 
+    normalized = [" ".join(item.get("name", "").split()).lower() for item in items]
+    catalog = get_catalog_index()
+    if catalog is not None and items:
+        ranked = catalog.index.search_many(normalized, k=settings.matching_top_k)
+    else:
+        ranked = [[] for _ in items]
+
+    best_matches = [
+        matches[0] if matches and matches[0].score >= settings.matching_min_confidence else None
+        for matches in ranked
+    ]
+    similar = _similar_products([best.product_id if best else None for best in best_matches])
+
     matched: list[dict[str, Any]] = []
-    for item in items:
-        normalized_name = item.get("name", "").strip()
+    # Batch payloads restrict each item to the stores of the lists that contain it.
+    item_store_ids: list[list[str]] = payload.get("item_store_ids") or [store_ids] * len(items)
+    for item, normalized_name, matches, best, neighbours, item_stores in zip(
+        items, normalized, ranked, best_matches, similar, item_store_ids
+    ):
         matched.append(
             {
                 "list_item": item,
-                "normalized_name": normalized_name.lower(),
-                "candidates": [
+                "normalized_name": normalized_name,
+                "candidates": [_candidate(store_id, best) for store_id in item_stores],
+                "alternatives": [
                     {
-                        "store_id": store_id,
-                        "confidence": 0.0,
-                        "product_id": None,
-                        "product_name": None,
-                        "notes": "Matching logic not yet implemented.",
+                        "product_id": str(match.product_id),
+                        "product_name": match.name,
+                        "confidence": round(match.score, 4),
                     }
-                    for store_id in store_ids
+                    for match in matches
                 ],
+                "similar": neighbours,
             }
         )
 
-    return {
-        "request": payload,
-        "matched_items": matched,
-    }
+    return claim_check.put(
+        {
+            "request": payload,
+            "matched_items": matched,
+        }
+    )
@@ -2,39 +2,323 @@
 
 from __future__ import annotations
 
+import logging
 from typing import Any
 
-from celery import shared_task
+import numpy as np
+from celery import group, shared_task
+
+from backend.core import batch, claim_check, result_cache, units
+from backend.core.config import settings
+from backend.core.db import session_scope
+from backend.core.geo import haversine_matrix
+from backend.core.optimization import AssignmentProblem, order_stops, solve_assignment
+from backend.core.producer import BACKGROUND, lane_options
+
+logger = logging.getLogger(__name__)
+
+
+def _load_store_locations(store_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Return name and coordinates for each known store keyed by external ID."""
+
+    if not store_ids:
+        return {}
+
+    try:
+        from backend.core.schema import Store
+
+        with session_scope() as session:
+            rows = (
+                session.query(Store.external_id, Store.name, Store.latitude, Store.longitude)
+                .filter(Store.external_id.in_(store_ids))
+                .all()
+            )
+    except Exception as exc:  # pragma: no cover - depends on database availability
+        logger.warning("Store locations unavailable, routing without distances: %s", exc)
+        return {}
+
+    return {
+        external_id: {"name": name, "latitude": latitude, "longitude": longitude}
+        for external_id, name, latitude, longitude in rows
+    }
+
+
+def _origin_distances(
+    request: dict[str, Any],
+    store_ids: list[str],
+    locations: dict[str, dict[str, Any]],
+) -> np.ndarray:
+    """Distance from the user to each store, ``nan`` when either point is unknown."""
+
+    latitude, longitude = request.get("latitude"), request.get("longitude")
+    distances = np.full(len(store_ids), np.nan)
+    if latitude is None or longitude is None:
+        return distances
+
+    known = [
+        index
+        for index, store_id in enumerate(store_ids)
+        if locations.get(store_id, {}).get("latitude") is not None
+        and locations[store_id].get("longitude") is not None
+    ]
+    if known:
+        distances[known] = haversine_matrix(
+            np.array([latitude]),
+            np.array([longitude]),
+            np.array([locations[store_ids[i]]["latitude"] for i in known]),
+            np.array([locations[store_ids[i]]["longitude"] for i in known]),
+        )[0]
+    return distances
+
+
+def _travel_penalties(origin_distances: np.ndarray) -> np.ndarray:
+    """Per-store visit penalty: a fixed stop cost plus an out-and-back drive."""
+
+    round_trip = np.nan_to_num(origin_distances, nan=0.0) * 2.0
+    return settings.optimizer_store_visit_cost + settings.optimizer_travel_cost_per_km * round_trip
+
+
+def _order_route(
+    request: dict[str, Any],
+    store_ids: list[str],
+    locations: dict[str, dict[str, Any]],
+) -> tuple[list[str], dict[str, float], float | None, dict[str, Any]]:
+    """Order ``store_ids`` into a tour and return per-leg distances in km.
+
+    Stores without coordinates are visited last and get no leg distance. Without a
+    user location the tour is an open path between the stores themselves.
+    """
+
+    located = [
+        store_id
+        for store_id in store_ids
+        if locations.get(store_id, {}).get("latitude") is not None
+        and locations[store_id].get("longitude") is not None
+    ]
+    unlocated = [store_id for store_id in store_ids if store_id not in located]
+    if not located:
+        return store_ids, {}, None, {"method": "none"}
+
+    latitudes = np.array([locations[s]["latitude"] for s in located])
+    longitudes = np.array([locations[s]["longitude"] for s in located])
+    has_origin = request.get("latitude") is not None and request.get("longitude") is not None
+
+    if has_origin:
+        latitudes = np.concatenate(([request["latitude"]], latitudes))
+        longitudes = np.concatenate(([request["longitude"]], longitudes))
+        distances = haversine_matrix(latitudes, longitudes)
+    else:
+        # A zero-cost virtual origin lets the solver pick the best first stop.
+        distances = np.zeros((len(located) + 1, len(located) + 1))
+        distances[1:, 1:] = haversine_matrix(latitudes, longitudes)
+
+    route = order_stops(
+        distances,
+        return_to_origin=has_origin and settings.routing_return_to_origin,
+        exact_stop_limit=settings.routing_exact_stop_limit,
+        deadline_seconds=settings.routing_deadline_seconds,
+    )
+
+    ordered = [located[node - 1] for node in route.order]
+    legs = dict(zip(ordered, route.legs))
+    if not has_origin:
+        # The first "leg" comes from the virtual origin and is always zero.
+        legs[ordered[0]] = 0.0
+
+    info = {"method": route.method, "optimal": route.optimal, "return_leg_km": route.return_leg}
+    return ordered + unlocated, legs, route.total_distance, info
+
+
+def _item_quantity(list_item: dict[str, Any]) -> float:
+    quantity = list_item.get("quantity")
+    if quantity is None or quantity <= 0:
+        return 1.0
+    return float(quantity)
+
+
+def _build_cost_matrix(
+    priced_items: list[dict[str, Any]],
+    store_ids: list[str],
+) -> tuple[np.ndarray, list[dict[int, dict[str, Any]]]]:
+    """Return an ``items x stores`` cost matrix and the offer chosen per cell.
+
+    A cell costs the number of packages needed times the package price. When the
+    list item's unit and the offer's package size share a dimension (``2 lb``
+    against a ``16 oz`` pack) that is enough packages to cover the amount;
+    otherwise it is the requested quantity. Cells without a usable price are
+    ``np.inf``. When a store has several offers for the same item, the cheapest
+    one wins.
+    """
+
+    column = {store_id: index for index, store_id in enumerate(store_ids)}
+    costs = np.full((len(priced_items), len(store_ids)), np.inf)
+    chosen: list[dict[int, dict[str, Any]]] = [{} for _ in priced_items]
+
+    flat: list[dict[str, Any]] = []
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, item in enumerate(priced_items):
+        for offer in item.get("offers", []):
+            col = column.get(offer.get("store_id"))
+            if col is not None and offer.get("price") is not None:
+                flat.append(offer)
+                rows.append(row)
+                cols.append(col)
+    if not flat:
+        return costs, chosen
+
+    requested = [
+        (
+            units.requested_measure(item.get("list_item", {}).get("quantity"), item.get("list_item", {}).get("unit")),
+            _item_quantity(item.get("list_item", {})),
+        )
+        for item in priced_items
+    ]
+    requested_dimension = np.array([m.dimension if m else units.UNKNOWN for m, _ in requested], dtype=np.int8)
+    requested_amount = np.array([m.amount if m else np.nan for m, _ in requested])
+    requested_count = np.array([count for _, count in requested])
+
+    row_index = np.asarray(rows)
+    col_index = np.asarray(cols)
+    normalized = units.normalize_offers(flat)
+    packages = units.packages_needed(
+        requested_dimension[row_index],
+        requested_amount[row_index],
+        requested_count[row_index],
+        normalized.dimension,
+        normalized.amount,
+    )
+    offer_costs = normalized.price * packages
+
+    # Cheapest offer per (item, store) cell: sort by cell then cost, keep the first.
+    order = np.lexsort((offer_costs, col_index, row_index))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (row_index[order][1:] != row_index[order][:-1]) | (col_index[order][1:] != col_index[order][:-1])
+    candidates: dict[int, dict[str, dict[str, Any]]] = {}
+    for index in order[first]:
+        row, col = int(row_index[index]), int(col_index[index])
+        if not np.isfinite(offer_costs[index]):
+            continue
+        costs[row, col] = offer_costs[index]
+        if row not in candidates:
+            candidates[row] = {c.get("store_id"): c for c in priced_items[row].get("candidates", [])}
+        offer = flat[index]
+        chosen[row][col] = {
+            **candidates[row].get(offer["store_id"], {}),
+            **offer,
+            "packages": int(packages[index]),
+            "unit_price": float(normalized.unit_price[index]) if np.isfinite(normalized.unit_price[index]) else None,
+            "unit_basis": normalized.basis(int(index)),
+        }
+
+    return costs, chosen
+
+
+def _purchased_item(item: dict[str, Any], offer: dict[str, Any]) -> dict[str, Any]:
+    list_item = item.get("list_item", {})
+    return {
+        "list_item": list_item,
+        "product_id": offer.get("product_id"),
+        "product_name": offer.get("product_name"),
+        "price": offer.get("price"),
+        "currency": offer.get("currency", "USD"),
+        "quantity": list_item.get("quantity"),
+        "unit": offer.get("unit") or list_item.get("unit"),
+        "packages": offer.get("packages"),
+        "unit_price": offer.get("unit_price"),
+        "unit_basis": offer.get("unit_basis"),
+    }
 
 
 @shared_task(name="workers.optimize.plan_route")
 def plan_route(priced_payload: dict[str, Any]) -> dict[str, Any]:
     """Compute a shopping plan given normalized items and pricing data."""
 
+    priced_payload = claim_check.resolve(priced_payload)
     request = priced_payload.get("request", {})
     store_ids: list[str] = request.get("store_ids", [])
+    priced_items: list[dict[str, Any]] = priced_payload.get("priced_items", [])
+    preferences = request.get("preferences") or {}
+
+    locations = _load_store_locations(store_ids)
+    costs, offers = _build_cost_matrix(priced_items, store_ids)
+    problem = AssignmentProblem(
+        costs=costs,
+        travel=_travel_penalties(_origin_distances(request, store_ids, locations)),
+        cost_priority=preferences.get("cost_priority", 0.5),
+        max_stores=preferences.get("max_stores"),
+    )
+    plan = solve_assignment(
+        problem,
+        deadline_seconds=settings.optimizer_deadline_seconds,
+        exact_store_limit=settings.optimizer_exact_store_limit,
+    )
+
+    assignments: dict[int, list[dict[str, Any]]] = {index: [] for index in plan.stores}
+    for row, store_index in enumerate(plan.item_store):
+        if store_index >= 0:
+            assignments[int(store_index)].append(
+                _purchased_item(priced_items[row], offers[row][int(store_index)])
+            )
+
+    chosen_ids = [store_ids[index] for index in plan.stores]
+    ordered_ids, legs, total_distance, route_info = _order_route(request, chosen_ids, locations)
+    speed = settings.routing_average_speed_kmh
 
     stores: list[dict[str, Any]] = []
-    for store_id in store_ids:
+    for store_id in ordered_ids:
+        leg = legs.get(store_id)
         stores.append(
             {
                 "store_id": store_id,
-                "store_name": store_id.replace("-", " ").title(),
-                "distance_km": None,
-                "estimated_duration_minutes": None,
-                "items": [],
+                "store_name": locations.get(store_id, {}).get("name")
+                or store_id.replace("-", " ").title(),
+                "distance_km": round(leg, 3) if leg is not None else None,
+                "estimated_duration_minutes": round(leg / speed * 60.0, 1)
+                if leg is not None and speed > 0
+                else None,
+                "items": assignments[store_ids.index(store_id)],
             }
         )
 
-    return {
+    output = {
         "request": request,
         "matched_items": priced_payload.get("matched_items", []),
-        "priced_items": priced_payload.get("priced_items", []),
+        "priced_items": priced_items,
         "result": {
             "stores": stores,
-            "total_cost": None,
-            "total_distance_km": None,
+            "total_cost": round(plan.item_cost, 2) if plan.stores else None,
+            "total_distance_km": round(total_distance, 3) if total_distance is not None else None,
             "currency": "USD",
-            "notes": "Optimization algorithm placeholder.",
+            "unmatched_items": [
+                priced_items[row].get("list_item", {}) for row in plan.missing_items
+            ],
+            "solver": {
+                "method": plan.method,
+                "optimal": plan.optimal,
+                "timed_out": plan.timed_out,
+                "objective": plan.objective,
+                "routing": route_info,
+            },
         },
     }
+    result_cache.store(request, output)
+    return claim_check.put(output)
+
+
+@shared_task(name="workers.optimize.fan_out_batch")
+def fan_out_batch(priced_union: dict[str, Any], batch_plan: dict[str, Any]) -> dict[str, Any]:
+    """Split a batch's shared pricing result and route every list in parallel.
+
+    Each list gets its own ``plan_route`` task, in the background lane, whose id
+    is the job id handed out by ``POST /api/optimize/batch``.
+    """
+
+    priced_union = claim_check.resolve(priced_union)
+    batch_plan = claim_check.resolve(batch_plan)
+    payloads = batch.split_priced(priced_union, batch_plan["requests"], batch_plan["positions"])
+    group(
+        plan_route.signature((claim_check.put(payload),), task_id=job_id, **lane_options(plan_route.name, BACKGROUND))
+        for payload, job_id in zip(payloads, batch_plan["job_ids"])
+    ).apply_async()
+    return {"jobs": batch_plan["job_ids"]}
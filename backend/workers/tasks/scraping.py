@@ -2,39 +2,130 @@
 
 from __future__ import annotations
 
+import logging
 from typing import Any
 
 from celery import shared_task
 
+from backend.core import claim_check
+from backend.core.config import settings
+from backend.core.price_cache import PriceCache, PriceKey, get_price_cache, persisted, provider_for_store
+from backend.core.singleflight import get_single_flight
+from backend.workers.providers import OfferRequest, get_provider_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _price_key(item: dict[str, Any], store_id: str) -> PriceKey:
+    """Cache key for an item at a store: the matched product when known, else the query."""
+
+    for candidate in item.get("candidates", []):
+        if candidate.get("store_id") == store_id and candidate.get("product_id") is not None:
+            return str(candidate["product_id"]), store_id
+    return f"q:{item.get('normalized_name', '')}", store_id
+
+
+def _price_query(item: dict[str, Any], store_id: str) -> str:
+    """Search term sent to the store's provider for this item."""
+
+    for candidate in item.get("candidates", []):
+        if candidate.get("store_id") == store_id and candidate.get("product_name"):
+            return candidate["product_name"]
+    return item.get("normalized_name") or item.get("list_item", {}).get("name", "")
+
+
+def _refresh_prices(
+    cache: PriceCache,
+    keys: list[PriceKey],
+    queries: dict[PriceKey, str],
+) -> dict[PriceKey, dict[str, Any]]:
+    """Fetch ``keys`` from providers concurrently and publish them to both cache tiers."""
+
+    pool = get_provider_pool()
+    batches: dict[str, list[OfferRequest]] = {}
+    for key in keys:
+        provider = provider_for_store(key[1])
+        if pool.supports(provider):
+            batches.setdefault(provider, []).append(
+                OfferRequest(key=key, query=queries[key], store_id=key[1])
+            )
+
+    fetched = pool.fetch_many(batches, timeout=settings.provider_batch_timeout_seconds)
+    cache.put_many(fetched)
+    return {(entry.product, entry.store_id): entry.as_offer("provider") for entry in fetched}
+
+
+def _placeholder_offer(store_id: str) -> dict[str, Any]:
+    return {
+        "store_id": store_id,
+        "price": None,
+        "currency": "USD",
+        "last_fetched": None,
+        "source": "not-implemented",
+    }
+
 
 @shared_task(name="workers.scraping.fetch_prices")
 def fetch_prices(matched_payload: dict[str, Any]) -> dict[str, Any]:
     """Retrieve pricing information for matched items from external providers."""
 
+    matched_payload = claim_check.resolve(matched_payload)
     request = matched_payload.get("request", {})
     store_ids: list[str] = request.get("store_ids", [])
     matched_items: list[dict[str, Any]] = matched_payload.get("matched_items", [])
 
+    # Each item is priced at its candidates' stores (all stores, except in batches).
+    item_stores = [
+        [candidate.get("store_id") for candidate in item.get("candidates", [])] or store_ids
+        for item in matched_items
+    ]
+    keys = [
+        [_price_key(item, store_id) for store_id in stores]
+        for item, stores in zip(matched_items, item_stores)
+    ]
+    queries = {
+        key: _price_query(item, store_id)
+        for item, row, stores in zip(matched_items, keys, item_stores)
+        for key, store_id in zip(row, stores)
+    }
+    cache = get_price_cache()
+    offers, stale = cache.get_many(key for row in keys for key in row)
+
+    missing = [key for row in keys for key in row if key not in offers]
+    if missing:
+        # Concurrent jobs asking for the same (product, store) share one provider call;
+        # across processes only for product keys, whose prices land in the table.
+        offers.update(
+            get_single_flight("price").do_many(
+                missing,
+                lambda batch: _refresh_prices(cache, batch, queries),
+                recheck=lambda batch: cache.get_many(batch)[0],
+                shared=persisted,
+            )
+        )
+
+    # Serve stale prices rather than nothing when a provider could not refresh them.
+    for key, entry in stale.items():
+        offers.setdefault(key, {**entry.as_offer("stale"), "stale": True})
+
     priced_items: list[dict[str, Any]] = []
-    for item in matched_items:
+    for item, row, stores in zip(matched_items, keys, item_stores):
         priced_items.append(
             {
                 **item,
                 "offers": [
-                    {
-                        "store_id": store_id,
-                        "price": None,
-                        "currency": "USD",
-                        "last_fetched": None,
-                        "source": "not-implemented",
-                    }
-                    for store_id in store_ids
+                    offers.get(key) or _placeholder_offer(store_id)
+                    for key, store_id in zip(row, stores)
                 ],
             }
         )
 
-    return {
-        "request": request,
-        "matched_items": matched_items,
-        "priced_items": priced_items,
-    }
+    logger.debug("Price cache stats: %s", cache.stats())
+
+    return claim_check.put(
+        {
+            "request": request,
+            "matched_items": matched_items,
+            "priced_items": priced_items,
+        }
+    )
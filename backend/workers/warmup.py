@@ -0,0 +1,44 @@
+"""Worker start-up hooks preloading lookup structures (see ``core.warmup``).
+
+``worker_init`` runs in the worker's parent process before the pool forks, so
+the structures built there are shared copy-on-write by prefork children.
+``worker_process_init`` runs in each child (or once for the solo pool) and
+starts the background refresher.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+
+from backend.core.config import settings
+from backend.core.warmup import Refresher, prepare_fork, warm_up
+
+_refresher: Refresher | None = None
+
+
+@worker_init.connect
+def _warm_up_parent(**_: Any) -> None:
+    if not settings.worker_warmup:
+        return
+    warm_up()
+    prepare_fork()
+
+
+@worker_process_init.connect
+def _start_refresher(**_: Any) -> None:
+    global _refresher
+
+    refresher = Refresher(settings.worker_refresh_tick_seconds)
+    if refresher.start():
+        _refresher = refresher
+
+
+@worker_process_shutdown.connect
+def _stop_refresher(**_: Any) -> None:
+    global _refresher
+
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None